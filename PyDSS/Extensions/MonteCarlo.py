@@ -10,6 +10,36 @@ from PyDSS.pyLogger import getLoggerTag
 from PyDSS.simulation_input_models import SimulationSettingsModel
 from PyDSS.utils import utils
 
+
+def make_seed():
+    """Return a random seed for a Monte Carlo simulation.
+
+    Returns
+    -------
+    int
+
+    """
+    return int(np.random.SeedSequence().entropy)
+
+
+def make_sample_random_state(seed, sample_index):
+    """Return the random generator for one Monte Carlo sample. It depends only
+    on seed and sample_index, so a sample draws the same values regardless of
+    which process runs it or which samples ran before it.
+
+    Parameters
+    ----------
+    seed : int
+    sample_index : int
+
+    Returns
+    -------
+    numpy.random.Generator
+
+    """
+    return np.random.default_rng(np.random.SeedSequence(seed, spawn_key=(sample_index,)))
+
+
 class MonteCarloSim:
 
     def __init__(self, settings: SimulationSettingsModel, dssPaths, dssObjects, dssObjectsByClass):
@@ -31,7 +61,7 @@ class MonteCarloSim:
             raise
         return
 
-    def Create_Scenario(self):
+    def Create_Scenario(self, random_state=None):
         for key, Properties in self.__MCsettingsDict.items():
             if Properties['Class'] in self.__dssObjectsByClass:
                 Elements = self.__dssObjectsByClass[Properties['Class']]
@@ -43,13 +73,15 @@ class MonteCarloSim:
 
                 dist = getattr(stats, Properties['Distribution'].replace(' ', ''))
                 if not Properties['isList']:
-                    MCsamples = dist.rvs(*distParams, size=NumElms)
+                    MCsamples = dist.rvs(*distParams, size=NumElms, random_state=random_state)
                     if Properties['isInteger']:
                         MCsamples = [int(round(x)) for x in MCsamples]
                     for ElmName, Value in zip(ElmNames,MCsamples):
                         Elements[ElmName].SetParameter(Properties['Property'], Value)
                 else:
-                    MCsamples = dist.rvs(*distParams, size=NumElms * Properties['ListLength'])
+                    MCsamples = dist.rvs(
+                        *distParams, size=NumElms * Properties['ListLength'], random_state=random_state
+                    )
                     if Properties['isInteger']:
                         MCsamples = [int(round(x)) for x in MCsamples]
                     MCsamples = np.reshape(MCsamples, (NumElms, Properties['ListLength']))
@@ -1,4 +1,6 @@
+from PyDSS.active_object import invalidate_active_objects
 import PyDSS.dssElement as dE
+from PyDSS.parameter_cache import invalidate_all
 from PyDSS.pyLogger import getLoggerTag
 import logging
 
@@ -17,7 +19,7 @@ class Modifier():
         'Storage'  : Storge_defaultDict,
      }
 
-    def __init__(self, dss, run_command, SimulationSettings):
+    def __init__(self, dss, run_command, SimulationSettings, compiled_circuit=None):
         LoggerTag = getLoggerTag(SimulationSettings)
         self.pyLogger = logging.getLogger(LoggerTag)
         self.__dssInstance = dss
@@ -26,6 +28,8 @@ class Modifier():
         self.__dssBus = dss.Bus
         self.__dssClass = dss.ActiveClass
         self.__dssCommand = run_command
+        # Records the edits so that the circuit can be restored for reuse.
+        self.__compiledCircuit = compiled_circuit
 
     def Add_Elements(self, Class, Properties, Add2dssObjects = False, dssObjects = None):
         DefaultDict  =  self.DefaultDictSelector[Class]
@@ -59,9 +63,12 @@ class Modifier():
         Cmd = 'Edit ' + Class + '.' + Name
         for PptyName, PptyVal in Properties.items():
             if PptyVal is not None:
+                self._RecordEdit(Class + '.' + Name, PptyName)
                 tCMD = ' ' + PptyName + '=' + str(PptyVal)
                 Cmd += tCMD
         self.__dssCommand(Cmd)
+        invalidate_active_objects()
+        invalidate_all()
         self.pyLogger.info('Edited -> ' + Cmd)
         return
 
@@ -70,7 +77,12 @@ class Modifier():
         Element = self.__dssInstance.ActiveClass.First()
         while Element:
             ElmName = self.__dssInstance.ActiveClass.Name()
+            self._RecordEdit(Class + '.' + ElmName, Property)
             self.__dssInstance.utils.run_command(Class + '.' + ElmName + '.' + Property + ' = ' + str(Value))
             Element = self.__dssInstance.ActiveClass.Next()
+        invalidate_active_objects()
+        invalidate_all()
 
-
+    def _RecordEdit(self, ElmName, Property):
+        if self.__compiledCircuit is not None:
+            self.__compiledCircuit.record_edit(ElmName, Property)
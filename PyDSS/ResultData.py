@@ -19,11 +19,15 @@ from PyDSS.common import (
     NODE_NAMES_BY_TYPE_FILENAME,
     DatasetPropertyType,
 )
+from PyDSS.active_object import invalidate_active_objects
+from PyDSS.async_hdf_writer import AsyncHdfWriter
+from PyDSS.class_property_reader import read_class_properties
 from PyDSS.dataset_buffer import DatasetBuffer
 from PyDSS.utils.dss_utils import get_node_names_by_type
 from PyDSS.exceptions import InvalidConfiguration, InvalidParameter
 from PyDSS.export_list_reader import ExportListReader, StoreValuesType
 from PyDSS.reports.reports import Reports, ReportGranularity
+from PyDSS.result_index import write_result_index
 from PyDSS.simulation_input_models import SimulationSettingsModel
 from PyDSS.utils.dataframe_utils import write_dataframe
 from PyDSS.utils.utils import dump_data
@@ -47,6 +51,7 @@ class ResultData:
     """Exports data to files."""
 
     METADATA_FILENAME = "metadata.json"
+    EVENT_LOG_FILENAME = "event_log.csv"
     INDICES_BASENAME = "indices"
 
     def __init__(self, settings: SimulationSettingsModel, system_paths, dss_objects,
@@ -64,6 +69,8 @@ class ResultData:
         self._settings = settings
         self._cur_step = 0
         self._stats = timer_stats
+        self._num_shared_read_calls = 0
+        self._num_separate_read_calls = 0
         self._current_results = {}
 
         self._dss_command = dss_command
@@ -74,6 +81,7 @@ class ResultData:
         self._mode_dataset = None
         self._simulation_mode = []
         self._hdf_store = None
+        self._writer = None
         self._scenario = settings.project.active_scenario
         self._base_scenario = settings.project.active_scenario
         self._export_format = settings.exports.export_format
@@ -93,17 +101,7 @@ class ResultData:
 
         pathlib.Path(self._export_dir).mkdir(parents=True, exist_ok=True)
 
-        export_list_filename = os.path.join(
-            system_paths["ExportLists"],
-            "Exports.toml",
-        )
-        if not os.path.exists(export_list_filename):
-            export_list_filename = os.path.join(
-                system_paths["ExportLists"],
-                "ExportMode-byClass.toml",
-            )
-        self._export_list = ExportListReader(export_list_filename)
-        Reports.append_required_exports(self._export_list, settings)
+        self._export_list = self.read_export_list(system_paths["ExportLists"], settings)
         dump_data(
             self._export_list.serialize(),
             os.path.join(self._export_dir, "ExportsActual.toml"),
@@ -111,6 +109,29 @@ class ResultData:
         self._circuit_metrics = {}
         self._create_exports()
 
+    @staticmethod
+    def read_export_list(export_lists_path, settings: SimulationSettingsModel):
+        """Return the exports for the active scenario, including those
+        required by the configured reports.
+
+        Parameters
+        ----------
+        export_lists_path : str
+            ExportLists directory of the scenario
+        settings : SimulationSettingsModel
+
+        Returns
+        -------
+        ExportListReader
+
+        """
+        export_list_filename = os.path.join(export_lists_path, "Exports.toml")
+        if not os.path.exists(export_list_filename):
+            export_list_filename = os.path.join(export_lists_path, "ExportMode-byClass.toml")
+        export_list = ExportListReader(export_list_filename)
+        Reports.append_required_exports(export_list, settings)
+        return export_list
+
     def _create_exports(self):
         for elem_class in self._export_list.list_element_classes():
             if elem_class in ("Buses", "Nodes"):
@@ -129,16 +150,20 @@ class ResultData:
                             logger.warning("Export class=%s is not present in the circuit", cls)
                             continue
 
-                        for obj in self._objects_by_class[cls].values():
-                            if obj.Enabled and prop.should_store_name(obj.FullName):
-                                dss_objs.append(obj)
+                        dss_objs += self._get_objects_to_store(self._objects_by_class[cls], prop)
                 else:
-                    dss_objs = [x for x in objs.values() if x.Enabled and prop.should_store_name(x.FullName)]
+                    dss_objs = self._get_objects_to_store(objs, prop)
                 if prop.custom_metric is None:
                     self._add_opendss_metric(prop, dss_objs)
                 else:
                     self._add_custom_metric(prop, dss_objs)
 
+    @staticmethod
+    def _get_objects_to_store(objs, prop):
+        # Filter by name first so that only the selected objects get created.
+        selected = (objs[x] for x in objs if prop.should_store_name(x))
+        return [x for x in selected if x.Enabled]
+
     def _add_opendss_metric(self, prop, dss_objs):
         obj = dss_objs[0]
         if not obj.IsValidAttribute(prop.name):
@@ -185,13 +210,20 @@ class ResultData:
         if MC_scenario_number is not None:
             self._scenario = self._base_scenario + f"_MC{MC_scenario_number}"
         self._hdf_store = hdf_store
+        if self._settings.exports.hdf_async_writes:
+            self._writer = AsyncHdfWriter(
+                max_queue_size=self._settings.exports.hdf_async_write_queue_size
+            )
         self._time_dataset = DatasetBuffer(
             hdf_store=hdf_store,
             path=f"Exports/{self._scenario}/Timestamp",
             max_size=num_steps,
             dtype=float,
             columns=("Timestamp",),
-            max_chunk_bytes=self._max_chunk_bytes
+            max_chunk_bytes=self._max_chunk_bytes,
+            writer=self._writer,
+            compression=self._settings.exports.hdf_compression,
+            metadata_compression=self._settings.exports.hdf_metadata_compression,
         )
         self._frequency_dataset = DatasetBuffer(
             hdf_store=hdf_store,
@@ -199,7 +231,10 @@ class ResultData:
             max_size=num_steps,
             dtype=float,
             columns=("Frequency",),
-            max_chunk_bytes=self._max_chunk_bytes
+            max_chunk_bytes=self._max_chunk_bytes,
+            writer=self._writer,
+            compression=self._settings.exports.hdf_compression,
+            metadata_compression=self._settings.exports.hdf_metadata_compression,
         )
         self._mode_dataset = DatasetBuffer(
             hdf_store=hdf_store,
@@ -207,13 +242,18 @@ class ResultData:
             max_size=num_steps,
             dtype="S10",
             columns=("Mode",),
-            max_chunk_bytes=self._max_chunk_bytes
+            max_chunk_bytes=self._max_chunk_bytes,
+            writer=self._writer,
+            compression=self._settings.exports.hdf_compression,
+            metadata_compression=self._settings.exports.hdf_metadata_compression,
         )
         self._cur_step = 0
+        self._num_shared_read_calls = 0
+        self._num_separate_read_calls = 0
 
         base_path = "Exports/" + self._scenario
         for metric in self._iter_metrics():
-            metric.initialize_data_store(hdf_store, base_path, num_steps)
+            metric.initialize_data_store(hdf_store, base_path, num_steps, writer=self._writer)
 
     def _iter_metrics(self):
         for metric in self._element_metrics.values():
@@ -237,7 +277,17 @@ class ResultData:
         self._mode_dataset.write_value([self._dss_solver.getMode()])
 
         with Timer(self._stats, "Total"):
-            for metric in self._iter_metrics():
+            # Skip acquisition for metrics not due at this step.
+            metrics = [x for x in self._iter_metrics() if x.should_sample_value(self._cur_step)]
+            with Timer(self._stats, "ClassReads"):
+                num_calls, num_separate_calls = read_class_properties(
+                    [x for y in metrics for x in y.iter_class_readers()]
+                )
+            self._num_shared_read_calls += num_calls
+            self._num_separate_read_calls += num_separate_calls
+            for metric in metrics:
+                # Metrics iterate over OpenDSS classes.
+                invalidate_active_objects()
                 with Timer(self._stats, metric.label()):
                     data = metric.append_values(self._cur_step, store_nan=store_nan)
 
@@ -246,6 +296,7 @@ class ResultData:
                     # Something is only returned for OpenDSS properties
                     self._current_results.update(data)
 
+        invalidate_active_objects()
         self._cur_step += 1
         return self._current_results
 
@@ -261,6 +312,8 @@ class ResultData:
             self._export_elements(metadata, set(self._settings.exports.export_element_types))
             self._export_feeder_head_info(metadata)
         if self._settings.exports.export_pv_profiles:
+            # The exports above activate elements without PyDSS objects.
+            invalidate_active_objects()
             self._export_pv_profiles()
         if self._settings.exports.export_node_names_by_type:
             self._export_node_names_by_type()
@@ -271,13 +324,31 @@ class ResultData:
         self._hdf_store = None
 
     def Close(self):
-        for dataset in (self._time_dataset, self._frequency_dataset, self._mode_dataset):
-            dataset.flush_data()
-        for metric in self._iter_metrics():
-            metric.close()
+        try:
+            for dataset in (self._time_dataset, self._frequency_dataset, self._mode_dataset):
+                dataset.flush_data()
+            for metric in self._iter_metrics():
+                metric.close()
+        finally:
+            # All data must be on disk before the caller closes the HDF5 file.
+            if self._writer is not None:
+                writer = self._writer
+                self._writer = None
+                writer.close()
+
+        if self._hdf_store is not None:
+            write_result_index(self._hdf_store[f"Exports/{self._scenario}"])
+
+        if self._num_separate_read_calls > 0:
+            self._logger.info(
+                "Shared reads of element classes made %s calls into OpenDSS instead of an "
+                "estimated %s",
+                self._num_shared_read_calls,
+                self._num_separate_read_calls,
+            )
 
     def _export_event_log(self, metadata):
-        event_log = "event_log.csv"
+        event_log = self.EVENT_LOG_FILENAME
         file_path = os.path.join(self._export_dir, event_log)
         if os.path.exists(file_path):
             os.remove(file_path)
@@ -0,0 +1,99 @@
+"""Tracks the OpenDSS element and bus that PyDSS activated last, so that PyDSS
+objects can check whether they are active without asking OpenDSS.
+
+OpenDSS has one active element and one active bus per process. Every PyDSS
+path that activates one sets it here. Paths that may change them without
+knowing which object becomes active, such as solving the circuit, iterating
+over a class, or running a command, call invalidate_active_objects. Code
+outside of PyDSS that activates elements must do the same.
+
+"""
+
+import logging
+
+import opendssdirect as dss
+
+from PyDSS.exceptions import ActiveObjectError
+
+
+ELEMENT = "element"
+BUS = "bus"
+
+logger = logging.getLogger(__name__)
+
+_active_objects = {ELEMENT: None, BUS: None}
+_verify = False
+
+
+def set_active_object(obj, kind=ELEMENT):
+    """Record that obj is the active object in OpenDSS.
+
+    Parameters
+    ----------
+    obj : dssObjectBase
+    kind : str
+        ELEMENT or BUS
+
+    """
+    _active_objects[kind] = obj
+
+
+def is_active_object(obj, kind=ELEMENT):
+    """Return True if obj is the active object in OpenDSS.
+
+    Parameters
+    ----------
+    obj : dssObjectBase
+    kind : str
+        ELEMENT or BUS
+
+    Returns
+    -------
+    bool
+
+    Raises
+    ------
+    ActiveObjectError
+        Raised if verification is enabled and OpenDSS has a different
+        active object.
+
+    """
+    if _active_objects[kind] is not obj:
+        return False
+    if _verify:
+        _verify_active_object(obj, kind)
+    return True
+
+
+def invalidate_active_objects():
+    """Forget the active objects. Call after anything that may activate an
+    element or bus without recording it."""
+    _active_objects[ELEMENT] = None
+    _active_objects[BUS] = None
+
+
+def enable_active_object_verification(enable=True):
+    """Enable or disable checking the tracked objects against OpenDSS. This
+    costs the calls into OpenDSS that the tracker saves, so use it to debug.
+
+    Parameters
+    ----------
+    enable : bool
+
+    """
+    global _verify
+    _verify = enable
+    logger.debug("Active object verification enabled=%s", enable)
+
+
+def _verify_active_object(obj, kind):
+    if kind == BUS:
+        expected = obj.Name
+        actual = dss.Bus.Name()
+    else:
+        expected = obj.FullName
+        actual = dss.Element.Name()
+    if actual != expected:
+        raise ActiveObjectError(
+            f"PyDSS tracks {expected} as the active {kind} but OpenDSS has {actual}"
+        )
@@ -0,0 +1,101 @@
+"""Contains AsyncHdfWriter"""
+
+import logging
+import queue
+import threading
+
+
+DEFAULT_MAX_QUEUE_SIZE = 4
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncHdfWriter:
+    """Performs HDF5 dataset writes in a background thread so that the
+    simulation can continue while HDF5 compresses and writes chunks.
+
+    DatasetBuffer submits each full buffer as a job. Jobs run in submission
+    order. When the queue is full, submit blocks until the thread catches up,
+    which bounds the memory held by pending buffers. Users must call close
+    before closing the HDF5 file.
+
+    """
+
+    def __init__(self, max_queue_size=DEFAULT_MAX_QUEUE_SIZE):
+        self._queue = queue.Queue(maxsize=max_queue_size)
+        self._exception = None
+        self._num_jobs = 0
+        self._num_blocked_submits = 0
+        self._thread = threading.Thread(
+            target=self._run, name="PyDSSHdfWriter", daemon=True
+        )
+        self._thread.start()
+        logger.debug("Started AsyncHdfWriter max_queue_size=%s", max_queue_size)
+
+    def close(self):
+        """Wait for all pending writes to complete and stop the thread."""
+        if not self._thread.is_alive():
+            return
+
+        self._queue.put(None)
+        self._thread.join()
+        logger.debug(
+            "Stopped AsyncHdfWriter num_jobs=%s num_blocked_submits=%s",
+            self._num_jobs, self._num_blocked_submits,
+        )
+        self._check_exception()
+
+    def drain(self):
+        """Wait for all pending writes to complete."""
+        self._queue.join()
+        self._check_exception()
+
+    @property
+    def num_blocked_submits(self):
+        """Return the number of times a caller had to wait for a free slot in
+        the queue.
+
+        Returns
+        -------
+        int
+
+        """
+        return self._num_blocked_submits
+
+    def submit(self, func, *args):
+        """Run func(*args) in the writer thread. Blocks if the queue is full.
+
+        Raises
+        ------
+        Exception
+            Re-raises the first exception raised by a previous job.
+
+        """
+        self._check_exception()
+        if not self._thread.is_alive():
+            raise Exception("AsyncHdfWriter is closed")
+        if self._queue.full():
+            self._num_blocked_submits += 1
+        self._queue.put((func, args))
+        self._num_jobs += 1
+
+    def _check_exception(self):
+        if self._exception is not None:
+            exc = self._exception
+            self._exception = None
+            raise exc
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            try:
+                if job is None:
+                    break
+                func, args = job
+                func(*args)
+            except Exception as exc:
+                logger.exception("Failed to write HDF5 data")
+                if self._exception is None:
+                    self._exception = exc
+            finally:
+                self._queue.task_done()
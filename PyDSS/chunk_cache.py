@@ -0,0 +1,131 @@
+"""Contains ChunkCache"""
+
+from collections import OrderedDict
+import logging
+
+import numpy as np
+
+
+KiB = 1024
+MiB = KiB * KiB
+
+DEFAULT_CHUNK_CACHE_BYTES = 128 * MiB
+
+logger = logging.getLogger(__name__)
+
+
+class ChunkCache:
+    """Least-recently-used cache of decoded row blocks of HDF5 datasets.
+
+    Each block holds the rows of one dataset chunk. Datasets created by
+    DatasetBuffer have chunks that span all columns, so one block serves any
+    column range of its rows. The cache evicts the least-recently-used blocks
+    when the decoded size exceeds the budget.
+
+    The cache assumes that the datasets do not change while it holds them,
+    which is true for results opened read-only.
+
+    """
+
+    def __init__(self, max_bytes=DEFAULT_CHUNK_CACHE_BYTES):
+        """Constructor for ChunkCache
+
+        Parameters
+        ----------
+        max_bytes : int
+            Maximum number of bytes of decoded data to hold.
+
+        """
+        self._max_bytes = max_bytes
+        self._blocks = OrderedDict()
+        self._num_bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def __len__(self):
+        return len(self._blocks)
+
+    @property
+    def hits(self):
+        """Return the number of block reads served from the cache."""
+        return self._hits
+
+    @property
+    def misses(self):
+        """Return the number of block reads served from the file."""
+        return self._misses
+
+    @property
+    def max_bytes(self):
+        """Return the budget in bytes."""
+        return self._max_bytes
+
+    @property
+    def num_bytes(self):
+        """Return the number of bytes held in the cache."""
+        return self._num_bytes
+
+    def clear(self):
+        """Remove all blocks and reset the counters."""
+        self._blocks.clear()
+        self._num_bytes = 0
+        self._hits = 0
+        self._misses = 0
+
+    def read(self, dataset, rows, columns=None):
+        """Read a two-dimensional slice of a dataset.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+        rows : slice
+        columns : slice | None
+            Defaults to all columns.
+
+        Returns
+        -------
+        np.ndarray
+            The caller owns the array; it does not share memory with the cache.
+
+        """
+        length = dataset.shape[0]
+        start, end, step = rows.indices(length)
+        assert step == 1, step
+        if columns is None:
+            columns = slice(None)
+        if start >= end:
+            return dataset[start:start, columns]
+
+        block_size = dataset.chunks[0] if dataset.chunks is not None else length
+        first = start // block_size
+        last = (end - 1) // block_size
+        arrays = []
+        for index in range(first, last + 1):
+            block_start = index * block_size
+            block = self._get_block(dataset, index, block_start, block_size)
+            arrays.append(block[
+                max(start, block_start) - block_start:min(end, block_start + block_size) - block_start,
+                columns,
+            ])
+
+        if len(arrays) == 1:
+            return arrays[0].copy()
+        return np.concatenate(arrays)
+
+    def _get_block(self, dataset, index, block_start, block_size):
+        key = (dataset.id, index)
+        block = self._blocks.get(key)
+        if block is not None:
+            self._blocks.move_to_end(key)
+            self._hits += 1
+            return block
+
+        self._misses += 1
+        block = dataset[block_start:block_start + block_size]
+        if block.nbytes <= self._max_bytes:
+            self._blocks[key] = block
+            self._num_bytes += block.nbytes
+            while self._num_bytes > self._max_bytes:
+                _, evicted = self._blocks.popitem(last=False)
+                self._num_bytes -= evicted.nbytes
+        return block
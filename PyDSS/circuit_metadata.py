@@ -0,0 +1,234 @@
+"""Caches metadata of a compiled circuit on disk so that later runs of the same
+model do not read it from OpenDSS again."""
+
+import hashlib
+import json
+import logging
+import os
+import re
+
+import opendssdirect as dss
+
+from PyDSS.active_object import invalidate_active_objects
+
+
+CIRCUIT_METADATA_FILENAME = ".circuit_metadata.json"
+
+logger = logging.getLogger(__name__)
+
+_circuit_model = None
+_circuit_metadata = None
+
+
+def hash_dss_files(dss_file):
+    """Return a hash of the DSS file and the files that it uses.
+
+    The contents of the DSS file and of all scripts that it reaches through
+    Redirect or Compile commands are hashed. Other files in the directory of
+    the DSS file, such as load shapes, are large, so only their paths, sizes
+    and modification times are hashed.
+
+    Parameters
+    ----------
+    dss_file : Path
+
+    Returns
+    -------
+    str
+
+    """
+    sha = hashlib.sha256()
+    sha.update(dss_file.name.encode())
+    base_dir = dss_file.parent
+    scripts = _find_dss_scripts(dss_file)
+    for path in scripts:
+        sha.update(os.path.relpath(path, base_dir).encode())
+        if os.path.isfile(path):
+            with open(path, "rb") as f_in:
+                sha.update(f_in.read())
+
+    paths = []
+    for dirpath, _, filenames in os.walk(base_dir):
+        for filename in filenames:
+            paths.append(os.path.join(dirpath, filename))
+    hashed = set(scripts)
+    for path in sorted(paths):
+        if os.path.normpath(os.path.abspath(path)) in hashed:
+            continue
+        stat = os.stat(path)
+        sha.update(
+            f"{os.path.relpath(path, base_dir)}:{stat.st_size}:{stat.st_mtime_ns}".encode()
+        )
+    return sha.hexdigest()
+
+
+_REDIRECT_REGEX = re.compile(
+    r"""^\s*(?:redirect|compile)\s+(?:file\s*=\s*)?(?:"([^"]+)"|'([^']+)'|(\S+))""",
+    re.IGNORECASE | re.MULTILINE,
+)
+
+
+def _find_dss_scripts(dss_file):
+    """Return the absolute paths of the DSS file and of all scripts that it
+    reaches through Redirect or Compile commands, in the order found."""
+    scripts = []
+    stack = [os.path.normpath(os.path.abspath(dss_file))]
+    while stack:
+        path = stack.pop()
+        if path in scripts:
+            continue
+        scripts.append(path)
+        if not os.path.isfile(path):
+            continue
+        with open(path, errors="replace") as f_in:
+            text = f_in.read()
+        dirname = os.path.dirname(path)
+        children = [
+            os.path.normpath(os.path.join(dirname, next(x for x in match if x)))
+            for match in _REDIRECT_REGEX.findall(text)
+        ]
+        stack.extend(reversed(children))
+    return scripts
+
+
+def set_circuit_model(dss_file, cache_dir):
+    """Set the model of a newly compiled circuit. Its metadata is loaded from
+    the cache, or read from OpenDSS and stored in the cache, when first
+    requested.
+
+    Parameters
+    ----------
+    dss_file : Path
+        DSS file that was compiled
+    cache_dir : Path
+        Directory of the cache file
+
+    """
+    global _circuit_model, _circuit_metadata
+    _circuit_model = (dss_file, cache_dir)
+    _circuit_metadata = None
+
+
+def clear_circuit_model():
+    """Forget the model of the compiled circuit and its metadata."""
+    global _circuit_model, _circuit_metadata
+    _circuit_model = None
+    _circuit_metadata = None
+
+
+def get_circuit_metadata():
+    """Return the metadata of the compiled circuit or None if its model is not
+    known.
+
+    Returns
+    -------
+    CircuitMetadata | None
+
+    """
+    global _circuit_metadata
+    if _circuit_model is None:
+        return None
+    if _circuit_metadata is None or not _circuit_metadata.is_current():
+        _circuit_metadata = load_circuit_metadata(*_circuit_model)
+    return _circuit_metadata
+
+
+def load_circuit_metadata(dss_file, cache_dir):
+    """Load the metadata of the compiled circuit from the cache or read it from
+    OpenDSS and store it in the cache.
+
+    Parameters
+    ----------
+    dss_file : Path
+        DSS file that was compiled
+    cache_dir : Path
+        Directory of the cache file
+
+    Returns
+    -------
+    CircuitMetadata
+
+    """
+    model_hash = hash_dss_files(dss_file)
+    filename = os.path.join(cache_dir, CIRCUIT_METADATA_FILENAME)
+    metadata = None
+    if os.path.exists(filename):
+        try:
+            metadata = CircuitMetadata.load(filename)
+        except (OSError, ValueError, KeyError):
+            logger.warning("Ignoring invalid circuit metadata cache %s", filename)
+        else:
+            if metadata.model_hash != model_hash or \
+                    metadata.node_names != dss.Circuit.AllNodeNames():
+                metadata = None
+
+    if metadata is None:
+        metadata = CircuitMetadata.from_circuit(model_hash)
+        metadata.dump(filename)
+        logger.info("Stored circuit metadata in %s", filename)
+    else:
+        logger.debug("Loaded circuit metadata from %s", filename)
+    return metadata
+
+
+def read_node_kv_bases():
+    """Read the names of all nodes and their voltage bases from OpenDSS.
+
+    Returns
+    -------
+    tuple
+        list of node names, list of kVBase values
+
+    """
+    node_names = dss.Circuit.AllNodeNames()
+    kv_bases = []
+    for name in node_names:
+        dss.Circuit.SetActiveBus(name)
+        kv_bases.append(dss.Bus.kVBase())
+    invalidate_active_objects()
+    return node_names, kv_bases
+
+
+class CircuitMetadata:
+    """Names and voltage bases of the nodes of a compiled circuit."""
+
+    def __init__(self, model_hash, circuit_name, node_names, kv_bases):
+        self.model_hash = model_hash
+        self.circuit_name = circuit_name
+        self.node_names = node_names
+        self.kv_bases = kv_bases
+
+    @classmethod
+    def from_circuit(cls, model_hash):
+        """Read the metadata from the circuit in OpenDSS."""
+        node_names, kv_bases = read_node_kv_bases()
+        return cls(model_hash, dss.Circuit.Name(), node_names, kv_bases)
+
+    @classmethod
+    def load(cls, filename):
+        """Load the metadata from a file."""
+        with open(filename) as f_in:
+            data = json.load(f_in)
+        return cls(data["model_hash"], data["circuit_name"], data["node_names"], data["kv_bases"])
+
+    def dump(self, filename):
+        """Write the metadata to a file. Replaces the file atomically because
+        other processes may read it."""
+        data = {
+            "model_hash": self.model_hash,
+            "circuit_name": self.circuit_name,
+            "node_names": self.node_names,
+            "kv_bases": self.kv_bases,
+        }
+        tmp_filename = f"{filename}.{os.getpid()}.tmp"
+        with open(tmp_filename, "w") as f_out:
+            json.dump(data, f_out, separators=(",", ":"))
+        os.replace(tmp_filename, filename)
+
+    def is_current(self):
+        """Return True if the metadata describes the circuit in OpenDSS."""
+        return (
+            dss.Basic.NumCircuits() > 0 and
+            dss.Circuit.Name() == self.circuit_name and
+            dss.Circuit.NumNodes() == len(self.node_names)
+        )
@@ -0,0 +1,279 @@
+"""Contains ClassPropertyReader"""
+
+import logging
+from collections import defaultdict
+
+import numpy as np
+
+from PyDSS.active_object import invalidate_active_objects
+from PyDSS.exceptions import InvalidConfiguration
+
+
+logger = logging.getLogger(__name__)
+
+# Incremented by each call to read_class_properties. A reader returns the
+# values that it was given only during the pass that gave them.
+_pass_id = 0
+
+
+class ClassPropertyReader:
+    """Reads one CktElement property for all elements of an OpenDSS class into
+    a preallocated NumPy array.
+
+    The opendssdirect versions supported by PyDSS do not provide class-wide
+    getters for CktElement quantities like Currents or Powers, so the reader
+    makes one pass over the class with the native iterator and copies each
+    element's raw values into its slot in the buffer. That costs two calls into
+    OpenDSS per element (the getter and Next) instead of the name checks and
+    activation performed by dssObjectBase.UpdateValue.
+
+    The buffer is laid out in the order of the dss_objs passed to the
+    constructor, not in OpenDSS iteration order.
+
+    Readers of several properties of one class can share one pass over the
+    elements through read_class_properties.
+
+    """
+
+    def __init__(self, elem_class, prop, dss_objs):
+        """Constructs ClassPropertyReader
+
+        Parameters
+        ----------
+        elem_class : module
+            opendssdirect class interface, such as dss.Lines
+        prop : str
+            CktElement property name, such as Currents
+        dss_objs : list
+            list of dssElement, one per element in the class
+
+        """
+        self._elem_class = elem_class
+        self._prop = prop
+        self._func = dss_objs[0]._Variables.get(prop)
+        if self._func is None:
+            raise InvalidConfiguration(
+                f"{prop} is not a CktElement property of {dss_objs[0].FullName}"
+            )
+        self._index_by_name = {x.Name: i for i, x in enumerate(dss_objs)}
+        self._num_elements = len(dss_objs)
+        self._offsets = None
+        # Start and end offsets in the buffer for each element, in OpenDSS
+        # iteration order.
+        self._slices = None
+        self._buffer = None
+        self._is_scalar = None
+        self._filled_by_pass = None
+
+    @staticmethod
+    def is_supported(dss_obj, prop):
+        """Return True if the reader can read prop for the class of dss_obj.
+
+        Parameters
+        ----------
+        dss_obj : dssObjectBase
+        prop : str
+
+        Returns
+        -------
+        bool
+
+        """
+        if prop not in getattr(dss_obj, "_Variables", {}):
+            return False
+        if prop in dss_obj.VARIABLE_OUTPUTS_BY_LABEL or prop in dss_obj.VARIABLE_OUTPUTS_COMPLEX:
+            return True
+        value = dss_obj.GetValue(prop)
+        return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+    @property
+    def elem_class(self):
+        """Return the opendssdirect class interface.
+
+        Returns
+        -------
+        module
+
+        """
+        return self._elem_class
+
+    @property
+    def is_initialized(self):
+        """Return True if the reader knows the layout of its buffer.
+
+        Returns
+        -------
+        bool
+
+        """
+        return self._slices is not None
+
+    @property
+    def buffer(self):
+        """Return the array filled by the last call to read.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        return self._buffer
+
+    @property
+    def is_scalar(self):
+        """Return True if the property has one value per element.
+
+        Returns
+        -------
+        bool
+
+        """
+        return self._is_scalar
+
+    @property
+    def offsets(self):
+        """Return the start offset of each element's values in the buffer. The
+        last entry is the total length.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        return self._offsets
+
+    def get_element_values(self, index):
+        """Return a view of the values for one element from the last read.
+
+        Parameters
+        ----------
+        index : int
+            index of the element in dss_objs
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        return self._buffer[self._offsets[index]:self._offsets[index + 1]]
+
+    def read(self):
+        """Read the property for every element at the current time step.
+
+        Returns
+        -------
+        np.ndarray
+            Values of all elements; the array is reused on every call.
+
+        """
+        if self._filled_by_pass is not None:
+            is_current = self._filled_by_pass == _pass_id
+            self._filled_by_pass = None
+            if is_current:
+                # read_class_properties already read the values of this step.
+                return self._buffer
+
+        count = self._elem_class.Count()
+        invalidate_active_objects()
+        if self._slices is None or count != len(self._slices):
+            self._initialize(count)
+            return self._buffer
+
+        buf = self._buffer
+        func = self._func
+        self._elem_class.First()
+        if self._is_scalar:
+            for start, _ in self._slices:
+                buf[start] = func()
+                self._elem_class.Next()
+        else:
+            for start, end in self._slices:
+                buf[start:end] = func()
+                self._elem_class.Next()
+
+        return buf
+
+    def _initialize(self, count):
+        if count != self._num_elements:
+            raise InvalidConfiguration(
+                f"{self._prop}: OpenDSS reports {count} elements but PyDSS tracks {self._num_elements}"
+            )
+
+        raw_values = [None] * self._num_elements
+        order = []
+        self._elem_class.First()
+        for _ in range(count):
+            index = self._index_by_name[self._elem_class.Name()]
+            raw_values[index] = self._func()
+            order.append(index)
+            self._elem_class.Next()
+
+        self._is_scalar = not isinstance(raw_values[0], list)
+        lengths = [1 if self._is_scalar else len(x) for x in raw_values]
+        self._offsets = np.zeros(self._num_elements + 1, dtype=np.int64)
+        np.cumsum(lengths, out=self._offsets[1:])
+        self._buffer = np.empty(self._offsets[-1], dtype=np.float64)
+        for i, raw in enumerate(raw_values):
+            self._buffer[self._offsets[i]:self._offsets[i + 1]] = raw
+        self._slices = [(int(self._offsets[i]), int(self._offsets[i + 1])) for i in order]
+        logger.debug("Initialized %s reader with %s values", self._prop, self._offsets[-1])
+
+
+def read_class_properties(readers):
+    """Read the properties of all readers with one pass over the elements of
+    each OpenDSS class. Each reader returns the values on its next call to
+    read instead of reading them again. Readers that are not initialized or
+    that are the only reader of their class are left to read themselves.
+
+    Parameters
+    ----------
+    readers : list
+        list of ClassPropertyReader
+
+    Returns
+    -------
+    tuple
+        Number of calls into OpenDSS made by the shared passes and an estimate
+        of the number that the readers would have made on their own
+
+    """
+    global _pass_id
+    _pass_id += 1
+    readers_by_class = defaultdict(list)
+    for reader in readers:
+        if reader.is_initialized and reader not in readers_by_class[reader.elem_class]:
+            readers_by_class[reader.elem_class].append(reader)
+
+    num_calls = 0
+    num_separate_calls = 0
+    if readers_by_class:
+        invalidate_active_objects()
+    for elem_class, class_readers in readers_by_class.items():
+        if len(class_readers) < 2:
+            continue
+        count = elem_class.Count()
+        num_calls += 1
+        class_readers = [x for x in class_readers if len(x._slices) == count]
+        if len(class_readers) < 2:
+            continue
+
+        fills = [(x._buffer, x._func, x._slices, x._is_scalar) for x in class_readers]
+        elem_class.First()
+        num_calls += 1
+        for i in range(count):
+            for buf, func, slices, is_scalar in fills:
+                start, end = slices[i]
+                if is_scalar:
+                    buf[start] = func()
+                else:
+                    buf[start:end] = func()
+            elem_class.Next()
+            num_calls += len(fills) + 1
+
+        for reader in class_readers:
+            reader._filled_by_pass = _pass_id
+        # Each reader would call Count, First, and then its getter and Next
+        # per element.
+        num_separate_calls += len(class_readers) * (2 + count * 2)
+
+    return num_calls, num_separate_calls
@@ -55,6 +55,28 @@ logger = logging.getLogger(__name__)
     show_default=True,
     help="Enable verbose log output."
 )
+@click.option(
+    "-p", "--parallel",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Number of scenarios to run in parallel, each in its own process. With " \
+            "--time-partitions, the number of time windows to run in parallel."
+)
+@click.option(
+    "--time-partitions",
+    type=int,
+    default=1,
+    show_default=True,
+    help="Split each QSTS scenario into this many time windows that run in separate processes."
+)
+@click.option(
+    "--warm-up-min",
+    type=float,
+    default=0.0,
+    show_default=True,
+    help="Minutes to simulate before each time window without keeping the results."
+)
 @click.option(
     "--dry-run",
     is_flag=True,
@@ -64,7 +86,8 @@ logger = logging.getLogger(__name__)
 )
 @click.command()
 
-def run(project_path, options=None, tar_project=False, zip_project=False, verbose=False, simulations_file=None, dry_run=False):
+def run(project_path, options=None, tar_project=False, zip_project=False, verbose=False, simulations_file=None, dry_run=False,
+        parallel=1, time_partitions=1, warm_up_min=0.0):
     """Run a PyDSS simulation."""
     project_path = Path(project_path)
     settings = PyDssProject.load_simulation_settings(project_path, simulations_file)
@@ -102,7 +125,14 @@ def run(project_path, options=None, tar_project=False, zip_project=False, verbos
             sys.exit(1)
 
     project = PyDssProject.load_project(project_path, options=options, simulation_file=simulations_file)
-    project.run(tar_project=tar_project, zip_project=zip_project, dry_run=dry_run)
+    project.run(
+        tar_project=tar_project,
+        zip_project=zip_project,
+        dry_run=dry_run,
+        parallel=parallel,
+        time_partitions=time_partitions,
+        warm_up_min=warm_up_min,
+    )
 
     if dry_run:
         maxlen = max([len(k) for k in project.estimated_space.keys()])
@@ -154,8 +154,9 @@ class DatasetPropertyType(enum.Enum):
     PER_TIME_POINT = "per_time_point"  # data is stored at every time point
     FILTERED = "filtered"  # data is stored after being filtered
     METADATA = "metadata"  # metadata for another dataset
-    TIME_STEP = "time_step"  # data are time indices, tied to FILTERED
+    TIME_STEP = "time_step"  # data are time indices, tied to FILTERED and ON_CHANGE
     VALUE = "value"  # Only a single value is written for each element
+    ON_CHANGE = "on_change"  # data is stored when an element's value changes
 
 
 class FileFormat(enum.Enum):
@@ -164,6 +165,15 @@ class FileFormat(enum.Enum):
     HDF5 = "h5"
 
 
+class HdfCompression(enum.Enum):
+    """Supported compression codecs for HDF5 datasets"""
+    NONE = "none"
+    LZF = "lzf"
+    GZIP = "gzip"
+    BLOSC = "blosc"  # requires hdf5plugin
+    ZSTD = "zstd"  # requires hdf5plugin
+
+
 class LimitsFilter(enum.Enum):
     INSIDE = "inside"
     OUTSIDE = "outside"
@@ -209,6 +219,7 @@ class StoreValuesType(enum.Enum):
     MIN = "min"
     MOVING_AVERAGE = "moving_average"
     MOVING_AVERAGE_MAX = "moving_average_max"
+    ON_CHANGE = "on_change"
     SUM = "sum"
 
 
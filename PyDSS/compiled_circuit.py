@@ -0,0 +1,247 @@
+"""Reuses a compiled OpenDSS circuit across scenarios in one process."""
+
+import itertools
+import logging
+import os
+
+from dss import DSSException
+import opendssdirect as dss
+
+from PyDSS.active_object import invalidate_active_objects
+from PyDSS.common import SimulationType
+from PyDSS.dssElement import dssElement
+from PyDSS.parameter_cache import invalidate_all, invalidate_solution_parameters
+
+
+# Properties that change during a simulation without PyDSS setting them.
+STATE_PROPERTIES = {
+    "Capacitor": ("states",),
+    "Storage": ("%stored", "State"),
+    "Transformer": ("taps",),
+}
+
+# Elements with internal state that cannot be restored through their
+# properties. Circuits that contain them are compiled for each scenario.
+UNRESTORABLE_CLASSES = {
+    "ESPVLControl",
+    "ExpControl",
+    "Fuse",
+    "GenDispatcher",
+    "IndMach012",
+    "InvControl",
+    "Recloser",
+    "Relay",
+    "StorageController",
+    "SwtControl",
+    "UPFC",
+    "UPFCControl",
+}
+
+logger = logging.getLogger(__name__)
+
+_compiled_circuit = None
+
+
+def make_circuit_key(dss_file, settings):
+    """Return a key that identifies a compiled circuit. It changes if any file
+    in the directory of the DSS file changes.
+
+    Parameters
+    ----------
+    dss_file : Path
+    settings : SimulationSettingsModel
+
+    Returns
+    -------
+    tuple
+
+    """
+    files = []
+    for dirpath, _, filenames in os.walk(dss_file.parent):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            stat = os.stat(path)
+            files.append((path, stat.st_mtime_ns, stat.st_size))
+    files.sort()
+    return (
+        str(dss_file.resolve()),
+        settings.frequency.neglect_shunt_admittance,
+        tuple(files),
+    )
+
+
+def can_reuse_circuit(settings, scenario):
+    """Return True if a compiled circuit can be reused for a scenario and
+    restored after it runs.
+
+    Parameters
+    ----------
+    settings : SimulationSettingsModel
+    scenario : ScenarioModel
+
+    Returns
+    -------
+    bool
+
+    """
+    return settings.project.reuse_compiled_circuit and can_restore_circuit(settings, scenario)
+
+
+def can_restore_circuit(settings, scenario):
+    """Return True if a scenario leaves the circuit in a state that restore
+    can undo, as between Monte Carlo samples.
+
+    Parameters
+    ----------
+    settings : SimulationSettingsModel
+    scenario : ScenarioModel
+
+    Returns
+    -------
+    bool
+
+    """
+    return (
+        settings.project.simulation_type in (SimulationType.QSTS, SimulationType.SNAPSHOT) and
+        not settings.frequency.enable_frequency_sweep and
+        # These edit the circuit without SetParameter.
+        not settings.profiles.use_profile_manager and
+        not scenario.post_process_infos
+    )
+
+
+def get_compiled_circuit(key):
+    """Return the compiled circuit for key or None if it is not the current
+    circuit.
+
+    Returns
+    -------
+    CompiledCircuit | None
+
+    """
+    if _compiled_circuit is not None and _compiled_circuit.key == key:
+        if _compiled_circuit.is_loaded():
+            return _compiled_circuit
+        logger.info("The compiled circuit was cleared outside of PyDSS")
+    return None
+
+
+def set_compiled_circuit(circuit):
+    """Set the circuit to reuse in later scenarios. Pass None to compile the
+    next scenario.
+
+    Parameters
+    ----------
+    circuit : CompiledCircuit | None
+
+    """
+    global _compiled_circuit
+    _compiled_circuit = circuit
+
+
+class CompiledCircuit:
+    """A compiled circuit, the PyDSS objects for its elements, and the values
+    of its state properties after compilation."""
+
+    def __init__(self, key, dss_objects, dss_objects_by_class, dss_buses):
+        self.key = key
+        self.dss_objects = dss_objects
+        self.dss_objects_by_class = dss_objects_by_class
+        self.dss_buses = dss_buses
+        self._circuit_name = dss.Circuit.Name()
+        self._num_elements = dss.Circuit.NumCktElements()
+        self._state = self._read_state()
+        # Original values of properties edited with commands, such as by the
+        # network modifier, by (element name, property) in lowercase.
+        self._edits = {}
+        solution = dss.Solution
+        self._solution = (
+            solution.Mode(), solution.DblHour(), solution.Number(), solution.StepSize(),
+            solution.Convergence(), solution.MaxIterations(),
+        )
+
+    def is_loaded(self):
+        """Return True if OpenDSS still has this circuit."""
+        try:
+            return (
+                dss.Basic.NumCircuits() > 0 and
+                dss.Circuit.Name() == self._circuit_name and
+                dss.Circuit.NumCktElements() == self._num_elements
+            )
+        except DSSException as exc:
+            # OpenDSS reports errors of earlier calls on the next call.
+            logger.warning("Cannot reuse the compiled circuit: %s", exc)
+            return False
+
+    @property
+    def is_restorable(self):
+        """Return True if all state of the circuit can be restored."""
+        classes = {x[:-1] for x in self.dss_objects_by_class}
+        return not classes.intersection(UNRESTORABLE_CLASSES)
+
+    def record_edit(self, name, prop):
+        """Record the value of a property before a command edits it so that
+        restore can undo the edit. Edits through dssElement.SetParameter are
+        recorded by the element.
+
+        Parameters
+        ----------
+        name : str
+            Full name of the element
+        prop : str
+
+        """
+        key = (name.lower(), prop.lower())
+        if key in self._edits:
+            return
+        dss.Circuit.SetActiveElement(name)
+        invalidate_active_objects()
+        if dss.Element.Name().lower() != name.lower():
+            logger.warning("Cannot record the edit of unknown element %s", name)
+            return
+        self._edits[key] = (name, prop, dss.Properties.Value(prop))
+
+    @staticmethod
+    def _read_state():
+        state = []
+        for class_name, properties in STATE_PROPERTIES.items():
+            dss.Circuit.SetActiveClass(class_name)
+            flag = dss.ActiveClass.First()
+            while flag > 0:
+                name = dss.CktElement.Name()
+                for prop in properties:
+                    state.append((name, prop, dss.Properties.Value(prop)))
+                flag = dss.ActiveClass.Next()
+        return state
+
+    def restore(self):
+        """Restore the circuit to its state after compilation."""
+        for obj in self.dss_objects.iter_created():
+            if isinstance(obj, dssElement):
+                obj.RestoreParameters()
+        for name, prop, value in itertools.chain(self._edits.values(), self._state):
+            if ' ' in value and not value.startswith(('[', '(', '{', '"')):
+                value = f'"{value}"'
+            reply = dss.utils.run_command(f"{name}.{prop}={value}")
+            if reply != "":
+                logger.warning("Failed to restore %s.%s: %s", name, prop, reply)
+        self._edits.clear()
+        invalidate_active_objects()
+        invalidate_all()
+        dss.CtrlQueue.ClearQueue()
+        # Resets monitors, meters, faults, and controls.
+        dss.utils.run_command("Reset")
+
+        # Solve as the DSS file did so that the solution starts from the same
+        # point. Changing the time alone does not update the load shapes.
+        mode, hour, number, step_size, convergence, max_iterations = self._solution
+        dss.Solution.Mode(mode)
+        dss.Solution.DblHour(hour)
+        dss.Solution.Number(number)
+        dss.Solution.StepSize(step_size)
+        dss.Solution.Convergence(convergence)
+        dss.Solution.MaxIterations(max_iterations)
+        dss.Solution.Solve()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
+        logger.debug("Restored the state of the compiled circuit")
@@ -1,12 +1,13 @@
 """Contains DatasetBuffer"""
 
 import logging
+import threading
 
 import numpy as np
 import pandas as pd
 
-from PyDSS.common import DatasetPropertyType
-from PyDSS.exceptions import InvalidConfiguration
+from PyDSS.common import DatasetPropertyType, HdfCompression
+from PyDSS.exceptions import InvalidConfiguration, InvalidParameter
 from PyDSS.utils.utils import make_timestamps
 
 
@@ -23,14 +24,96 @@ GiB = MiB * MiB
 # entire chunk to be read.
 DEFAULT_MAX_CHUNK_BYTES = 1 * MiB
 
+# Maximum compression level by codec.
+_MAX_COMPRESSION_LEVELS = {
+    HdfCompression.GZIP: 9,
+    HdfCompression.BLOSC: 9,
+    HdfCompression.ZSTD: 22,
+}
+
 logger = logging.getLogger(__name__)
 
 
+def make_compression_kwargs(codec, level=None, shuffle=True):
+    """Return the keyword arguments to pass to h5py create_dataset for a codec.
+
+    Parameters
+    ----------
+    codec : HdfCompression
+    level : int | None
+        Compression level; uses the codec default if None. Ignored by codecs
+        without levels.
+    shuffle : bool
+        Apply the byte-shuffle filter before compression.
+
+    Returns
+    -------
+    dict
+
+    Raises
+    ------
+    InvalidConfiguration
+        Raised if the level is invalid or if the codec requires the
+        hdf5plugin package and it is not installed.
+
+    """
+    max_level = _MAX_COMPRESSION_LEVELS.get(codec)
+    if level is not None and max_level is not None and not 0 <= level <= max_level:
+        raise InvalidConfiguration(f"{codec.value} compression level must be between 0 and {max_level}")
+
+    if codec == HdfCompression.NONE:
+        return {}
+    if codec == HdfCompression.LZF:
+        return {"compression": "lzf", "shuffle": shuffle}
+    if codec == HdfCompression.GZIP:
+        return {"compression": "gzip", "compression_opts": 4 if level is None else level, "shuffle": shuffle}
+
+    try:
+        import hdf5plugin
+    except ImportError:
+        raise InvalidConfiguration(f"{codec.value} compression requires the hdf5plugin package")
+
+    if codec == HdfCompression.BLOSC:
+        # Blosc applies its own shuffle.
+        return dict(hdf5plugin.Blosc(
+            cname="lz4",
+            clevel=5 if level is None else level,
+            shuffle=hdf5plugin.Blosc.SHUFFLE if shuffle else hdf5plugin.Blosc.NOSHUFFLE,
+        ))
+    if codec == HdfCompression.ZSTD:
+        kwargs = dict(hdf5plugin.Zstd(clevel=3 if level is None else level))
+        kwargs["shuffle"] = shuffle
+        return kwargs
+
+    raise InvalidConfiguration(f"unsupported compression codec {codec}")
+
+
+def _get_compression_kwargs(compression, default):
+    if compression is None:
+        return default
+    return make_compression_kwargs(compression.codec, level=compression.level, shuffle=compression.shuffle)
+
+
+DEFAULT_COMPRESSION_KWARGS = make_compression_kwargs(HdfCompression.GZIP, level=4)
+
+
 class DatasetBuffer:
     """Provides a write buffer to an HDF dataset to increase performance.
     Users must call flush_data before the object goes out of scope to ensure
     that all data is flushed.
 
+    The dataset is resizable. max_size is the expected number of rows and only
+    determines the chunk size; the dataset holds exactly the rows written.
+
+    If writer is an instance of AsyncHdfWriter, flush_data hands the full
+    buffer to the writer thread and continues with a second buffer. Users must
+    drain or close the writer before reading the dataset.
+
+    compression applies to the data and metadata_compression to the datasets
+    that describe it (columns, names, column ranges). Both are instances of
+    HdfCompressionModel. The defaults are gzip level 4 with shuffle for the
+    data and no compression for the metadata.
+
     """
     # TODO add support for context manager, though PyDSS wouldn't be able to
     # take advantage in its current implementation.
@@ -38,7 +121,8 @@ class DatasetBuffer:
     def __init__(
             self, hdf_store, path, max_size, dtype, columns, scaleoffset=None,
             max_chunk_bytes=None, attributes=None, names=None,
-            column_ranges_per_name=None, data=None
+            column_ranges_per_name=None, data=None, writer=None,
+            compression=None, metadata_compression=None,
         ):
         if max_chunk_bytes is None:
             max_chunk_bytes = DEFAULT_MAX_CHUNK_BYTES
@@ -53,25 +137,31 @@ class DatasetBuffer:
                 dtype,
                 max_chunk_bytes,
             )
-            shape = (self._max_size, num_columns)
+            # max_size only sizes the chunks. The dataset starts empty and
+            # grows as rows are flushed because callers can write more or
+            # fewer rows than they expect, such as with frequency sweeps or
+            # repeated HELICS iterations.
+            shape = (0, num_columns)
+            maxshape = (None, num_columns)
             chunks = (self.chunk_count, num_columns)
         else:
             self.chunk_count = None
             shape = None
+            maxshape = None
             chunks = None
 
         self._dataset = self._hdf_store.create_dataset(
             name=path,
             shape=shape,
+            maxshape=maxshape,
             data=data,
             chunks=chunks,
             dtype=dtype,
-            compression="gzip",
-            compression_opts=4,
-            shuffle=True,
             # Does not preserve NaN, so don't use it.
             #scaleoffset=scaleoffset,
+            **_get_compression_kwargs(compression, DEFAULT_COMPRESSION_KWARGS),
         )
+        metadata_kwargs = _get_compression_kwargs(metadata_compression, {})
 
         # Columns, names, and column_ranges_per_name can't be stored as
         # attributes because they can exceed the size limit. Store as datasets
@@ -80,6 +170,7 @@ class DatasetBuffer:
         column_dataset = self._hdf_store.create_dataset(
             name=column_dataset_path,
             data=np.array(columns, dtype="S"),
+            **metadata_kwargs,
         )
         column_dataset.attrs["type"] = DatasetPropertyType.METADATA.value
         self._dataset.attrs["column_dataset_path"] = column_dataset_path
@@ -89,6 +180,7 @@ class DatasetBuffer:
             name_dataset = self._hdf_store.create_dataset(
                 name = name_dataset_path,
                 data = np.array(names, dtype="S"),
+                **metadata_kwargs,
             )
             name_dataset.attrs["type"] = DatasetPropertyType.METADATA.value
             self._dataset.attrs["name_dataset_path"] = name_dataset_path
@@ -98,6 +190,7 @@ class DatasetBuffer:
             column_ranges_dataset = self._hdf_store.create_dataset(
                 name=column_ranges_dataset_path,
                 data=column_ranges_per_name,
+                **metadata_kwargs,
             )
             column_ranges_dataset.attrs["type"] = DatasetPropertyType.METADATA.value
             self._dataset.attrs["column_ranges_dataset_path"] = column_ranges_dataset_path
@@ -105,6 +198,13 @@ class DatasetBuffer:
         self._dataset.attrs["length"] = 0
         self._dataset_index = 0
         self._buf = np.empty(chunks, dtype=dtype)
+        # With an AsyncHdfWriter, fill one buffer while the writer thread
+        # writes the other.
+        self._writer = writer
+        if writer is not None:
+            self._spare_buf = np.empty(chunks, dtype=dtype)
+            self._spare_buf_is_free = threading.Event()
+            self._spare_buf_is_free.set()
 
         if attributes is not None:
             for attr, val in attributes.items():
@@ -123,15 +223,38 @@ class DatasetBuffer:
         if length == 0:
             return
 
-        new_index = self._dataset_index + length
-        self._dataset[self._dataset_index:new_index] = self._buf[0:length]
+        start = self._dataset_index
+        new_index = start + length
+        if self._writer is None:
+            self._write_buffer(self._buf, start, new_index)
+        else:
+            # Wait for the writer to release the previous buffer, then swap.
+            self._spare_buf_is_free.wait()
+            buf = self._buf
+            self._buf = self._spare_buf
+            self._spare_buf = buf
+            self._spare_buf_is_free.clear()
+            self._writer.submit(self._write_buffer_async, buf, start, new_index)
         self._buf_index = 0
         self._dataset_index = new_index
-        self._dataset.attrs["length"] = new_index
+
+    def _write_buffer(self, buf, start, end):
+        # Each flush grows the dataset by at most one chunk and leaves it
+        # trimmed to the rows written.
+        self._dataset.resize(end, axis=0)
+        self._dataset[start:end] = buf[0:end - start]
+        self._dataset.attrs["length"] = end
         self._dataset.flush()
 
+    def _write_buffer_async(self, buf, start, end):
+        try:
+            self._write_buffer(buf, start, end)
+        finally:
+            self._spare_buf_is_free.set()
+
     def max_num_bytes(self):
-        """Return the maximum number of bytes the container could hold.
+        """Return the number of bytes the container would hold with max_size
+        rows. The dataset can grow beyond that.
 
         Returns
         -------
@@ -150,7 +273,11 @@ class DatasetBuffer:
 
     def write_data(self, values):
         """Write the data to the dataset."""
+        if self._writer is not None:
+            self._spare_buf_is_free.wait()
         new_index = self._dataset_index + len(values)
+        if new_index > len(self._dataset):
+            self._dataset.resize(new_index, axis=0)
         self._dataset[self._dataset_index:new_index] = values
         self._dataset_index = new_index
         self._dataset.attrs["length"] = new_index
@@ -224,7 +351,75 @@ class DatasetBuffer:
         return [x.decode("utf8") for x in name_dataset[:]]
 
     @staticmethod
-    def to_dataframe(dataset, column_range=None):
+    def search_sorted(dataset, value, side="left", column=0, cache=None):
+        """Find the row at which value would be inserted into a sorted column
+        of the dataset. Performs a binary search that only reads the chunks it
+        visits.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+        value : float
+        side : str
+            "left" or "right", same as numpy.searchsorted
+        column : int
+        cache : ChunkCache | None
+            If set, read chunks through the cache.
+
+        Returns
+        -------
+        int
+
+        """
+        if side not in ("left", "right"):
+            raise InvalidParameter(f"invalid side: {side}")
+        low = 0
+        high = dataset.attrs["length"]
+        while low < high:
+            mid = (low + high) // 2
+            if cache is None:
+                val = dataset[mid, column]
+            else:
+                val = cache.read(dataset, slice(mid, mid + 1), slice(column, column + 1))[0, 0]
+            if val < value or (side == "right" and val == value):
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    @staticmethod
+    def _make_row_slice(dataset, row_range):
+        length = dataset.attrs["length"]
+        if row_range is None:
+            return slice(0, length)
+        return slice(min(row_range[0], length), min(row_range[1], length))
+
+    @staticmethod
+    def read(dataset, rows, columns=None, cache=None):
+        """Read a two-dimensional slice of a dataset.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+        rows : slice
+        columns : slice | None
+            Defaults to all columns.
+        cache : ChunkCache | None
+            If set, read chunks through the cache.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        if cache is not None:
+            return cache.read(dataset, rows, columns)
+        if columns is None:
+            return dataset[rows]
+        return dataset[rows, columns]
+
+    @staticmethod
+    def to_dataframe(dataset, column_range=None, row_range=None, cache=None):
         """Create a pandas DataFrame from a dataset created with this class.
 
         Parameters
@@ -232,36 +427,44 @@ class DatasetBuffer:
         dataset : h5py.Dataset
         column_range : None | list
             first element is column start, second element is length
+        row_range : None | tuple
+            Read rows [start, end). Only the chunks holding those rows are read.
+        cache : ChunkCache | None
+            If set, read chunks through the cache.
 
         Returns
         -------
         pd.DataFrame
 
         """
-        length = dataset.attrs["length"]
+        rows = DatasetBuffer._make_row_slice(dataset, row_range)
         columns = DatasetBuffer.get_columns(dataset)
         if column_range is None:
-            return pd.DataFrame(dataset[:length], columns=columns)
+            return pd.DataFrame(DatasetBuffer.read(dataset, rows, cache=cache), columns=columns)
 
         start = column_range[0]
         end = start + column_range[1]
         return pd.DataFrame(
-            dataset[:length, start:end],
+            DatasetBuffer.read(dataset, rows, slice(start, end), cache=cache),
             columns=columns[start:end],
         )
 
     @staticmethod
-    def to_datetime(dataset):
+    def to_datetime(dataset, row_range=None, cache=None):
         """Create a pandas DatetimeIndex from a dataset.
 
         Parameters
         ----------
         dataset : h5py.Dataset
+        row_range : None | tuple
+            Read rows [start, end).
+        cache : ChunkCache | None
+            If set, read chunks through the cache.
 
         Returns
         -------
         pd.DatetimeIndex
 
         """
-        length = dataset.attrs["length"]
-        return make_timestamps(dataset[:length])
+        rows = DatasetBuffer._make_row_slice(dataset, row_range)
+        return make_timestamps(DatasetBuffer.read(dataset, rows, cache=cache))
@@ -1,4 +1,5 @@
 
+from PyDSS.active_object import BUS, set_active_object
 from PyDSS.dssObjectBase import dssObjectBase
 
 
@@ -43,9 +44,15 @@ class dssBus(dssObjectBase):
     }
     VARIABLE_OUTPUTS_COMPLEX = ()
 
+    _ACTIVE_KIND = BUS
+
+    # Shared by all instances.
+    _VARIABLE_TABLE = None
+
     def __init__(self, dssInstance):
         name = dssInstance.Bus.Name()
         super(dssBus, self).__init__(dssInstance, name, name)
+        set_active_object(self, BUS)
         self._Index = None
         self.XY = None
         self._Class = 'Bus'
@@ -54,17 +61,24 @@ class dssBus(dssObjectBase):
         self._NumTerminals = 1
         self._NumConductors = len(dssInstance.Bus.Nodes())
         self.Distance = dssInstance.Bus.Distance()
-        BusVarDict = dssInstance.Bus.__dict__
-        for key in BusVarDict.keys():
-            try:
-                self._Variables[key] = getattr(dssInstance.Bus, key)
-            except:
-                self._Variables[key] = None
+        self._Variables = self._get_variable_table(dssInstance)
         if self.GetVariable('X') is not None:
             self.XY = [self.GetVariable('X'), self.GetVariable('Y')]
         else:
             self.XY = [0, 0]
 
+    @classmethod
+    def _get_variable_table(cls, dssInstance):
+        if cls._VARIABLE_TABLE is None:
+            table = {}
+            for key in dssInstance.Bus.__dict__.keys():
+                try:
+                    table[key] = getattr(dssInstance.Bus, key)
+                except:
+                    table[key] = None
+            cls._VARIABLE_TABLE = table
+        return cls._VARIABLE_TABLE
+
     @property
     def NumConductors(self):
         return self._NumConductors
@@ -78,5 +92,5 @@ class dssBus(dssObjectBase):
         return self._Nodes[:]
 
     def SetActiveObject(self):
-        if self._dssInstance.Bus.Name() != self._Name:
-            self._dssInstance.Circuit.SetActiveBus(self._Name)
+        self._dssInstance.Circuit.SetActiveBus(self._Name)
+        set_active_object(self, BUS)
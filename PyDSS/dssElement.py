@@ -1,5 +1,8 @@
 import ast
+import copy
 
+from PyDSS import parameter_cache
+from PyDSS.active_object import invalidate_active_objects, is_active_object, set_active_object
 from PyDSS.dssBus import dssBus
 from PyDSS.dssObjectBase import dssObjectBase
 from PyDSS.exceptions import InvalidParameter
@@ -48,6 +51,10 @@ class dssElement(dssObjectBase):
 
     _MAX_CONDUCTORS = 4
 
+    # Shared by all instances. See _get_parameter_table and _get_variable_table.
+    _PARAMETER_TABLES = {}
+    _VARIABLE_TABLES = {}
+
     def __init__(self, dssInstance):
         fullName = dssInstance.Element.Name()
         if dssInstance.CktElement.Name() != fullName:
@@ -55,11 +62,15 @@ class dssElement(dssObjectBase):
 
         self._Class, name = fullName.split('.', 1)
         super(dssElement, self).__init__(dssInstance, name, fullName)
+        set_active_object(self)
+        self._OriginalParameters = {}
+        # Converted parameter values by lowercase name. See GetParameter.
+        self._ParameterCache = {}
+        self._ParameterCacheEdits = None
         self._Enabled = dssInstance.CktElement.Enabled()
         if not self._Enabled:
             return
 
-        self._Parameters = {}
         self._NumTerminals = dssInstance.CktElement.NumTerminals()
         self._NumConductors = dssInstance.CktElement.NumConductors()
 
@@ -74,27 +85,50 @@ class dssElement(dssObjectBase):
             f"{self._Nodes} {self._NumTerminals} {self._NumConductors}"
 
         self._dssInstance = dssInstance
+        self._Parameters = self._get_parameter_table(self._Class, dssInstance)
+        self._Variables = self._get_variable_table(self._Class, dssInstance)
+        self.Bus = dssInstance.CktElement.BusNames()
+        self.BusCount = len(self.Bus)
+        self._sBus = None
 
-        PropertiesNames = self._dssInstance.Element.AllPropertyNames()
-        AS = range(len(PropertiesNames))
-        for i, PptName in zip(AS, PropertiesNames):
-            self._Parameters[PptName] = str(i)
+    @classmethod
+    def _get_parameter_table(cls, elem_class, dssInstance):
+        # All elements of a class have the same properties, so they share one table.
+        table = cls._PARAMETER_TABLES.get(elem_class)
+        if table is None:
+            PropertiesNames = dssInstance.Element.AllPropertyNames()
+            table = {PptName: str(i) for i, PptName in enumerate(PropertiesNames)}
+            cls._PARAMETER_TABLES[elem_class] = table
+        return table
 
-        CktElmVarDict = dssInstance.CktElement.__dict__
-        for VarName in dssInstance.CktElement.AllVariableNames():
-            CktElmVarDict[VarName] = None
+    @classmethod
+    def _get_variable_table(cls, elem_class, dssInstance):
+        # The names of state variables, such as those of PVSystems, are valid
+        # attributes but have no get function.
+        key = (elem_class, tuple(dssInstance.CktElement.AllVariableNames()))
+        table = cls._VARIABLE_TABLES.get(key)
+        if table is None:
+            table = {}
+            for VarName in dssInstance.CktElement.__dict__.keys():
+                try:
+                    table[VarName] = getattr(dssInstance.CktElement, VarName)
+                except:
+                    table[VarName] = None
+            for VarName in key[1]:
+                table[VarName] = None
+            cls._VARIABLE_TABLES[key] = table
+        return table
 
-        for key in CktElmVarDict.keys():
-            try:
-                self._Variables[key] = getattr(dssInstance.CktElement, key)
-            except:
-                self._Variables[key] = None
-        self.Bus = dssInstance.CktElement.BusNames()
-        self.BusCount = len(self.Bus)
-        self.sBus = []
-        for BusName in self.Bus:
-            self._dssInstance.Circuit.SetActiveBus(BusName)
-            self.sBus.append(dssBus(self._dssInstance))
+    @property
+    def sBus(self):
+        """Return the bus objects of the element's terminals. They are created
+        when first accessed."""
+        if self._sBus is None:
+            self._sBus = []
+            for BusName in self.Bus:
+                self._dssInstance.Circuit.SetActiveBus(BusName)
+                self._sBus.append(dssBus(self._dssInstance))
+        return self._sBus
 
     def GetInfo(self):
         return self._Class, self._Name
@@ -126,8 +160,7 @@ class dssElement(dssObjectBase):
             return 0, None
 
     def GetValue(self, VarName, convert=False):
-        if self._dssInstance.Element.Name() != self._FullName:
-            self.SetActiveObject()
+        self._Activate()
         if VarName in self._Variables:
             VarValue = self.GetVariable(VarName, convert=convert)
         elif VarName in self._Parameters:
@@ -141,30 +174,89 @@ class dssElement(dssObjectBase):
     def SetActiveObject(self):
         self._dssInstance.Circuit.SetActiveElement(self._FullName)
         if self._dssInstance.CktElement.Name() != self._dssInstance.Element.Name():
+            invalidate_active_objects()
             raise InvalidParameter('Object is not a circuit element')
+        set_active_object(self)
 
     def SetParameter(self, Param, Value):
+        if Param not in self._OriginalParameters:
+            self._OriginalParameters[Param] = self._GetRawParameter(Param)
+        # An edit can change other parameters of this element and, through
+        # controls, solution parameters of other elements.
+        self._ParameterCache.clear()
+        parameter_cache.invalidate_solution_parameters()
         reply = self._dssInstance.utils.run_command(self._FullName + '.' + Param + ' = ' + str(Value))
         if reply != "":
+            invalidate_active_objects()
             raise Exception(f"SetParameter failed: {reply}")
+        # Editing an element makes it active.
+        set_active_object(self)
         return self.GetParameter(Param)
 
-    def GetParameter(self, Param):
-        if self._dssInstance.Element.Name() != self._FullName:
+    def RestoreParameters(self):
+        """Restore the parameters changed with SetParameter to the values they
+        had before the first change."""
+        if self._OriginalParameters:
+            self._ParameterCache.clear()
+            parameter_cache.invalidate_solution_parameters()
+        for Param, Value in self._OriginalParameters.items():
+            if Value is None:
+                continue
+            if ' ' in Value and not Value.startswith(('[', '(', '{', '"')):
+                Value = f'"{Value}"'
+            reply = self._dssInstance.utils.run_command(self._FullName + '.' + Param + ' = ' + Value)
+            if reply != "":
+                invalidate_active_objects()
+                raise Exception(f"RestoreParameters failed: {reply}")
+            set_active_object(self)
+        self._OriginalParameters.clear()
+
+    def _GetRawParameter(self, Param):
+        if not is_active_object(self):
             self._dssInstance.Circuit.SetActiveElement(self._FullName)
-        if self._dssInstance.Element.Name() == self._FullName:
-            # This always returns a string.
-            # The real value could be a number, a list of numbers, or a string.
-            x = self._dssInstance.Properties.Value(Param)
-            try:
-                return float(x)
-            except ValueError:
-                try:
-                    return ast.literal_eval(x)
-                except (SyntaxError, ValueError):
-                    return x
+            if self._dssInstance.Element.Name() != self._FullName:
+                invalidate_active_objects()
+                return None
+            set_active_object(self)
+        return self._dssInstance.Properties.Value(Param)
+
+    def GetParameter(self, Param):
+        """Return the value of a parameter as a number, a Python literal, or a
+        string. Values are cached until the parameter may have changed. See
+        PyDSS.parameter_cache.
+
+        """
+        num_edits, num_solutions = parameter_cache.get_generation()
+        if self._ParameterCacheEdits != num_edits:
+            self._ParameterCache.clear()
+            self._ParameterCacheEdits = num_edits
+        key = Param.lower()
+        entry = self._ParameterCache.get(key)
+        if entry is not None and entry[1] in (None, num_solutions):
+            value = entry[0]
         else:
-            return None
+            x = self._GetRawParameter(Param)
+            if x is None:
+                return None
+            value = self._ConvertParameter(x)
+            solution = None if key in parameter_cache.STATIC_PARAMETERS else num_solutions
+            self._ParameterCache[key] = (value, solution)
+        if isinstance(value, (float, str)):
+            return value
+        # Callers may modify lists.
+        return copy.deepcopy(value)
+
+    @staticmethod
+    def _ConvertParameter(x):
+        # This always receives a string.
+        # The real value could be a number, a list of numbers, or a string.
+        try:
+            return float(x)
+        except ValueError:
+            try:
+                return ast.literal_eval(x)
+            except (SyntaxError, ValueError):
+                return x
 
     @property
     def Conductors(self):
@@ -1,4 +1,6 @@
+from collections.abc import MutableMapping
 
+from PyDSS.active_object import invalidate_active_objects
 from PyDSS.dssTransformer import dssTransformer
 from PyDSS.dssElement import dssElement
 
@@ -9,3 +11,60 @@ def create_dss_element(element_class, element_name, dss_instance):
         return dssTransformer(dss_instance)
     else:
         return dssElement(dss_instance)
+
+
+def create_dss_element_by_name(full_name, dss_instance):
+    """Activate the element with full_name and instantiate its class."""
+    invalidate_active_objects()
+    dss_instance.Circuit.SetActiveElement(full_name)
+    element_class, element_name = full_name.split(".", 1)
+    return create_dss_element(element_class, element_name, dss_instance)
+
+
+class LazyObjectDict(MutableMapping):
+    """Maps names to PyDSS objects that are created when first accessed.
+
+    Iterating over the keys does not create objects. Accessing a value, such
+    as through values() or items(), creates it.
+
+    """
+
+    def __init__(self, names, factory):
+        """Constructor for LazyObjectDict
+
+        Parameters
+        ----------
+        names : iterable
+            Names of the objects, in order
+        factory : callable
+            Called with a name to create its object
+
+        """
+        self._objects = dict.fromkeys(names)
+        self._factory = factory
+
+    def __getitem__(self, name):
+        obj = self._objects[name]
+        if obj is None:
+            obj = self._factory(name)
+            self._objects[name] = obj
+        return obj
+
+    def __setitem__(self, name, obj):
+        self._objects[name] = obj
+
+    def __delitem__(self, name):
+        del self._objects[name]
+
+    def __contains__(self, name):
+        return name in self._objects
+
+    def __iter__(self):
+        return iter(self._objects)
+
+    def __len__(self):
+        return len(self._objects)
+
+    def iter_created(self):
+        """Return an iterator over the objects that have been created."""
+        return (x for x in self._objects.values() if x is not None)
@@ -1,7 +1,7 @@
 from PyDSS.common import SimulationType
 from PyDSS.simulation_input_models import SimulationSettingsModel
 from PyDSS.pyContrReader import read_controller_settings_from_registry
-from PyDSS.dssElementFactory import create_dss_element
+from PyDSS.dssElementFactory import LazyObjectDict, create_dss_element, create_dss_element_by_name
 from PyDSS.utils.utils import make_human_readable_size
 from PyDSS.pyContrReader import pyContrReader as pcr
 from PyDSS.pyPlotReader import pyPlotReader as ppr
@@ -25,6 +25,15 @@ from PyDSS.simulation_input_models import SimulationSettingsModel
 from PyDSS.utils.simulation_utils import SimulationFilteredTimeRange
 from PyDSS.utils.timing_utils import TimerStatsCollector, Timer
 from PyDSS.get_snapshot_timepoints import get_snapshot_timepoint
+from PyDSS.active_object import (
+    enable_active_object_verification, invalidate_active_objects, set_active_object,
+)
+from PyDSS.circuit_metadata import clear_circuit_model, set_circuit_model
+from PyDSS.compiled_circuit import (
+    CompiledCircuit, can_restore_circuit, can_reuse_circuit, get_compiled_circuit,
+    make_circuit_key, set_compiled_circuit,
+)
+from PyDSS.parameter_cache import invalidate_all
 
 import opendssdirect as dss
 import numpy as np
@@ -50,6 +59,7 @@ class OpenDSS:
         self._dssObjectsByClass = {}
         self._DelFlag = 0
         self._pyPlotObjects = {}
+        self._monteCarlo = None
         self.BokehSessionID = None
         self._settings = settings
         self._convergenceErrors = 0
@@ -92,8 +102,22 @@ class OpenDSS:
         for key, path in self._dssPath.items():
             assert (os.path.exists(path)), '{} path: {} does not exist!'.format(key, path)
 
-        with Timer(self._stats, "CompileModel"):
-            self._CompileModel()
+        enable_active_object_verification(settings.project.verify_active_object)
+        active_scenario = self._GetActiveScenario()
+        circuit_key = make_circuit_key(self._dssPath['dssFilePath'], settings)
+        reuse_circuit = can_reuse_circuit(settings, active_scenario)
+        self._circuit = get_compiled_circuit(circuit_key) if reuse_circuit else None
+        if self._circuit is None:
+            with Timer(self._stats, "CompileModel"):
+                self._CompileModel()
+            if settings.project.cache_circuit_metadata:
+                set_circuit_model(self._dssPath['dssFilePath'], self._dssPath['Export'])
+            else:
+                clear_circuit_model()
+        else:
+            self._Logger.info("Reusing the compiled OpenDSS model")
+            with Timer(self._stats, "RestoreModel"):
+                self._circuit.restore()
 
         #run_command('Set DefaultBaseFrequency={}'.format(settings.frequency.fundamental_frequency))
         self._Logger.info('OpenDSS fundamental frequency set to :  ' + str(settings.frequency.fundamental_frequency) + ' Hz')
@@ -102,7 +126,6 @@ class OpenDSS:
         if settings.frequency.neglect_shunt_admittance:
             run_command('Set NeglectLoadY=Yes')
 
-        active_scenario = self._GetActiveScenario()
         if active_scenario.snapshot_time_point_selection_config.mode != SnapshotTimePointSelectionMode.NONE:
             with Timer(self._stats, "SetSnapshotTimePoint"):
                 self._SetSnapshotTimePoint(active_scenario)
@@ -113,10 +136,24 @@ class OpenDSS:
         self._dssClass = self._dssInstance.ActiveClass
         self._dssCommand = run_command
         self._dssSolution = self._dssInstance.Solution
+        if self._circuit is None:
+            self._UpdateDictionary()
+            self._CreateBusObjects()
+            self._circuit = CompiledCircuit(
+                circuit_key, self._dssObjects, self._dssObjectsByClass, self._dssBuses
+            )
+        else:
+            self._dssObjects = self._circuit.dss_objects
+            self._dssObjectsByClass = self._circuit.dss_objects_by_class
+            self._dssBuses = self._circuit.dss_buses
+        # The circuit becomes reusable only after a scenario completes in it.
+        set_compiled_circuit(None)
+        self._reuse_circuit = reuse_circuit and self._circuit.is_restorable
+        self._can_restore_circuit = can_restore_circuit(settings, active_scenario) and \
+            self._circuit.is_restorable
+        self._num_samples_run = 0
         self._dssSolver = SolveMode.GetSolver(settings=settings, dssInstance=self._dssInstance)
-        self._Modifier = Modifier(self._dssInstance, run_command, settings)
-        self._UpdateDictionary()
-        self._CreateBusObjects()
+        self._Modifier = Modifier(self._dssInstance, run_command, settings, self._circuit)
         self._dssSolver.reSolve()
 
         if settings.profiles.use_profile_manager:
@@ -124,6 +161,7 @@ class OpenDSS:
             self._Logger.info('Disabling internal yearly and duty-cycle profiles.')
             for m in ["Loads", "PVSystem", "Generator", "Storage"]:
                 run_command(f'BatchEdit {m}..* yearly=NONE duty=None')
+            invalidate_all()
             profileSettings = self._settings.profiles.settings
             profileSettings["objects"] = self._dssObjects
             self.profileStore = ProfileInterface.Create(
@@ -156,10 +194,16 @@ class OpenDSS:
         if settings.helics.co_simulation_mode:
             self._HI = HI.helics_interface(self._dssSolver, self._dssObjects, self._dssObjectsByClass, settings,
                                            self._dssPath)
+        # Initialization activates elements and buses and runs commands
+        # through OpenDSS.
+        invalidate_active_objects()
+        invalidate_all()
         self._Logger.info("Simulation initialization complete")
         return
 
     def _CompileModel(self):
+        invalidate_active_objects()
+        invalidate_all()
         self._dssInstance.Basic.ClearAll()
         self._dssInstance.utils.run_command('Log=NO')
         run_command('Clear')
@@ -274,6 +318,10 @@ class OpenDSS:
                 element_name = self._dssInstance.CktElement.Name()
                 controller_name = 'Controller.' + element_name
                 if controller_name in self._pyControls:
+                    element = self._dssObjects.get(element_name)
+                    if element is not None:
+                        # The iteration activated the controlled element.
+                        set_active_object(element)
                     controller = self._pyControls[controller_name]
                     error = controller.Update(Priority, Time, UpdateResults)
                     maxError = error if error > maxError else maxError
@@ -292,41 +340,42 @@ class OpenDSS:
                             json_object = json.dumps(errorTag)
                             self._reportsLogger.warning(json_object)
                 elm = self._dssInstance.ActiveClass.Next()
+        invalidate_active_objects()
         return maxError < self._settings.project.error_tolerance, maxError
 
     def _CreateBusObjects(self):
         BusNames = self._dssCircuit.AllBusNames()
         self._dssInstance.run_command('New  Fault.DEFAULT Bus1={} enabled=no r=0.01'.format(BusNames[0]))
-        for BusName in BusNames:
-            self._dssCircuit.SetActiveBus(BusName)
-            self._dssBuses[BusName] = dssBus(self._dssInstance)
+        invalidate_active_objects()
+        self._dssBuses = LazyObjectDict(BusNames, self._CreateBusObject)
+        self._dssObjectsByClass['Buses'] = self._dssBuses
         return
 
+    def _CreateBusObject(self, BusName):
+        self._dssCircuit.SetActiveBus(BusName)
+        return dssBus(self._dssInstance)
+
     def _UpdateDictionary(self):
         InvalidSelection = ['Settings', 'ActiveClass', 'dss', 'utils', 'PDElements', 'XYCurves', 'Bus', 'Properties']
         # TODO: this causes a segmentation fault. Aadil says it may not be needed.
         #self._dssObjectsByClass={'LoadShape': self._GetRelaventObjectDict('LoadShape')}
 
-        for ElmName in self._dssInstance.Circuit.AllElementNames():
-            Class, Name =  ElmName.split('.', 1)
-            if Class + 's' not in self._dssObjectsByClass:
-                self._dssObjectsByClass[Class + 's'] = {}
-            self._dssInstance.Circuit.SetActiveElement(ElmName)
-            self._dssObjectsByClass[Class + 's'][ElmName] = create_dss_element(Class, Name, self._dssInstance)
-            self._dssObjects[ElmName] = self._dssObjectsByClass[Class + 's'][ElmName]
-
-        for ObjName in self._dssObjects.keys():
-            Class = ObjName.split('.')[0] + 's'
-            if Class not in self._dssObjectsByClass:
-                self._dssObjectsByClass[Class] = {}
-            if  ObjName not in self._dssObjectsByClass[Class]:
-                self._dssObjectsByClass[Class][ObjName] = self._dssObjects[ObjName]
+        # Element objects are created when first accessed, such as by an
+        # export, a controller, or a plot. The objects by class share them.
+        ElmNames = self._dssInstance.Circuit.AllElementNames()
+        self._dssObjects = LazyObjectDict(
+            ElmNames, lambda x: create_dss_element_by_name(x, self._dssInstance)
+        )
+        NamesByClass = {}
+        for ElmName in ElmNames:
+            NamesByClass.setdefault(ElmName.split('.', 1)[0] + 's', []).append(ElmName)
+        for Class, Names in NamesByClass.items():
+            self._dssObjectsByClass[Class] = LazyObjectDict(Names, self._dssObjects.__getitem__)
 
         self._dssObjects['Circuit.' + self._dssCircuit.Name()] = dssCircuit(self._dssInstance)
         self._dssObjectsByClass['Circuits'] = {
             'Circuit.' + self._dssCircuit.Name(): self._dssObjects['Circuit.' + self._dssCircuit.Name()]
         }
-        self._dssObjectsByClass['Buses'] = self._dssBuses
 
         return
 
@@ -444,9 +493,13 @@ class OpenDSS:
     def initStore(self, hdf_store, Steps, MC_scenario_number=None):
         self.ResultContainer.InitializeDataStore(hdf_store, Steps, MC_scenario_number)
 
-    def RunSimulation(self, project, scenario, MC_scenario_number=None):
+    def RunSimulation(self, project, scenario, MC_scenario_number=None, export_metadata=True):
         """Yields a tuple of the results of each step.
 
+        Set export_metadata to False to skip writing the metadata, event log,
+        and element files, such as when another process writes them for the
+        same scenario.
+
         Yields
         ------
         tuple
@@ -486,6 +539,8 @@ class OpenDSS:
         step = 0
         has_converged = False
         current_results = {}
+        # Don't reuse the circuit in another scenario if this one fails.
+        set_compiled_circuit(None)
         try:
             while step < Steps:
                 pydss_has_converged = True
@@ -543,7 +598,7 @@ class OpenDSS:
             for postprocessor in postprocessors:
                 postprocessor.finalize()
 
-        if self._settings and self._settings.exports.export_results:
+        if self._settings and self._settings.exports.export_results and export_metadata:
             self.ResultContainer.ExportResults()
 
         self._stats.log_stats(clear=True)
@@ -555,6 +610,8 @@ class OpenDSS:
             }
             self._reportsLogger.warning(json.dumps(data))
 
+        if self._reuse_circuit:
+            set_compiled_circuit(self._circuit)
         self._Logger.info('Simulation completed in %s seconds', time.time() - startTime)
         self._Logger.info('End of simulation')
         yield True, step, has_converged, current_results
@@ -563,6 +620,8 @@ class OpenDSS:
         for postprocessor in postprocessors:
             orig_step = step
             step, has_converged, error = postprocessor.run(step, Steps, simulation=self)
+            invalidate_active_objects()
+            invalidate_all()
             assert step <= orig_step, "step cannot increment in postprocessor"
             if not has_converged:
                 name = postprocessor.__class__.__name__
@@ -571,19 +630,87 @@ class OpenDSS:
 
         return step, has_converged
 
-    def RunMCsimulation(self, project, scenario, samples):
-        from PyDSS.Extensions.MonteCarlo import MonteCarloSim
-        MC = MonteCarloSim(self._settings, self._dssPath, self._dssObjects, self._dssObjectsByClass)
+    def RunMCsimulation(self, project, scenario, samples, seed=None):
+        """Run Monte Carlo samples one after another in this circuit.
+
+        Parameters
+        ----------
+        samples : int
+            Number of samples
+        seed : int | None
+            Seed of the samples. Defaults to the seed in the settings or a new
+            seed if that is not set.
+
+        """
+        from PyDSS.Extensions.MonteCarlo import make_seed
+        if seed is None:
+            seed = self._settings.monte_carlo.seed
+        if seed is None:
+            seed = make_seed()
+            self._Logger.info("Monte Carlo seed: %s", seed)
         for i in range(samples):
-            MC.Create_Scenario()
-            for is_complete, _, _, _ in self.RunSimulation(project, scenario, i):
-                if is_complete:
-                    break
+            self.RunMCSample(project, scenario, i, seed)
         return
 
+    def RunMCSample(self, project, scenario, sample_index, seed, export_metadata=True):
+        """Run one Monte Carlo sample from the start time of the simulation.
+
+        The circuit is compiled once. Before each sample after the first, the
+        circuit is restored to its state after compilation, and the sample
+        draws its values from a generator seeded with seed and sample_index,
+        so the results do not depend on the samples that ran before it in
+        this circuit. If can_restore_circuit is False, the sample starts from
+        the state that the previous sample left.
+
+        Returns
+        -------
+        float
+            Duration of the sample in seconds
+
+        """
+        from PyDSS.Extensions.MonteCarlo import MonteCarloSim, make_sample_random_state
+        start = time.time()
+        if self._monteCarlo is None:
+            self._monteCarlo = MonteCarloSim(
+                self._settings, self._dssPath, self._dssObjects, self._dssObjectsByClass
+            )
+        if self._num_samples_run > 0:
+            if self._can_restore_circuit:
+                self._circuit.restore()
+            else:
+                self._Logger.warning(
+                    "The circuit cannot be restored. The results of Monte Carlo sample %s "
+                    "depend on the samples before it.",
+                    sample_index,
+                )
+            self._dssSolver.reset()
+            # Solve at the start time as after compilation. Without it, the
+            # first step of the sample differs from one in a new circuit.
+            self._dssSolver.reSolve()
+        self._num_samples_run += 1
+        self._monteCarlo.Create_Scenario(random_state=make_sample_random_state(seed, sample_index))
+        # Solve the sampled circuit at the start time so that the first step
+        # does not report the solution of the previous sample.
+        self._dssSolver.reSolve()
+        for is_complete, _, _, _ in self.RunSimulation(
+                project, scenario, sample_index, export_metadata=export_metadata):
+            if is_complete:
+                break
+
+        duration = time.time() - start
+        self._Logger.info("Completed Monte Carlo sample %s in %.1f seconds", sample_index, duration)
+        return duration
+
+    @property
+    def can_restore_circuit(self):
+        """Return True if the circuit can be restored to its state after
+        compilation, as for the next Monte Carlo sample."""
+        return self._can_restore_circuit
+
     def _UpdatePlots(self):
         for Plot in self._pyPlotObjects:
             self._pyPlotObjects[Plot].UpdatePlot()
+            invalidate_active_objects()
         return
 
     def _GetActiveScenario(self):
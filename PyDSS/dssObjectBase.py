@@ -1,6 +1,7 @@
 
 import abc
  
+from PyDSS.active_object import ELEMENT, is_active_object
 from PyDSS.exceptions import InvalidParameter
 from PyDSS.value_storage import ValueByLabel, ValueByList, ValueByNumber
 
@@ -11,6 +12,9 @@ class dssObjectBase(abc.ABC):
     VARIABLE_OUTPUTS_BY_LIST = ()
     VARIABLE_OUTPUTS_COMPLEX = ()
 
+    # Kind of object for the active object tracker.
+    _ACTIVE_KIND = ELEMENT
+
     def __init__(self, dssInstance, name, fullName):
         self._Name = name
         self._FullName = fullName
@@ -31,11 +35,16 @@ class dssObjectBase(abc.ABC):
     def SetActiveObject(self):
         """Set the active DSS object."""
 
+    def _Activate(self):
+        """Set the active DSS object if it is not already active."""
+        if not is_active_object(self, self._ACTIVE_KIND):
+            self.SetActiveObject()
+
     def _get_labels(self, VarName):
         pass
 
     def DataLength(self, VarName):
-        self.SetActiveObject()
+        self._Activate()
         if VarName in self._Variables:
             VarValue = self.GetVariable(VarName)
         else:
@@ -53,7 +62,7 @@ class dssObjectBase(abc.ABC):
         return self._Name
 
     def GetValue(self, VarName, convert=False):
-        self.SetActiveObject()
+        self._Activate()
         if VarName in self._Variables:
             VarValue = self.GetVariable(VarName, convert=convert)
         else:
@@ -63,8 +72,7 @@ class dssObjectBase(abc.ABC):
     def GetVariable(self, VarName, convert=False):
         if VarName not in self._Variables:
             raise InvalidParameter(f'{VarName} is an invalid variable name for element {self._FullName}')
-        if self._dssInstance.Element.Name() != self._FullName:
-            self.SetActiveObject()
+        self._Activate()
         func = self._Variables[VarName]
         if func is None:
             raise InvalidParameter(f"get function for {self._FullName} / {VarName} is None")
@@ -94,12 +102,36 @@ class dssObjectBase(abc.ABC):
             self._CachedValueStorage[VarName] = cachedValue
         else:
             value = self.GetValue(VarName, convert=False)
-            if isinstance(cachedValue, ValueByNumber) and VarName in self.VARIABLE_OUTPUTS_COMPLEX:
-                value = complex(value[0], value[1])
-            cachedValue.set_value_from_raw(value)
+            self._set_cached_value_from_raw(cachedValue, VarName, value)
 
         return cachedValue
 
+    def SetValueFromRaw(self, VarName, value):
+        """Update the cached value for VarName with a raw value that was read
+        outside of this object, such as by ClassPropertyReader.
+
+        Parameters
+        ----------
+        VarName : str
+        value : list | np.ndarray | float
+
+        Returns
+        -------
+        ValueStorageBase
+
+        """
+        cachedValue = self._CachedValueStorage.get(VarName)
+        if cachedValue is None:
+            return self.UpdateValue(VarName)
+
+        self._set_cached_value_from_raw(cachedValue, VarName, value)
+        return cachedValue
+
+    def _set_cached_value_from_raw(self, cachedValue, VarName, value):
+        if isinstance(cachedValue, ValueByNumber) and VarName in self.VARIABLE_OUTPUTS_COMPLEX:
+            value = complex(value[0], value[1])
+        cachedValue.set_value_from_raw(value)
+
     def GetVariableNames(self):
         return self._Variables.keys()
 
@@ -118,8 +150,7 @@ class dssObjectBase(abc.ABC):
         return self._Name
 
     def SetVariable(self, VarName, Value):
-        if self._dssInstance.Element.Name() != self._FullName:
-            self.SetActiveObject()
+        self._Activate()
         if VarName not in self._Variables:
             raise InvalidParameter(f"invalid variable name {VarName}")
 
@@ -31,3 +31,7 @@ class PyDssConvergenceMaxError(Exception):
 
 class PyDssConvergenceErrorCountExceeded(Exception):
     """Raised when PyDSS exceeds the threshold of convergence error counts."""
+
+
+class ActiveObjectError(Exception):
+    """Raised when the object that PyDSS tracks as active is not active in OpenDSS."""
@@ -1,5 +1,6 @@
 import enum
 import logging
+import math
 import os
 import re
 from collections import defaultdict
@@ -69,6 +70,14 @@ class ExportListProperty:
         if self._is_max() and self._limits is not None:
             raise InvalidConfiguration("limits are not allowed with max types")
 
+        if self._store_values_type == StoreValuesType.ON_CHANGE and self._limits is not None:
+            raise InvalidConfiguration("limits are not allowed with on_change")
+
+        if not isinstance(self._sample_interval, int) or self._sample_interval < 1:
+            raise InvalidConfiguration(
+                f"sample_interval must be a positive integer: {self._sample_interval}"
+            )
+
     def _check_sum_groups(self, sum_groups_file):
         if sum_groups_file is not None:
             if self._sum_groups:
@@ -183,6 +192,8 @@ class ExportListProperty:
         """
         if self._limits is not None:
             return DatasetPropertyType.FILTERED
+        if self._store_values_type == StoreValuesType.ON_CHANGE:
+            return DatasetPropertyType.ON_CHANGE
         if self._store_values_type in \
                 (StoreValuesType.SUM, StoreValuesType.MAX,
                  StoreValuesType.MIN,
@@ -200,8 +211,8 @@ class ExportListProperty:
         )
         if self._store_values_type in singles:
             return 1
-        num_samples = num_steps / self._sample_interval
-        return int(num_samples)
+        # Values are sampled at time steps 0, sample_interval, 2 * sample_interval...
+        return int(math.ceil(num_steps / self._sample_interval))
 
     @property
     def limits(self):
@@ -236,6 +247,17 @@ class ExportListProperty:
         """
         return self._opendss_classes[:]
 
+    @property
+    def sample_interval(self):
+        """Return the number of time steps between stored values.
+
+        Returns
+        -------
+        int
+
+        """
+        return self._sample_interval
+
     def serialize(self):
         """Serialize object to a dictionary."""
         if self._are_names_regex:
@@ -301,11 +323,13 @@ class ExportListProperty:
 
     def should_store_time_step(self):
         """Return True if the time step should be stored with the value."""
-        return self.limits is not None
+        return self.limits is not None or self._store_values_type == StoreValuesType.ON_CHANGE
 
     @property
     def storage_name(self):
-        if self._store_values_type in (StoreValuesType.ALL, StoreValuesType.CHANGE_COUNT):
+        if self._store_values_type in (
+            StoreValuesType.ALL, StoreValuesType.CHANGE_COUNT, StoreValuesType.ON_CHANGE
+        ):
             return self.name
         if self._store_values_type == StoreValuesType.MOVING_AVERAGE:
             return self.name + "Avg"
@@ -456,6 +480,17 @@ class ExportListReader:
             if x.publish
         ]
 
+    @property
+    def sample_interval(self):
+        """Return the number of time steps between stored values.
+
+        Returns
+        -------
+        int
+
+        """
+        return self._sample_interval
+
     def serialize(self):
         """Serialize object to a dictionary."""
         data = defaultdict(list)
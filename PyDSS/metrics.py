@@ -8,17 +8,21 @@ from collections import namedtuple
 from datetime import timedelta
 from pathlib import Path
 
+import numpy as np
 import pandas as pd
 import opendssdirect as dss
 
+from PyDSS.active_object import invalidate_active_objects
+from PyDSS.class_property_reader import ClassPropertyReader
 from PyDSS.common import DataConversion, StoreValuesType
 from PyDSS.exceptions import InvalidConfiguration, InvalidParameter
 from PyDSS.reports.reports import ReportBase
 from PyDSS.storage_filters import STORAGE_TYPE_MAP, StorageFilterBase
-from PyDSS.value_storage import ValueByNumber, ValueStorageBase
+from PyDSS.value_storage import ValueByNumber, ValueColumns, ValueStorageBase
 from PyDSS.node_voltage_metrics import NodeVoltageMetrics
 from PyDSS.simulation_input_models import SimulationSettingsModel
 from PyDSS.thermal_metrics import ThermalMetrics
+from PyDSS.utils.dss_utils import get_node_kv_bases
 from PyDSS.utils.simulation_utils import get_start_time, get_simulation_resolution
 
 
@@ -32,6 +36,7 @@ class MetricBase(abc.ABC):
         self._name = prop.name
         self._base_path = None
         self._hdf_store = None
+        self._writer = None
         self._max_chunk_bytes = settings.exports.hdf_max_chunk_bytes
         self._num_steps = None
         self._properties = {}  # StoreValuesType to ExportListProperty
@@ -58,6 +63,21 @@ class MetricBase(abc.ABC):
     def append_values(self, time_step, store_nan=False):
         """Get the values for all elements at the current time step."""
 
+    def should_sample_value(self, time_step):
+        """Return True if any property needs a value at this time step.
+        Callers can skip append_values for the time step otherwise.
+
+        Parameters
+        ----------
+        time_step : int
+
+        Returns
+        -------
+        bool
+
+        """
+        return any(x.should_sample_value(time_step) for x in self._properties.values())
+
     def close(self):
         """Perform any final writes to the container."""
         for container in self.iter_containers():
@@ -75,11 +95,39 @@ class MetricBase(abc.ABC):
         for container in self.iter_containers():
             container.flush_data()
 
-    def initialize_data_store(self, hdf_store, base_path, num_steps):
-        """Initialize data store values."""
+    def initialize_data_store(self, hdf_store, base_path, num_steps, writer=None):
+        """Initialize data store values.
+
+        Parameters
+        ----------
+        hdf_store : h5py.File
+        base_path : str
+        num_steps : int
+        writer : AsyncHdfWriter | None
+            If set, write time-series data in a background thread.
+
+        """
         self._hdf_store = hdf_store
         self._base_path = base_path
         self._num_steps = num_steps
+        self._writer = writer
+        self._clear_containers()
+
+    def _clear_containers(self):
+        """Drop the containers of a previous data store, such as from an
+        earlier Monte Carlo sample. Subclasses create containers when they
+        append the first values.
+
+        """
+
+    def _make_report_path(self):
+        """Return the directory for report files of the current data store.
+        Each Monte Carlo sample has its own."""
+        # The data store's base path matches the directory of its exports,
+        # such as Exports/scenario_1 or Exports/scenario_1_MC0.
+        path = os.path.join(str(self._settings.project.active_project_path), self._base_path)
+        os.makedirs(path, exist_ok=True)
+        return path
 
     @staticmethod
     def is_circuit_wide():
@@ -95,6 +143,13 @@ class MetricBase(abc.ABC):
         return
         yield
 
+    def iter_class_readers(self):
+        """Return an iterator over the ClassPropertyReader instances that
+        read the metric's values. The caller can read them for all metrics
+        with read_class_properties before calling append_values."""
+        return
+        yield
+
     def label(self):
         """Return a label for the metric.
 
@@ -117,7 +172,9 @@ class MetricBase(abc.ABC):
         cls = STORAGE_TYPE_MAP[prop.store_values_type]
         values = [ValueByNumber(x.FullName, self.label(), 0.0) for x in self._dss_objs]
         container = cls(
-            self._hdf_store, path, prop, 1, self._max_chunk_bytes, values, elem_names
+            self._hdf_store, path, prop, 1, self._max_chunk_bytes, values, elem_names,
+            compression=self._settings.exports.hdf_compression,
+            metadata_compression=self._settings.exports.hdf_metadata_compression,
         )
         return container
 
@@ -143,6 +200,9 @@ class MetricBase(abc.ABC):
             max_chunk_bytes,
             values,
             elem_names,
+            writer=self._writer,
+            compression=self._settings.exports.hdf_compression,
+            metadata_compression=self._settings.exports.hdf_metadata_compression,
             **kwargs,
         )
         return container
@@ -174,6 +234,11 @@ class ChangeCountMetricBase(MetricBase, abc.ABC):
         self._last_values = {x.FullName: None for x in dss_objs}
         self._change_counts = {x.FullName: 0 for x in dss_objs}
 
+    def _clear_containers(self):
+        self._container = None
+        self._last_values = {x.FullName: None for x in self._dss_objs}
+        self._change_counts = {x.FullName: 0 for x in self._dss_objs}
+
     def append_values(self, time_step, store_nan=False):
         pass
 
@@ -197,6 +262,8 @@ class ChangeCountMetricBase(MetricBase, abc.ABC):
             self._max_chunk_bytes,
             values,
             [x.FullName for x in self._dss_objs],
+            compression=self._settings.exports.hdf_compression,
+            metadata_compression=self._settings.exports.hdf_metadata_compression,
         )
         self._container.append(values)
         self._container.flush_data()
@@ -217,6 +284,9 @@ class MultiValueTypeMetricBase(MetricBase, abc.ABC):
         super().__init__(prop, dss_objs, settings)
         self._containers = {}  # StoreValuesType to StorageFilterBase
 
+    def _clear_containers(self):
+        self._containers.clear()
+
     @abc.abstractmethod
     def _get_value(self, dss_obj, time_step):
         """Get a value at the current time step.
@@ -251,7 +321,19 @@ class MultiValueTypeMetricBase(MetricBase, abc.ABC):
                 vals,
             )
 
-    def append_values(self, time_step, store_nan=False):
+    def _get_values(self, time_step):
+        """Get the values for all elements at the current time step.
+
+        Parameters
+        ----------
+        time_step : int
+
+        Returns
+        -------
+        list
+            list of ValueStorageBase
+
+        """
         if self._can_use_native_iteration():
             self._elem_class.First()
             values = []
@@ -259,18 +341,30 @@ class MultiValueTypeMetricBase(MetricBase, abc.ABC):
                 dss_obj = self._name_to_dss_obj[self._elem_class.Name()]
                 values.append(self._get_value(dss_obj, time_step))
                 self._elem_class.Next()
+            invalidate_active_objects()
         else:
             values = [self._get_value(x, time_step) for x in self._dss_objs]
 
+        return values
+
+    def append_values(self, time_step, store_nan=False):
+        values = self._get_values(time_step)
+
         if not self._containers:
             self._initialize_containers(values)
 
         if store_nan:
-            for val in values:
-                val.set_nan()
+            if isinstance(values, ValueColumns):
+                values.set_nan()
+            else:
+                for val in values:
+                    val.set_nan()
 
+        vals = values
         for value_type, container in self._containers.items():
             prop = self._properties[value_type]
+            if not prop.should_sample_value(time_step):
+                continue
             if prop.data_conversion != DataConversion.NONE:
                 vals = [
                     convert_data(x.FullName, prop.name, y, prop.data_conversion)
@@ -294,12 +388,42 @@ class MultiValueTypeMetricBase(MetricBase, abc.ABC):
 class OpenDssPropertyMetric(MultiValueTypeMetricBase):
     """Stores metrics for any OpenDSS element property."""
 
+    def __init__(self, prop, dss_objs, settings):
+        super().__init__(prop, dss_objs, settings)
+        self._reader = None
+        self._values = None
+        self._columns = None
+
     def _get_value(self, dss_obj, _time_step):
         return dss_obj.UpdateValue(self._name)
 
+    def _get_values(self, time_step):
+        if self._reader is None:
+            # The first read creates the cached value objects for each element.
+            values = super()._get_values(time_step)
+            if self._can_use_native_iteration() and \
+                    ClassPropertyReader.is_supported(self._dss_objs[0], self._name):
+                self._reader = ClassPropertyReader(self._elem_class, self._name, self._dss_objs)
+                self._values = [x.UpdateValue(self._name) for x in self._dss_objs]
+            return values
+
+        buf = self._reader.read()
+        if self._columns is None:
+            # Bind the cached value objects to one array for the metric.
+            self._columns = ValueColumns(self._values, self._reader.offsets)
+        self._columns.set_value_from_raw(buf)
+        return self._columns
+
+    def iter_class_readers(self):
+        if self._reader is not None:
+            yield self._reader
+
     def append_values(self, time_step, store_nan=False):
-        curr_data = {}
         values = super().append_values(time_step, store_nan=store_nan)
+        if isinstance(values, ValueColumns):
+            return dict(zip(values.make_columns(), values.array))
+
+        curr_data = {}
         for _, value in zip(self._dss_objs, values):
             if len(value.make_columns()) > 1:
                 for column, val in zip(value.make_columns(), value.value):
@@ -367,6 +491,9 @@ class FeederHeadMetrics(MetricBase):
         self._feeder_head_line = None
         self._values = {}
 
+    def _clear_containers(self):
+        self._containers.clear()
+
     def _initialize_containers(self):
         assert len(self._properties) == 1, self._properties
         self._feeder_head_line = self._find_feeder_head_line()
@@ -459,13 +586,14 @@ class FeederHeadMetrics(MetricBase):
             yield container
 
 
-class SummedElementsOpenDssPropertyMetric(MetricBase):
-    """Sums all elements' values for a given property at each time point."""
+class SummedElementsMetricBase(MetricBase, abc.ABC):
+    """Base class for metrics that sum the values of elements."""
 
     def __init__(self, prop, dss_objs, settings):
         super().__init__(prop, dss_objs, settings)
-        self._container = None
         self._data_conversion = prop.data_conversion
+        self._reader = None
+        self._columns = None
 
     def _get_value(self, obj):
         value = obj.UpdateValue(self._name)
@@ -478,31 +606,75 @@ class SummedElementsOpenDssPropertyMetric(MetricBase):
             )
         return value
 
+    def _get_values(self):
+        """Get the values for all elements at the current time step.
+
+        Returns
+        -------
+        list
+            list of tuples of element name and ValueStorageBase
+
+        """
+        if self._reader is not None:
+            buf = self._reader.read()
+            if self._columns is None:
+                # Bind copies so that the elements' cached values stay owned
+                # by the metrics that store them.
+                self._columns = ValueColumns(
+                    [copy.deepcopy(x.UpdateValue(self._name)) for x in self._dss_objs],
+                    self._reader.offsets,
+                )
+            self._columns.set_value_from_raw(buf)
+            return zip((x.Name for x in self._dss_objs), self._columns)
+
+        if not self._can_use_native_iteration():
+            return [(x.Name, self._get_value(x)) for x in self._dss_objs]
+
+        values = []
+        self._elem_class.First()
+        for _ in range(self._elem_class.Count()):
+            name = self._elem_class.Name()
+            values.append((name, self._get_value(self._name_to_dss_obj[name])))
+            self._elem_class.Next()
+        invalidate_active_objects()
+        if self._data_conversion == DataConversion.NONE and \
+                ClassPropertyReader.is_supported(self._dss_objs[0], self._name):
+            self._reader = ClassPropertyReader(self._elem_class, self._name, self._dss_objs)
+        return values
+
+    def iter_class_readers(self):
+        if self._reader is not None:
+            yield self._reader
+
+    @staticmethod
+    def is_circuit_wide():
+        return True
+
+
+class SummedElementsOpenDssPropertyMetric(SummedElementsMetricBase):
+    """Sums all elements' values for a given property at each time point."""
+
+    def __init__(self, prop, dss_objs, settings):
+        super().__init__(prop, dss_objs, settings)
+        self._container = None
+
+    def _clear_containers(self):
+        self._container = None
+
     def append_values(self, time_step, store_nan=False):
         if store_nan:
             if self._can_use_native_iteration():
                 self._elem_class.First()
-            total = self._get_value(self._dss_objs[0])
+            total = copy.deepcopy(self._get_value(self._dss_objs[0]))
             total.set_nan()
         else:
             total = None
-            if self._can_use_native_iteration():
-                self._elem_class.First()
-                for _ in range(self._elem_class.Count()):
-                    dss_obj = self._name_to_dss_obj[self._elem_class.Name()]
-                    value = self._get_value(dss_obj)
-                    if total is None:
-                        total = value
-                    else:
-                        total += value
-                    self._elem_class.Next()
-            else:
-                for dss_obj in self._dss_objs:
-                    value = self._get_value(dss_obj)
-                    if total is None:
-                        total = value
-                    else:
-                        total += value
+            for _, value in self._get_values():
+                if total is None:
+                    # Don't modify the element's cached value.
+                    total = copy.deepcopy(value)
+                else:
+                    total += value
 
         if self._container is None:
             assert len(self._properties) == 1
@@ -519,15 +691,11 @@ class SummedElementsOpenDssPropertyMetric(MetricBase):
             )
         self._container.append_values([total], time_step)
 
-    @staticmethod
-    def is_circuit_wide():
-        return True
-
     def iter_containers(self):
         yield self._container
 
 
-class SummedElementsByGroupOpenDssPropertyMetric(MetricBase):
+class SummedElementsByGroupOpenDssPropertyMetric(SummedElementsMetricBase):
     """Sums all elements' values for a given property at each time point.
     Elements are separated into groups by name.
 
@@ -548,18 +716,9 @@ class SummedElementsByGroupOpenDssPropertyMetric(MetricBase):
                 for element_name in group_elems:
                     self._name_to_group[element_name] = group["name"]
 
-        self._data_conversion = prop.data_conversion
-
-    def _get_value(self, obj):
-        value = obj.UpdateValue(self._name)
-        if self._data_conversion != DataConversion.NONE:
-            value = convert_data(
-                "Total",
-                next(iter(self._properties.values())).name,
-                value,
-                self._data_conversion,
-            )
-        return value
+    def _clear_containers(self):
+        for group in self._containers:
+            self._containers[group] = None
 
     def append_values(self, time_step, store_nan=False):
         total_by_group = {x: None for x in self._containers}
@@ -567,28 +726,15 @@ class SummedElementsByGroupOpenDssPropertyMetric(MetricBase):
             for group in self._containers:
                 if self._can_use_native_iteration():
                     self._elem_class.First()
-                total_by_group[group] = self._get_value(self._dss_objs[0])
+                total_by_group[group] = copy.deepcopy(self._get_value(self._dss_objs[0]))
                 total_by_group[group].set_nan()
         else:
-            if self._can_use_native_iteration():
-                self._elem_class.First()
-                for _ in range(self._elem_class.Count()):
-                    name = self._elem_class.Name()
-                    group = self._name_to_group[name]
-                    dss_obj = self._name_to_dss_obj[name]
-                    value = self._get_value(dss_obj)
-                    if total_by_group[group] is None:
-                        total_by_group[group] = value
-                    else:
-                        total_by_group[group] += value
-                    self._elem_class.Next()
-            else:
-                for dss_obj in self._dss_objs:
-                    value = self._get_value(dss_obj)
-                    if total_by_group[group] is None:
-                        total_by_group[group] = value
-                    else:
-                        total_by_group[group] += value
+            for name, value in self._get_values():
+                group = self._name_to_group[name]
+                if total_by_group[group] is None:
+                    total_by_group[group] = copy.deepcopy(value)
+                else:
+                    total_by_group[group] += value
 
         if next(iter(self._containers.values())) is None:
             assert len(self._properties) == 1
@@ -608,10 +754,6 @@ class SummedElementsByGroupOpenDssPropertyMetric(MetricBase):
         for group in self._containers:
             self._containers[group].append_values([total_by_group[group]], time_step)
 
-    @staticmethod
-    def is_circuit_wide():
-        return True
-
     def iter_containers(self):
         return self._containers.values()
 
@@ -626,17 +768,21 @@ class NodeVoltageMetric(MetricBase):
         props = list(self._properties)
         assert len(props) == 1
         self._prop = props[0]
+        self._clear_containers()
+
+    def _clear_containers(self):
         # Indices for node names are tied to indices for node voltages.
         self._node_names = None
         self._voltages = None
-        start_time = get_start_time(settings)
-        sim_resolution = get_simulation_resolution(settings)
-        inputs = ReportBase.get_inputs_from_defaults(settings, "Voltage Metrics")
+        start_time = get_start_time(self._settings)
+        sim_resolution = get_simulation_resolution(self._settings)
+        inputs = ReportBase.get_inputs_from_defaults(self._settings, "Voltage Metrics")
         window_size = int(
             timedelta(minutes=inputs["window_size_minutes"]) / sim_resolution
         )
         self._voltage_metrics = NodeVoltageMetrics(
-            prop, start_time, sim_resolution, window_size, inputs["store_per_element_data"]
+            self._properties[self._prop], start_time, sim_resolution, window_size,
+            inputs["store_per_element_data"],
         )
         self._primary_node_names = []
         self._primary_indices = []
@@ -646,10 +792,8 @@ class NodeVoltageMetric(MetricBase):
     def _make_elem_names(self):
         return self._node_names
 
-    def _identify_primary_v_secondary(self):
-        for i, name in enumerate(self._node_names):
-            dss.Circuit.SetActiveBus(name)
-            kv_base = dss.Bus.kVBase()
+    def _identify_primary_v_secondary(self, kv_bases):
+        for i, (name, kv_base) in enumerate(zip(self._node_names, kv_bases)):
             if kv_base > self.PRIMARY_BUS_THRESHOLD_KV:
                 self._primary_node_names.append(name)
                 self._primary_indices.append(i)
@@ -661,8 +805,8 @@ class NodeVoltageMetric(MetricBase):
         voltages = dss.Circuit.AllBusMagPu()
         if self._voltages is None:
             # TODO: limit to objects that have been added
-            self._node_names = dss.Circuit.AllNodeNames()
-            self._identify_primary_v_secondary()
+            self._node_names, kv_bases = get_node_kv_bases()
+            self._identify_primary_v_secondary(kv_bases)
             self._voltages = [
                 ValueByNumber(x, "Voltage", y)
                 for x, y in zip(self._node_names, voltages)
@@ -683,12 +827,7 @@ class NodeVoltageMetric(MetricBase):
         self._voltage_metrics.increment_steps()
 
     def close(self):
-        path = os.path.join(
-            str(self._settings.project.active_project_path),
-            "Exports",
-            self._settings.project.active_scenario,
-        )
-        self._voltage_metrics.generate_report(path)
+        self._voltage_metrics.generate_report(self._make_report_path())
 
     @staticmethod
     def is_circuit_wide():
@@ -789,6 +928,9 @@ class OpenDssExportMetric(MetricBase):
     def __del__(self):
         shutil.rmtree(self._tmp_dir)
 
+    def _clear_containers(self):
+        self._containers.clear()
+
     def _run_command(self):
         cmd = f"{self.export_command()}"
         result = dss.utils.run_command(cmd)
@@ -1026,15 +1168,23 @@ class OverloadsMetricInMemory(OpenDssExportMetric):
     """Stores line and transformer loading percentages in memory."""
     def __init__(self, prop, dss_objs, settings):
         super().__init__(prop, dss_objs, settings)
+        self._make_thermal_metrics()
+
+    def _clear_containers(self):
+        super()._clear_containers()
+        self._make_thermal_metrics()
+
+    def _make_thermal_metrics(self):
         # Indices for node names are tied to indices for node voltages.
         self._transformer_index = None
         self._discovered_elements = False
+        settings = self._settings
         start_time = get_start_time(settings)
         sim_resolution = get_simulation_resolution(settings)
         inputs = ReportBase.get_inputs_from_defaults(settings, "Thermal Metrics")
         line_window_size, transformer_window_size = self._get_window_sizes(inputs, sim_resolution)
         self._thermal_metrics = ThermalMetrics(
-            prop,
+            next(iter(self._properties.values())),
             start_time,
             sim_resolution,
             line_window_size_hours=inputs["line_window_size_hours"],
@@ -1096,12 +1246,7 @@ class OverloadsMetricInMemory(OpenDssExportMetric):
         return line_window_size, transformer_window_size
 
     def close(self):
-        path = os.path.join(
-            str(self._settings.project.active_project_path),
-            "Exports",
-            self._settings.project.active_scenario,
-        )
-        self._thermal_metrics.generate_report(path)
+        self._thermal_metrics.generate_report(self._make_report_path())
 
     @staticmethod
     def element_class():
@@ -1143,8 +1288,8 @@ class OverloadsMetricInMemory(OpenDssExportMetric):
 def convert_data(name, prop_name, value, conversion):
     if conversion == DataConversion.ABS:
         converted = copy.deepcopy(value)
-        if isinstance(value.value, list):
-            converted.set_value([abs(x) for x in value.value])
+        if isinstance(value.value, np.ndarray):
+            converted.set_value(np.abs(value.value))
         else:
             converted.set_value(abs(value.value))
     elif conversion == DataConversion.SUM:
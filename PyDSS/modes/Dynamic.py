@@ -1,7 +1,9 @@
 from datetime import timedelta
 import math
 
+from PyDSS.active_object import invalidate_active_objects
 from PyDSS.modes.solver_base import solver_base
+from PyDSS.parameter_cache import invalidate_solution_parameters
 from PyDSS.simulation_input_models import SimulationSettingsModel
 
 
@@ -46,11 +48,15 @@ class Dynamic(solver_base):
         self._dssSolution.DblHour(Hour + Min / 60.0)
         self._dssSolution.Number(mTimeStep)
         self._dssSolution.Solve()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
         return self._dssSolution.Converged()
 
     def IncStep(self):
         self._dssSolution.StepSize(self._sStepRes)
         self._dssSolution.Solve()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
         self._Time = self._Time + timedelta(seconds=self._sStepRes)
         self._Hour = int(self._dssSolution.DblHour() // 1)
         self._Second = (self._dssSolution.DblHour() % 1) * 60 * 60
@@ -61,10 +67,14 @@ class Dynamic(solver_base):
     def reSolve(self):
         self._dssSolution.StepSize(0)
         self._dssSolution.SolveNoControl()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
         return self._dssSolution.Converged()
 
     def Solve(self):
         self._dssSolution.StepSize(0)
         self._dssSolution.Solve()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
         return self._dssSolution.Converged()
 
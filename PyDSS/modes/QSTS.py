@@ -1,6 +1,8 @@
 from datetime import timedelta
 
+from PyDSS.active_object import invalidate_active_objects
 from PyDSS.modes.solver_base import solver_base
+from PyDSS.parameter_cache import invalidate_solution_parameters
 from PyDSS.simulation_input_models import SimulationSettingsModel
 from PyDSS.utils.dss_utils import get_load_shape_resolution_secs
 
@@ -13,7 +15,12 @@ class QSTS(solver_base):
         self._dssSolution.Number(1)
         self._dssSolution.StepSize(self._sStepRes)
         self._dssSolution.MaxControlIterations(settings.project.max_control_iterations)
+        self._start_hour = self._Hour
+        self._start_second = self._Second
+        self._set_start_time()
+        return
 
+    def _set_start_time(self):
         start_time_hours = self._Hour + self._Second / 3600.0
         load_shape_resolutions_secs = get_load_shape_resolution_secs()
         if load_shape_resolutions_secs == self._sStepRes:
@@ -22,7 +29,16 @@ class QSTS(solver_base):
             # FIXME
             start_time_hours += self._sStepRes / 3600.0
         self._dssSolution.DblHour(start_time_hours)
-        return
+
+    def reset(self):
+        """Return the solution to the start time of the simulation."""
+        self._Time = self._StartTime
+        self._Hour = self._start_hour
+        self._Second = self._start_second
+        self._dssSolution.Mode(2)
+        self._dssSolution.Number(1)
+        self._dssSolution.StepSize(self._sStepRes)
+        self._set_start_time()
 
     def SolveFor(self, mStartTime, mTimeStep):
         Hour = int(mStartTime/60)
@@ -30,11 +46,15 @@ class QSTS(solver_base):
         self._dssSolution.DblHour(Hour + Min / 60.0)
         self._dssSolution.Number(mTimeStep)
         self._dssSolution.Solve()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
         return self._dssSolution.Converged()
 
     def IncStep(self):
         self._dssSolution.StepSize(self._sStepRes)
         self._dssSolution.Solve()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
         self._Time = self._Time + timedelta(seconds=self._sStepRes)
         self._Hour = int(self._dssSolution.DblHour() // 1)
         self._Second = (self._dssSolution.DblHour() % 1) * 60 * 60
@@ -43,11 +63,15 @@ class QSTS(solver_base):
     def reSolve(self):
         self._dssSolution.StepSize(0)
         self._dssSolution.SolveNoControl()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
         return self._dssSolution.Converged()
 
     def Solve(self):
         self._dssSolution.StepSize(0)
         self._dssSolution.Solve()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
         return self._dssSolution.Converged()
 
     def setMode(self, mode):
@@ -1,4 +1,6 @@
+from PyDSS.active_object import invalidate_active_objects
 from PyDSS.modes.solver_base import solver_base
+from PyDSS.parameter_cache import invalidate_solution_parameters
 from PyDSS.simulation_input_models import SimulationSettingsModel
 
 
@@ -10,8 +12,14 @@ class Snapshot(solver_base):
         self._dssSolution.MaxControlIterations(settings.project.max_control_iterations)
         return
 
+    def reset(self):
+        # A snapshot does not advance in time.
+        self._dssSolution.Mode(0)
+
     def reSolve(self):
         self._dssSolution.SolveNoControl()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
         return self._dssSolution.Converged()
 
     def SimulationSteps(self):
@@ -19,7 +27,12 @@ class Snapshot(solver_base):
 
     def Solve(self):
         self._dssSolution.Solve()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
         return self._dssSolution.Converged()
 
     def IncStep(self):
-        return self._dssSolution.Solve()
+        converged = self._dssSolution.Solve()
+        invalidate_active_objects()
+        invalidate_solution_parameters()
+        return converged
@@ -3,9 +3,10 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Union
 
+import numpy as np
 from pydantic import BaseModel, Field
 
-from PyDSS.utils.simulation_utils import CircularBufferHelper
+from PyDSS.utils.simulation_utils import CircularBufferArray
 
 
 logger = logging.getLogger(__name__)
@@ -387,23 +388,22 @@ class NodeVoltageMetricsByType:
     def update(self, time_step, voltages):
         cur_time = self._start_time + self._resolution * time_step
         if self._bufs is None:
-            self._bufs = [CircularBufferHelper(self._window_size) for _ in range(len(self._node_names))]
+            self._bufs = CircularBufferArray(self._window_size, len(self._node_names))
             self._metric_2_violation_counts = [0] * len(self._node_names)
             self._metric_5_min_violations = [None] * len(self._node_names)
             self._metric_5_max_violations = [None] * len(self._node_names)
 
         count_outside_range_a = 0
         any_outside_range_b = False
-        any_moving_avg_violates_range_a = False
         # The voltages passed include all nodes. self._node_indices has the ones
         # being tracked here.
+        self._bufs.append([voltages[i].value for i in self._node_indices])
+        averages = self._bufs.average()
+        any_moving_avg_violates_range_a = bool(np.any(
+            (averages < self._range_a_limits.min) | (averages > self._range_a_limits.max)
+        ))
         for i, node_index in enumerate(self._node_indices):
             voltage = voltages[node_index]
-            buf = self._bufs[i]
-            buf.append(voltage.value)
-            if not any_moving_avg_violates_range_a and self._is_outside_range_a(buf.average()):
-                any_moving_avg_violates_range_a = True
-
             if self._is_outside_range_a(voltage.value):
                 count_outside_range_a += 1
                 self._metric_2_violation_counts[i] += 1
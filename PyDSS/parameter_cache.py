@@ -0,0 +1,76 @@
+"""Counts the changes to the parameters of OpenDSS elements so that dssElement
+can cache the values of its parameters.
+
+An element drops its cached values when it is edited through SetParameter and
+when invalidate_all is called. Paths that edit elements with OpenDSS commands,
+such as the network modifier and the restoration of a compiled circuit, call
+invalidate_all. Code outside of PyDSS that runs such commands must do the same.
+
+Solving the circuit can change some parameters, such as the state of charge of
+storage or the taps of transformers. Only the parameters in STATIC_PARAMETERS
+stay cached after the circuit is solved.
+
+"""
+
+# Parameters that only change through commands, in lowercase.
+STATIC_PARAMETERS = frozenset((
+    "%cutin",
+    "%cutout",
+    "%effcharge",
+    "%effdischarge",
+    "%idlingkw",
+    "%reserve",
+    "bus1",
+    "bus2",
+    "buses",
+    "conn",
+    "conns",
+    "daily",
+    "duty",
+    "kv",
+    "kva",
+    "kvarlimit",
+    "kvas",
+    "kvs",
+    "kwhrated",
+    "kwrated",
+    "length",
+    "linecode",
+    "maxkvar",
+    "minkvar",
+    "phases",
+    "pmpp",
+    "transformer",
+    "units",
+    "yearly",
+))
+
+_num_edits = 0
+_num_solutions = 0
+
+
+def get_generation():
+    """Return the numbers of invalidations by edits and by solutions. A cached
+    value is valid while the number that applies to it does not change.
+
+    Returns
+    -------
+    tuple
+        (int, int)
+
+    """
+    return _num_edits, _num_solutions
+
+
+def invalidate_all():
+    """Drop the cached parameters of all elements. Call after running commands
+    that edit elements."""
+    global _num_edits
+    _num_edits += 1
+
+
+def invalidate_solution_parameters():
+    """Drop the cached parameters that solving the circuit may change. Call
+    after solving the circuit."""
+    global _num_solutions
+    _num_solutions += 1
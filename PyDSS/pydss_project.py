@@ -1,15 +1,20 @@
 """Contains functionality to configure PyDSS simulations."""
 
 import logging
+import logging.handlers
+import multiprocessing
 import os
 import shutil
 import sys
 import tarfile
 import tempfile
+import time
 import zipfile
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from pathlib import Path
 
 import h5py
+import opendssdirect as dss
 import pandas as pd
 
 import PyDSS
@@ -19,6 +24,8 @@ from PyDSS.common import PROJECT_TAR, PROJECT_ZIP, CONTROLLER_TYPES, \
     filename_from_enum, VisualizationType, DEFAULT_MONTE_CARLO_SETTINGS_FILE,\
     SUBSCRIPTIONS_FILENAME, DEFAULT_SUBSCRIPTIONS_FILE, OPENDSS_MASTER_FILENAME, \
     RUN_SIMULATION_FILENAME
+from PyDSS.dssInstance import OpenDSS
+from PyDSS.Extensions.MonteCarlo import make_seed
 from PyDSS.exceptions import InvalidParameter, InvalidConfiguration
 from PyDSS.loggers import setup_logging
 from PyDSS.pyDSS import instance
@@ -28,6 +35,7 @@ from PyDSS.pydss_fs_interface import PyDssDirectoryInterface, \
     SCENARIOS, STORE_FILENAME
 from PyDSS.reports.reports import REPORTS_DIR
 from PyDSS.registry import Registry
+from PyDSS.ResultData import ResultData
 from PyDSS.simulation_input_models import (
     ScenarioModel,
     ScenarioPostProcessModel,
@@ -37,6 +45,15 @@ from PyDSS.simulation_input_models import (
     load_simulation_settings,
     dump_settings,
 )
+from PyDSS.time_partitions import (
+    check_time_partition_support,
+    compare_window_boundaries,
+    get_sample_interval_multiple,
+    make_time_windows,
+    stitch_time_windows,
+    write_time_window_event_log,
+    TIME_PARTITION_REPORT_FILENAME,
+)
 from PyDSS.utils.dss_utils import read_pv_systems_from_dss_file
 from PyDSS.utils.utils import dump_data, load_data
 
@@ -316,14 +333,41 @@ class PyDssProject:
     def list_scenario_names(self):
         return [x.name for x in self.scenarios]
 
-    def run(self, logging_configured=True, tar_project=False, zip_project=False, dry_run=False):
-        """Run all scenarios in the project."""
+    def run(self, logging_configured=True, tar_project=False, zip_project=False, dry_run=False,
+            parallel=1, time_partitions=1, warm_up_min=0.0):
+        """Run all scenarios in the project.
+
+        Parameters
+        ----------
+        logging_configured : bool
+        tar_project : bool
+        zip_project : bool
+        dry_run : bool
+        parallel : int
+            Number of scenarios to run at once, each in its own process. With
+            Monte Carlo simulations, the number of processes that run the
+            samples of each scenario. With time_partitions, the number of time
+            windows to run at once; defaults to time_partitions.
+        time_partitions : int
+            Split each scenario into this many time windows that run in
+            separate processes. Requires a QSTS simulation.
+        warm_up_min : float
+            Minutes to simulate before each time window, after the first,
+            without keeping the results.
+
+        """
         if isinstance(self._fs_intf, PyDssArchiveFileInterfaceBase):
             raise InvalidConfiguration("cannot run from an archived project")
         if tar_project and zip_project:
             raise InvalidParameter("tar_project and zip_project cannot both be True")
         if self._settings.project.dss_file == "":
             raise InvalidConfiguration("a valid opendss file needs to be passed")
+        if parallel < 1:
+            raise InvalidParameter(f"parallel must be at least 1: {parallel}")
+        if time_partitions < 1:
+            raise InvalidParameter(f"time_partitions must be at least 1: {time_partitions}")
+        if warm_up_min < 0:
+            raise InvalidParameter(f"warm_up_min cannot be negative: {warm_up_min}")
 
         inst = instance()
         if not logging_configured:
@@ -355,16 +399,24 @@ class PyDssProject:
             os.remove(store_filename)
 
         try:
-            # This ensures that all datasets are flushed and closed after each
-            # scenario. If there is an unexpected crash in a later scenario then
-            # the file will still be valid for completed scenarios.
-            for scenario in self._scenarios:
-                with h5py.File(store_filename, mode="a", driver=driver) as hdf_store:
-                    self._hdf_store = hdf_store
-                    self._hdf_store.attrs["version"] = DATA_FORMAT_VERSION
-                    self._settings.project.active_scenario = scenario.name
-                    inst.run(self._settings, self, scenario, dry_run=dry_run)
-                    self._estimated_space[scenario.name] = inst.get_estimated_space()
+            if time_partitions > 1 and not dry_run:
+                self._run_scenarios_in_time_partitions(
+                    store_filename,
+                    driver,
+                    time_partitions,
+                    warm_up_min,
+                    parallel if parallel > 1 else time_partitions,
+                )
+            elif parallel > 1 and not dry_run and self._settings.monte_carlo.num_scenarios > 0:
+                self._run_monte_carlo_in_parallel(store_filename, driver, parallel)
+            elif parallel > 1 and not dry_run and len(self._scenarios) > 1:
+                self._run_scenarios_in_parallel(store_filename, driver, parallel)
+            else:
+                # This ensures that all datasets are flushed and closed after each
+                # scenario. If there is an unexpected crash in a later scenario then
+                # the file will still be valid for completed scenarios.
+                for scenario in self._scenarios:
+                    self._run_scenario(inst, scenario, store_filename, driver, dry_run=dry_run)
 
             export_tables = self._settings.exports.export_data_tables
             generate_reports = bool(self._settings.reports)
@@ -393,6 +445,184 @@ class PyDssProject:
             if dry_run and os.path.exists(store_filename):
                 os.remove(store_filename)
 
+    def _run_scenario(self, inst, scenario, store_filename, driver, dry_run=False):
+        with h5py.File(store_filename, mode="a", driver=driver) as hdf_store:
+            self._hdf_store = hdf_store
+            self._hdf_store.attrs["version"] = DATA_FORMAT_VERSION
+            self._settings.project.active_scenario = scenario.name
+            inst.run(self._settings, self, scenario, dry_run=dry_run)
+            self._estimated_space[scenario.name] = inst.get_estimated_space()
+
+    def _run_scenarios_in_parallel(self, store_filename, driver, parallel):
+        """Run each scenario in its own process with its own HDF5 file and
+        then copy the results into store_filename in scenario order.
+
+        As in serial runs, the store contains the results of all scenarios
+        that completed if one fails. Scenarios that have not started when one
+        fails are cancelled.
+
+        """
+        tmp_dir = tempfile.mkdtemp(prefix="scenario-stores-", dir=self._project_dir)
+        filenames = {
+            x.name: os.path.join(tmp_dir, f"{x.name}.h5") for x in self._scenarios
+        }
+        try:
+            jobs = {
+                x.name: (
+                    _run_scenario_in_process,
+                    (self._project_dir, x.name, filenames[x.name], driver),
+                )
+                for x in self._scenarios
+            }
+            completed, error = _run_jobs_in_processes(jobs, parallel)
+            for name in completed:
+                logger.info("Completed scenario %s", name)
+
+            with h5py.File(store_filename, mode="a", driver=driver) as hdf_store:
+                hdf_store.attrs["version"] = DATA_FORMAT_VERSION
+                for scenario in self._scenarios:
+                    if scenario.name in completed:
+                        merge_scenario_store(filenames[scenario.name], hdf_store)
+        finally:
+            shutil.rmtree(tmp_dir)
+
+        if error is not None:
+            raise error
+
+    def _run_monte_carlo_in_parallel(self, store_filename, driver, parallel):
+        """Run the Monte Carlo samples of each scenario in a pool of
+        processes. Scenarios run one after another.
+
+        Each process compiles the circuit once and runs samples until none
+        are left, writing them to its own HDF5 file. The results of the
+        completed samples are then copied into store_filename.
+
+        """
+        num_samples = self._settings.monte_carlo.num_scenarios
+        seed = self._settings.monte_carlo.seed
+        if seed is None:
+            seed = make_seed()
+            logger.info("Monte Carlo seed: %s", seed)
+
+        with h5py.File(store_filename, mode="a", driver=driver) as hdf_store:
+            hdf_store.attrs["version"] = DATA_FORMAT_VERSION
+
+        num_processes = min(parallel, num_samples)
+        for scenario in self._scenarios:
+            tmp_dir = tempfile.mkdtemp(prefix="monte-carlo-stores-", dir=self._project_dir)
+            progress = _MonteCarloProgress(scenario.name, num_samples)
+            try:
+                jobs = {
+                    i: (
+                        _run_monte_carlo_sample_in_process,
+                        (self._project_dir, scenario.name, tmp_dir, driver, i, seed),
+                    )
+                    for i in range(num_samples)
+                }
+                logger.info("Running %s Monte Carlo samples of scenario %s in %s processes",
+                            num_samples, scenario.name, num_processes)
+                completed, error = _run_jobs_in_processes(
+                    jobs, num_processes, callback=progress.update
+                )
+                progress.log_summary(num_processes)
+
+                names_by_file = {}
+                for i, (filename, _) in completed.items():
+                    names_by_file.setdefault(filename, set()).add(f"{scenario.name}_MC{i}")
+                with h5py.File(store_filename, mode="a", driver=driver) as hdf_store:
+                    for filename, names in sorted(names_by_file.items()):
+                        merge_scenario_store(filename, hdf_store, names=names)
+            finally:
+                shutil.rmtree(tmp_dir)
+
+            if error is not None:
+                raise error
+
+    def _run_scenarios_in_time_partitions(self, store_filename, driver, time_partitions,
+                                          warm_up_min, parallel):
+        """Run each scenario as consecutive time windows in separate
+        processes and stitch the windows into store_filename. Scenarios run
+        one after another.
+
+        Writes a report of the differences at the window boundaries to each
+        scenario's export directory.
+
+        """
+        windows_by_scenario = {}
+        for scenario in self._scenarios:
+            self._settings.project.active_scenario = scenario.name
+            export_list = ResultData.read_export_list(
+                os.path.join(self._project_dir, SCENARIOS, scenario.name, "ExportLists"),
+                self._settings,
+            )
+            check_time_partition_support(self._settings, export_list)
+            windows_by_scenario[scenario.name] = make_time_windows(
+                self._settings,
+                time_partitions,
+                warm_up_min,
+                sample_interval=get_sample_interval_multiple(export_list),
+            )
+
+        with h5py.File(store_filename, mode="a", driver=driver) as hdf_store:
+            hdf_store.attrs["version"] = DATA_FORMAT_VERSION
+
+        for scenario in self._scenarios:
+            windows = windows_by_scenario[scenario.name]
+            tmp_dir = tempfile.mkdtemp(prefix="time-window-stores-", dir=self._project_dir)
+            filenames = [os.path.join(tmp_dir, f"window{x.index}.h5") for x in windows]
+            try:
+                jobs = {
+                    f"{scenario.name} time window {x.index}": (
+                        _run_time_window_in_process,
+                        (self._project_dir, scenario.name, filenames[x.index], driver, x),
+                    )
+                    for x in windows
+                }
+                logger.info("Running scenario %s in %s time windows", scenario.name, len(windows))
+                completed, error = _run_jobs_in_processes(jobs, parallel)
+                if error is not None:
+                    raise error
+
+                with h5py.File(store_filename, mode="a", driver=driver) as hdf_store:
+                    stitch_time_windows(filenames, windows, scenario.name, hdf_store)
+                if self._settings.exports.export_event_log:
+                    # Replaces the event log of the first window.
+                    write_time_window_event_log(
+                        [completed[key] for key in jobs],
+                        os.path.join(
+                            self.export_path(scenario.name), ResultData.EVENT_LOG_FILENAME
+                        ),
+                    )
+                self._report_time_window_boundaries(scenario.name, filenames, windows, warm_up_min)
+            finally:
+                shutil.rmtree(tmp_dir)
+
+    def _report_time_window_boundaries(self, scenario_name, filenames, windows, warm_up_min):
+        boundaries = compare_window_boundaries(
+            filenames, windows, scenario_name, self._settings.project.step_resolution_sec
+        )
+        report = {
+            "scenario": scenario_name,
+            "num_windows": len(windows),
+            "warm_up_min": warm_up_min,
+            "boundaries": boundaries,
+        }
+        filename = os.path.join(self.export_path(scenario_name), TIME_PARTITION_REPORT_FILENAME)
+        dump_data(report, filename, indent=2)
+        for boundary in boundaries:
+            if boundary["settled_after_min"] is None:
+                logger.warning(
+                    "Scenario %s: results of time window %s did not match the previous window "
+                    "by the end of warm-up. Consider increasing warm_up_min. See %s",
+                    scenario_name, boundary["window"], filename,
+                )
+            else:
+                logger.info(
+                    "Scenario %s: results of time window %s matched the previous window after "
+                    "%s minutes of warm-up",
+                    scenario_name, boundary["window"], boundary["settled_after_min"],
+                )
+
     def _dump_simulation_settings(self):
         # Various settings may have been updated. Write the actual settings to a file.
         filename = os.path.join( self._project_dir, RUN_SIMULATION_FILENAME)
@@ -547,7 +777,8 @@ class PyDssProject:
         )
 
     @classmethod
-    def run_project(cls, path, options=None, tar_project=False, zip_project=False, simulation_file=None, dry_run=False):
+    def run_project(cls, path, options=None, tar_project=False, zip_project=False, simulation_file=None, dry_run=False,
+                    parallel=1, time_partitions=1, warm_up_min=0.0):
 
         """Load a PyDssProject from directory and run all scenarios.
 
@@ -563,10 +794,19 @@ class PyDssProject:
             zip project files after successful execution
         dry_run: bool
             dry run for getting estimated space.
+        parallel : int
+            number of scenarios to run in parallel processes
+        time_partitions : int
+            number of time windows to split each scenario into
+        warm_up_min : float
+            minutes to simulate before each time window
         """
 
         project = cls.load_project(path, options=options, simulation_file=simulation_file)
-        return project.run(tar_project=tar_project, zip_project=zip_project, dry_run=dry_run)
+        return project.run(
+            tar_project=tar_project, zip_project=zip_project, dry_run=dry_run, parallel=parallel,
+            time_partitions=time_partitions, warm_up_min=warm_up_min,
+        )
 
     def read_scenario_settings(self, scenario):
         """Read the simulation settings file for the scenario.
@@ -946,3 +1186,200 @@ def update_pydss_controllers(project_path, scenario, controller_type,
 
     dump_data(data, filename)
     print(f"Added {num_added} names to {filename}")
+
+
+def merge_scenario_store(src_filename, hdf_store, names=None):
+    """Copy the scenario results in an HDF5 file into another store. The data
+    is copied without decompressing it.
+
+    Parameters
+    ----------
+    src_filename : str
+    hdf_store : h5py.File
+    names : set | None
+        If set, only copy these scenarios.
+
+    """
+    exports = hdf_store.require_group("Exports")
+    with h5py.File(src_filename, mode="r") as src:
+        for name, group in src.get("Exports", {}).items():
+            if names is not None and name not in names:
+                continue
+            if name in exports:
+                del exports[name]
+            src.copy(group, exports, name=name)
+            logger.debug("Copied scenario %s from %s", name, src_filename)
+
+
+class _MonteCarloProgress:
+    """Logs the progress and throughput of Monte Carlo samples."""
+
+    def __init__(self, scenario_name, num_samples):
+        self._scenario_name = scenario_name
+        self._num_samples = num_samples
+        self._num_completed = 0
+        self._sample_seconds = 0.0
+        self._start = time.time()
+
+    def update(self, sample_index, result):
+        """Record a completed sample."""
+        _, duration = result
+        self._num_completed += 1
+        self._sample_seconds += duration
+        elapsed = time.time() - self._start
+        logger.info(
+            "Scenario %s: completed Monte Carlo sample %s (%s/%s) in %.1f seconds; "
+            "%.2f samples per minute",
+            self._scenario_name, sample_index, self._num_completed, self._num_samples,
+            duration, self._num_completed / elapsed * 60,
+        )
+
+    def log_summary(self, num_processes):
+        """Log the throughput of all completed samples."""
+        elapsed = time.time() - self._start
+        mean = self._sample_seconds / self._num_completed if self._num_completed else 0.0
+        logger.info(
+            "Scenario %s: completed %s of %s Monte Carlo samples in %.1f seconds with %s "
+            "processes: %.2f samples per minute, %.1f seconds per sample",
+            self._scenario_name, self._num_completed, self._num_samples, elapsed,
+            num_processes, self._num_completed / elapsed * 60, mean,
+        )
+
+
+def _run_jobs_in_processes(jobs, max_workers, callback=None):
+    """Run functions in a pool of processes. Log messages from the worker
+    processes go to the handlers of the PyDSS logger in this process. The
+    first failure cancels the jobs that have not started.
+
+    Parameters
+    ----------
+    jobs : dict
+        Maps a key to a tuple of function and arguments.
+    max_workers : int
+    callback : callable | None
+        Called with the key and result of each job when it completes.
+
+    Returns
+    -------
+    tuple
+        dict mapping the keys of the jobs that completed to their results and
+        the first exception raised by a job or None
+
+    """
+    context = multiprocessing.get_context("spawn")
+    log_queue = context.Queue()
+    pydss_logger = logging.getLogger("PyDSS")
+    listener = logging.handlers.QueueListener(
+        log_queue, *pydss_logger.handlers, respect_handler_level=True
+    )
+    listener.start()
+    completed = {}
+    error = None
+    try:
+        with ProcessPoolExecutor(
+            max_workers=min(max_workers, len(jobs)),
+            mp_context=context,
+            initializer=_initialize_worker_logging,
+            initargs=(log_queue, pydss_logger.getEffectiveLevel()),
+        ) as executor:
+            futures = {executor.submit(func, *args): key for key, (func, args) in jobs.items()}
+            for future in as_completed(futures):
+                key = futures[future]
+                if future.cancelled():
+                    continue
+                try:
+                    completed[key] = future.result()
+                    if callback is not None:
+                        callback(key, completed[key])
+                except Exception as exc:
+                    logger.error("%s failed: %s", key, exc)
+                    if error is None:
+                        error = exc
+                        for other in futures:
+                            other.cancel()
+    finally:
+        listener.stop()
+
+    return completed, error
+
+
+def _initialize_worker_logging(log_queue, level):
+    pydss_logger = logging.getLogger("PyDSS")
+    for handler in list(pydss_logger.handlers):
+        pydss_logger.removeHandler(handler)
+    pydss_logger.addHandler(logging.handlers.QueueHandler(log_queue))
+    pydss_logger.setLevel(level)
+    pydss_logger.propagate = False
+
+
+def _run_scenario_in_process(project_dir, scenario_name, store_filename, driver):
+    # The parent process wrote the settings that it is running.
+    project = PyDssProject.load_project(project_dir, simulation_file=RUN_SIMULATION_FILENAME)
+    scenario = project.get_scenario(scenario_name)
+    project._run_scenario(instance(), scenario, store_filename, driver)
+
+
+# The circuit compiled by a Monte Carlo worker process. OpenDSS allows one
+# circuit per process.
+_monte_carlo_worker = {}
+
+
+def _run_monte_carlo_sample_in_process(project_dir, scenario_name, store_dir, driver,
+                                       sample_index, seed):
+    if _monte_carlo_worker.get("key") != (project_dir, scenario_name):
+        project = PyDssProject.load_project(project_dir, simulation_file=RUN_SIMULATION_FILENAME)
+        settings = project.simulation_config
+        settings.project.active_scenario = scenario_name
+        _monte_carlo_worker.update({
+            "key": (project_dir, scenario_name),
+            "project": project,
+            "scenario": project.get_scenario(scenario_name),
+            "simulation": OpenDSS(settings),
+        })
+
+    project = _monte_carlo_worker["project"]
+    store_filename = os.path.join(store_dir, f"worker{os.getpid()}.h5")
+    with h5py.File(store_filename, mode="a", driver=driver) as hdf_store:
+        project._hdf_store = hdf_store
+        hdf_store.attrs["version"] = DATA_FORMAT_VERSION
+        duration = _monte_carlo_worker["simulation"].RunMCSample(
+            project,
+            _monte_carlo_worker["scenario"],
+            sample_index,
+            seed,
+            # Only one sample writes the scenario's metadata files.
+            export_metadata=sample_index == 0,
+        )
+    return store_filename, duration
+
+
+def _run_time_window_in_process(project_dir, scenario_name, store_filename, driver, window):
+    project = PyDssProject.load_project(project_dir, simulation_file=RUN_SIMULATION_FILENAME)
+    scenario = project.get_scenario(scenario_name)
+    settings = project.simulation_config
+    settings.project.active_scenario = scenario_name
+    window.apply_to_settings(settings)
+    with h5py.File(store_filename, mode="a", driver=driver) as hdf_store:
+        project._hdf_store = hdf_store
+        hdf_store.attrs["version"] = DATA_FORMAT_VERSION
+        simulation = OpenDSS(settings)
+        # The warm-up steps repeat the events that the previous window
+        # recorded. Events from compiling the circuit belong to the first
+        # window.
+        if window.index == 0:
+            first_event = 0
+        elif window.warm_up_steps == 0:
+            first_event = len(dss.Solution.EventLog())
+        else:
+            first_event = None
+        # Only the first window writes the scenario's metadata files.
+        for is_complete, step, _, _ in simulation.RunSimulation(
+                project, scenario, export_metadata=window.index == 0):
+            if first_event is None and step >= window.warm_up_steps:
+                first_event = len(dss.Solution.EventLog())
+            if is_complete:
+                break
+
+    if not settings.exports.export_event_log:
+        return None
+    return dss.Solution.EventLog()[first_event:]
@@ -1,4 +1,5 @@
 """Provides access to PyDSS result data."""
+import bisect
 from collections import defaultdict
 from datetime import datetime
 import json
@@ -11,17 +12,20 @@ import h5py
 import numpy as np
 import pandas as pd
 
+from PyDSS.chunk_cache import ChunkCache, DEFAULT_CHUNK_CACHE_BYTES
 from PyDSS.common import  DatasetPropertyType
 from PyDSS.dataset_buffer import DatasetBuffer
 from PyDSS.element_options import ElementOptions
-from PyDSS.exceptions import InvalidParameter
+from PyDSS.exceptions import InvalidConfiguration, InvalidParameter
 from PyDSS.pydss_project import PyDssProject, RUN_SIMULATION_FILENAME
 from PyDSS.reports.reports import Reports, REPORTS_DIR
+from PyDSS.result_index import ElementClassIndex
+from PyDSS.streaming_aggregator import StreamingAggregator, DEFAULT_RESERVOIR_SIZE
 from PyDSS.utils.dataframe_utils import read_dataframe, write_dataframe
 from PyDSS.utils.utils import dump_data, load_data, make_json_serializable, \
     make_timestamps
 from PyDSS.value_storage import ValueStorageBase, get_dataset_property_type, \
-    get_time_step_path
+    get_sample_interval, get_time_step_path
 
 
 logger = logging.getLogger(__name__)
@@ -31,7 +35,7 @@ class PyDssResults:
     """Interface to perform analysis on PyDSS output data."""
     def __init__(
             self, project_path=None, project=None, in_memory=False,
-            frequency=False, mode=False
+            frequency=False, mode=False, chunk_cache_bytes=DEFAULT_CHUNK_CACHE_BYTES,
         ):
         """Constructs PyDssResults object.
 
@@ -47,9 +51,13 @@ class PyDssResults:
             If true, add frequency column to all dataframes.
         mode : bool
             If true, add mode column to all dataframes.
+        chunk_cache_bytes : int
+            Budget in bytes for the cache of decoded dataset chunks shared by
+            all scenarios. Set to 0 to disable the cache.
 
         """
         options = ElementOptions()
+        self._chunk_cache = ChunkCache(chunk_cache_bytes) if chunk_cache_bytes > 0 else None
         if project_path is not None:
             # TODO: handle old version?
             self._project = PyDssProject.load_project(
@@ -78,6 +86,7 @@ class PyDssResults:
                     options,
                     frequency=frequency,
                     mode=mode,
+                    chunk_cache=self._chunk_cache,
                 )
                 self._scenarios.append(scenario_result)
 
@@ -122,6 +131,19 @@ class PyDssResults:
 
         raise InvalidParameter(f"did not find report {report_name} in {reports_dir}")
 
+    @property
+    def chunk_cache(self):
+        """Return the cache of decoded dataset chunks. Its hits and misses
+        counters show how well it serves the current reads.
+
+        Returns
+        -------
+        ChunkCache | None
+            None if the cache is disabled
+
+        """
+        return self._chunk_cache
+
     @property
     def project(self):
         """Return the PyDssProject instance.
@@ -223,7 +245,7 @@ class PyDssScenarioResults:
     """Contains results for one scenario."""
     def __init__(
             self, name, project_path, store, fs_intf, metadata, options,
-            frequency=False, mode=False
+            frequency=False, mode=False, chunk_cache=None
         ):
         self._name = name
         self._project_path = project_path
@@ -231,21 +253,15 @@ class PyDssScenarioResults:
         self._metadata = metadata or {}
         self._options = options
         self._fs_intf = fs_intf
-        self._elems_by_class = defaultdict(set)
-        self._elem_data_by_prop = defaultdict(dict)
-        self._elem_values_by_prop = defaultdict(dict)
-        self._elem_indices_by_prop = defaultdict(dict)
-        self._props_by_class = defaultdict(list)
-        self._elem_props = defaultdict(list)
-        self._column_ranges_per_elem = defaultdict(dict)
-        self._summed_elem_props = defaultdict(dict)
-        self._summed_elem_timeseries_props = defaultdict(list)
+        self._class_indexes = {}
+        self._chunk_cache = chunk_cache
         self._indices_df = None
         self._add_frequency = frequency
         self._add_mode = mode
         self._data_format_version = self._hdf_store.attrs["version"]
         if name not in self._hdf_store["Exports"]:
             self._group = None
+            self._elem_classes = []
             return
 
         self._group = self._hdf_store[f"Exports/{name}"]
@@ -253,54 +269,15 @@ class PyDssScenarioResults:
             x for x in self._group if isinstance(self._group[x], h5py.Group)
         ]
 
-        self._parse_datasets()
-
-    def _parse_datasets(self):
-        for elem_class in self._elem_classes:
-            class_group = self._group[elem_class]
-            if "ElementProperties" in class_group:
-                prop_group = class_group["ElementProperties"]
-                for prop, dataset in prop_group.items():
-                    dataset_property_type = get_dataset_property_type(dataset)
-                    if dataset_property_type == DatasetPropertyType.TIME_STEP:
-                        continue
-                    if dataset_property_type == DatasetPropertyType.VALUE:
-                        self._elem_values_by_prop[elem_class][prop] = []
-                        prop_names = self._elem_values_by_prop
-                    elif dataset_property_type in (
-                            DatasetPropertyType.PER_TIME_POINT,
-                            DatasetPropertyType.FILTERED,
-                    ):
-                        self._elem_data_by_prop[elem_class][prop] = []
-                        prop_names = self._elem_data_by_prop
-                    else:
-                        continue
-
-                    self._props_by_class[elem_class].append(prop)
-                    self._elem_indices_by_prop[elem_class][prop] = {}
-                    names = DatasetBuffer.get_names(dataset)
-                    self._column_ranges_per_elem[elem_class][prop] = \
-                        DatasetBuffer.get_column_ranges(dataset)
-                    for i, name in enumerate(names):
-                        self._elems_by_class[elem_class].add(name)
-                        prop_names[elem_class][prop].append(name)
-                        self._elem_indices_by_prop[elem_class][prop][name] = i
-                        self._elem_props[name].append(prop)
-            else:
-                self._elems_by_class[elem_class] = set()
-
-            summed_elem_props = self._group[elem_class].get("SummedElementProperties", [])
-            for prop in summed_elem_props:
-                dataset = self._group[elem_class]["SummedElementProperties"][prop]
-                dataset_property_type = get_dataset_property_type(dataset)
-                if dataset_property_type == DatasetPropertyType.VALUE:
-                    df = DatasetBuffer.to_dataframe(dataset)
-                    assert len(df) == 1
-                    self._summed_elem_props[elem_class][prop] = {
-                        x: df[x].values[0] for x in df.columns
-                    }
-                elif dataset_property_type == DatasetPropertyType.PER_TIME_POINT:
-                    self._summed_elem_timeseries_props[elem_class].append(prop)
+    def _get_class_index(self, element_class):
+        """Return the index for an element class, loading it on first use."""
+        index = self._class_indexes.get(element_class)
+        if index is None:
+            if element_class not in self._elem_classes:
+                return ElementClassIndex(None, [], {}, {})
+            index = ElementClassIndex.load(self._group[element_class])
+            self._class_indexes[element_class] = index
+        return index
 
     @staticmethod
     def get_name_from_column(column):
@@ -367,10 +344,11 @@ class PyDssScenarioResults:
 
     def _export_element_values(self, path, fmt, compress):
         elem_prop_nums = defaultdict(dict)
-        for elem_class in self._elem_values_by_prop:
-            for prop in self._elem_values_by_prop[elem_class]:
+        for elem_class in self._elem_classes:
+            value_props = self._get_class_index(elem_class).list_value_properties()
+            for prop, names in value_props.items():
                 dataset = self._group[f"{elem_class}/ElementProperties/{prop}"]
-                for name in self._elem_values_by_prop[elem_class][prop]:
+                for name in names:
                     col_range = self._get_element_column_range(elem_class, prop, name)
                     start = col_range[0]
                     length = col_range[1]
@@ -397,8 +375,9 @@ class PyDssScenarioResults:
             write_dataframe(df, filename, compress=compress)
 
     def _export_summed_element_timeseries(self, path, fmt, compress):
-        for elem_class in self._summed_elem_timeseries_props:
-            for prop in self._summed_elem_timeseries_props[elem_class]:
+        for elem_class in self._elem_classes:
+            index = self._get_class_index(elem_class)
+            for prop in index.list_summed_time_series_properties():
                 fields = prop.split(ValueStorageBase.DELIMITER)
                 if len(fields) == 1:
                     base = ValueStorageBase.DELIMITER.join([elem_class, prop])
@@ -416,9 +395,120 @@ class PyDssScenarioResults:
 
     def _export_summed_element_values(self, path, fmt, compress):
         filename = os.path.join(path, "summed_element_property_values.json")
-        dump_data(self._summed_elem_props, filename, default=make_json_serializable)
+        summed_values = {}
+        for elem_class in self._elem_classes:
+            values = self._get_class_index(elem_class).summed_values
+            if values:
+                summed_values[elem_class] = values
+        dump_data(summed_values, filename, default=make_json_serializable)
+
+    def aggregate(self, element_class, prop, ops, names=None, by="column", threshold=None,
+                  real_only=False, abs_val=False, start_time=None, end_time=None,
+                  reservoir_size=DEFAULT_RESERVOIR_SIZE, seed=None):
+        """Aggregate the values of a property over time. Reads the dataset one
+        chunk of rows at a time, so memory use does not depend on the number
+        of time points.
 
-    def get_dataframe(self, element_class, prop, element_name, real_only=False, abs_val=False, **kwargs):
+        Parameters
+        ----------
+        element_class : str
+        prop : str
+        ops : list
+            Aggregations to compute: count, max, mean, min, sum,
+            time_above_threshold, or percentiles such as p95. Percentiles are
+            approximate; they are computed from a random sample of
+            reservoir_size time points.
+        names : list | None
+            Element names to read. Defaults to all elements that store prop.
+        by : str
+            "column" aggregates each column. "element" pools the columns of
+            each element; time_above_threshold counts the time points where
+            any of its columns exceeds threshold.
+        threshold : float | None
+            Required for time_above_threshold, which is reported in seconds.
+        real_only : bool
+            If dtype of any column is complex, drop the imaginary component.
+        abs_val : bool
+            If dtype of any column is complex, compute its absolute value.
+        start_time : datetime | str | None
+            If set, exclude time points before this time.
+        end_time : datetime | str | None
+            If set, exclude time points after this time.
+        reservoir_size : int
+        seed : int | None
+            Seed for the sampling used by percentiles.
+
+        Returns
+        -------
+        pd.DataFrame
+            One row per column or element and one column per op
+
+        Raises
+        ------
+        InvalidParameter
+            Raised if a parameter is invalid or the property is not stored at
+            every time point.
+
+        """
+        if by not in ("column", "element"):
+            raise InvalidParameter(f"by must be 'column' or 'element': {by}")
+        names, _ = self._check_element_names(element_class, prop, names)
+        dataset = self._group[f"{element_class}/ElementProperties/{prop}"]
+        prop_type = get_dataset_property_type(dataset)
+        if prop_type != DatasetPropertyType.PER_TIME_POINT:
+            raise InvalidParameter(
+                f"aggregate requires a property stored at every time point: {prop_type.value}"
+            )
+
+        all_ranges = [self._get_element_column_range(element_class, prop, x) for x in names]
+        first = min((x[0] for x in all_ranges), default=0)
+        last = max((x[0] + x[1] for x in all_ranges), default=0)
+        column_indices = np.array(
+            [i - first for x in all_ranges for i in range(x[0], x[0] + x[1])], dtype=np.int64
+        )
+        is_contiguous = len(column_indices) == last - first
+        groups = None
+        if by == "element":
+            # Index of each element's first column
+            groups = np.cumsum([0] + [x[1] for x in all_ranges], dtype=np.int64)[:-1]
+
+        aggregator = StreamingAggregator(
+            ops, len(column_indices), threshold=threshold, reservoir_size=reservoir_size,
+            seed=seed,
+        )
+        step_range = self._get_time_step_range(start_time, end_time)
+        rows = DatasetBuffer._make_row_slice(dataset, self._get_row_range(dataset, step_range))
+        block_size = dataset.chunks[0] if dataset.chunks is not None else rows.stop
+        start = rows.start
+        while start < rows.stop:
+            end = min((start // block_size + 1) * block_size, rows.stop)
+            # Bypass the chunk cache so that one pass over a large dataset
+            # does not evict the chunks of interactive reads.
+            data = DatasetBuffer.read(dataset, slice(start, end), slice(first, last))
+            if not is_contiguous:
+                data = data[:, column_indices]
+            if np.iscomplexobj(data):
+                if real_only:
+                    data = data.real
+                elif abs_val:
+                    data = np.abs(data)
+                else:
+                    raise InvalidParameter("complex values require real_only or abs_val")
+            aggregator.update(data.astype(np.float64, copy=False), groups=groups)
+            start = end
+
+        results = aggregator.finalize(
+            groups=groups, time_step_seconds=self._get_time_step_seconds(dataset)
+        )
+        if by == "element":
+            index = list(names)
+        else:
+            columns = DatasetBuffer.get_columns(dataset)
+            index = [columns[first + x] for x in column_indices]
+        return pd.DataFrame(results, index=index, columns=list(ops))
+
+    def get_dataframe(self, element_class, prop, element_name, real_only=False, abs_val=False,
+                      start_time=None, end_time=None, **kwargs):
         """Return the dataframe for an element.
 
         Parameters
@@ -430,6 +520,10 @@ class PyDssScenarioResults:
             If dtype of any column is complex, drop the imaginary component.
         abs_val : bool
             If dtype of any column is complex, compute its absolute value.
+        start_time : datetime | str | None
+            If set, exclude time points before this time.
+        end_time : datetime | str | None
+            If set, exclude time points after this time.
         kwargs
             Filter on options; values can be strings or regular expressions.
 
@@ -443,23 +537,236 @@ class PyDssScenarioResults:
             Raised if the element is not stored.
 
         """
-        if element_name not in self._elem_props:
+        if element_name not in self._get_class_index(element_class).element_names:
             raise InvalidParameter(f"element {element_name} is not stored")
 
         dataset = self._group[f"{element_class}/ElementProperties/{prop}"]
         prop_type = get_dataset_property_type(dataset)
+        step_range = self._get_time_step_range(start_time, end_time)
         if prop_type == DatasetPropertyType.PER_TIME_POINT:
             return self._get_elem_prop_dataframe(
                 element_class, prop, element_name, dataset, real_only=real_only,
-                abs_val=abs_val, **kwargs
+                abs_val=abs_val, step_range=step_range, **kwargs
             )
         elif prop_type == DatasetPropertyType.FILTERED:
             return self._get_filtered_dataframe(
                 element_class, prop, element_name, dataset, real_only=real_only,
-                abs_val=abs_val, **kwargs
+                abs_val=abs_val, step_range=step_range, **kwargs
+            )
+        elif prop_type == DatasetPropertyType.ON_CHANGE:
+            index = self._get_class_index(element_class)
+            elem_index = index.get_element_indices(prop)[element_name]
+            df = self._read_on_change_dataframe(
+                dataset, elem_indices=[elem_index], step_range=step_range
+            )
+            if kwargs:
+                options = self._check_options(element_class, prop, **kwargs)
+                columns = ValueStorageBase.get_columns(df, element_name, options, **kwargs)
+                df = df[columns]
+            self._finalize_dataframe(
+                df, dataset, real_only=real_only, abs_val=abs_val, step_range=step_range
             )
+            return df
         assert False, str(prop_type)
 
+    def get_dataframes(self, element_class, prop, names=None, real_only=False, abs_val=False,
+                       start_time=None, end_time=None, **kwargs):
+        """Return the dataframes for multiple elements. Reads the data for all
+        elements in one pass over the dataset, so this is much more efficient
+        than calling get_dataframe for each element.
+
+        Parameters
+        ----------
+        element_class : str
+        prop : str
+        names : list | None
+            Element names to read. Defaults to all elements that store prop.
+        real_only : bool
+            If dtype of any column is complex, drop the imaginary component.
+        abs_val : bool
+            If dtype of any column is complex, compute its absolute value.
+        start_time : datetime | str | None
+            If set, exclude time points before this time.
+        end_time : datetime | str | None
+            If set, exclude time points after this time.
+        kwargs
+            Filter on options; values can be strings or regular expressions.
+
+        Returns
+        -------
+        dict
+            key = str (name), val = pd.DataFrame
+
+        Raises
+        ------
+        InvalidParameter
+            Raised if the property or an element is not stored.
+
+        """
+        names, elem_indices = self._check_element_names(element_class, prop, names)
+        dataset = self._group[f"{element_class}/ElementProperties/{prop}"]
+        prop_type = get_dataset_property_type(dataset)
+        step_range = self._get_time_step_range(start_time, end_time)
+        if prop_type == DatasetPropertyType.FILTERED:
+            return self._get_filtered_dataframes(
+                dataset, names=names, real_only=real_only, abs_val=abs_val,
+                step_range=step_range,
+            )
+
+        if prop_type == DatasetPropertyType.ON_CHANGE:
+            df = self._read_on_change_dataframe(
+                dataset, elem_indices=[elem_indices[x] for x in names], step_range=step_range,
+            )
+            num_columns = len(DatasetBuffer.get_columns(dataset))
+            column_ranges = [(i * num_columns, num_columns) for i in range(len(names))]
+        else:
+            assert prop_type == DatasetPropertyType.PER_TIME_POINT, prop_type
+            all_ranges = [
+                self._get_element_column_range(element_class, prop, x) for x in names
+            ]
+            data, columns, offsets = self._read_element_columns(dataset, all_ranges, step_range)
+            df = pd.DataFrame(data, columns=columns)
+            column_ranges = [(x, y[1]) for x, y in zip(offsets, all_ranges)]
+
+        self._finalize_dataframe(
+            df, dataset, real_only=real_only, abs_val=abs_val, step_range=step_range
+        )
+        options = self._check_options(element_class, prop, **kwargs) if kwargs else None
+        dfs = {}
+        for name, (start, length) in zip(names, column_ranges):
+            elem_df = df.iloc[:, start:start + length].copy()
+            if kwargs:
+                columns = ValueStorageBase.get_columns(elem_df, name, options, **kwargs)
+                elem_df = elem_df[columns]
+            dfs[name] = elem_df
+        return dfs
+
+    def get_numpy_array(self, element_class, prop, names=None, real_only=False, abs_val=False,
+                        start_time=None, end_time=None):
+        """Return the values of a property for multiple elements as one NumPy
+        array with dimensions (time, element, terminal, component). This does
+        not create dataframes or column names, so it scales to large feeders.
+
+        The terminal coordinates are the phase/terminal labels, such as
+        "A1 [Amps]". The component coordinates are labels like "mag [Volts]"
+        and "ang [Deg]" for values stored as magnitude and angle and ""
+        otherwise. If all elements have
+        the same columns, the array is a view of the data read from the file.
+        Otherwise, values missing for an element are NaN.
+
+        Parameters
+        ----------
+        element_class : str
+        prop : str
+        names : list | None
+            Element names to read. Defaults to all elements that store prop.
+        real_only : bool
+            If the dtype is complex, return a view of the real component.
+        abs_val : bool
+            If the dtype is complex, compute its absolute value.
+        start_time : datetime | str | None
+            If set, exclude time points before this time.
+        end_time : datetime | str | None
+            If set, exclude time points after this time.
+
+        Returns
+        -------
+        tuple
+            np.ndarray, dict mapping each dimension name to its coordinates
+
+        Raises
+        ------
+        InvalidParameter
+            Raised if the property or an element is not stored.
+
+        """
+        names, elem_indices = self._check_element_names(element_class, prop, names)
+        dataset = self._group[f"{element_class}/ElementProperties/{prop}"]
+        prop_type = get_dataset_property_type(dataset)
+        step_range = self._get_time_step_range(start_time, end_time)
+        columns = DatasetBuffer.get_columns(dataset)
+        if prop_type == DatasetPropertyType.PER_TIME_POINT:
+            all_ranges = [
+                self._get_element_column_range(element_class, prop, x) for x in names
+            ]
+            data, _, offsets = self._read_element_columns(dataset, all_ranges, step_range)
+            elem_columns = [columns[x[0]:x[0] + x[1]] for x in all_ranges]
+            timestamps = self._get_indices_for_dataset(dataset, step_range)["Timestamp"].values
+        else:
+            if prop_type == DatasetPropertyType.FILTERED:
+                data = self._read_filtered_array(
+                    dataset, [elem_indices[x] for x in names], step_range
+                )
+            elif prop_type == DatasetPropertyType.ON_CHANGE:
+                data = self._read_on_change_dataframe(
+                    dataset, elem_indices=[elem_indices[x] for x in names],
+                    step_range=step_range,
+                ).values
+            else:
+                assert False, str(prop_type)
+            elem_columns = [columns] * len(names)
+            offsets = [i * len(columns) for i in range(len(names))]
+            if step_range is None:
+                timestamps = self._get_indices_df()["Timestamp"].values
+            else:
+                timestamps = self._read_indices_df(*step_range)["Timestamp"].values
+
+        array, terminals, components = _make_element_array(data, elem_columns, offsets)
+        if np.iscomplexobj(array):
+            if real_only:
+                array = array.real
+            elif abs_val:
+                array = np.abs(array)
+        coords = {
+            "time": timestamps,
+            "element": list(names),
+            "terminal": terminals,
+            "component": components,
+        }
+        return array, coords
+
+    def get_xarray(self, element_class, prop, names=None, real_only=False, abs_val=False,
+                   start_time=None, end_time=None):
+        """Return the values of a property for multiple elements as an
+        xarray.DataArray with dimensions (time, element, terminal, component).
+        Refer to get_numpy_array for details. Requires the xarray package.
+
+        Parameters
+        ----------
+        element_class : str
+        prop : str
+        names : list | None
+            Element names to read. Defaults to all elements that store prop.
+        real_only : bool
+            If the dtype is complex, return a view of the real component.
+        abs_val : bool
+            If the dtype is complex, compute its absolute value.
+        start_time : datetime | str | None
+            If set, exclude time points before this time.
+        end_time : datetime | str | None
+            If set, exclude time points after this time.
+
+        Returns
+        -------
+        xarray.DataArray
+
+        """
+        try:
+            import xarray
+        except ImportError:
+            raise InvalidConfiguration("get_xarray requires the xarray package")
+
+        array, coords = self.get_numpy_array(
+            element_class, prop, names=names, real_only=real_only, abs_val=abs_val,
+            start_time=start_time, end_time=end_time,
+        )
+        return xarray.DataArray(
+            array,
+            dims=("time", "element", "terminal", "component"),
+            coords=coords,
+            name=prop,
+        )
+
     def get_filtered_dataframes(self, element_class, prop, real_only=False, abs_val=False):
         """Return the dataframes for all elements.
 
@@ -488,46 +795,56 @@ class PyDssScenarioResults:
             return {}
 
         dataset = self._group[f"{element_class}/ElementProperties/{prop}"]
-        columns = DatasetBuffer.get_columns(dataset)
-        names = DatasetBuffer.get_names(dataset)
-        length = dataset.attrs["length"]
-        indices_df = self._get_indices_df()
-        data_vals = dataset[:length]
-        elem_data = defaultdict(list)
-        elem_timestamps = defaultdict(list)
-
-        # The time_step_dataset has these columns:
-        # 1. time step index
-        # 2. element index
-        # Each row describes the source data in the dataset row.
-        path = dataset.attrs["time_step_path"]
-        assert length == self._hdf_store[path].attrs["length"]
-        time_step_data = self._hdf_store[path][:length]
-
-        for i in range(length):
-            ts_index = time_step_data[:, 0][i]
-            elem_index = time_step_data[:, 1][i]
-            # TODO DT: more than one column?
-            val = data_vals[i, 0]
-            if real_only:
-                val = val.real
-            elif abs_val:
-                val = abs(val)
-            elem_data[elem_index].append(val)
-            elem_timestamps[elem_index].append(indices_df.iloc[ts_index, 0])
+        return self._get_filtered_dataframes(dataset, real_only=real_only, abs_val=abs_val)
 
+    def _get_filtered_dataframes(self, dataset, names=None, real_only=False, abs_val=False,
+                                 step_range=None):
+        columns = DatasetBuffer.get_columns(dataset)
+        all_names = DatasetBuffer.get_names(dataset)
+        data_vals, time_steps, elem_indices = self._read_filtered_data(
+            dataset, real_only=real_only, abs_val=abs_val,
+            row_range=self._get_row_range(dataset, step_range),
+        )
+        if step_range is None:
+            timestamps = self._get_indices_df()["Timestamp"].values
+        else:
+            timestamps = self._read_indices_df(*step_range)["Timestamp"].values
+            time_steps = time_steps - step_range[0]
+        if names is not None:
+            name_to_index = {x: i for i, x in enumerate(all_names)}
+            is_selected = np.isin(elem_indices, [name_to_index[x] for x in names])
+            data_vals = data_vals[is_selected]
+            time_steps = time_steps[is_selected]
+            elem_indices = elem_indices[is_selected]
+
+        # Group the rows by element in one pass. The stable sort keeps each
+        # element's rows in time order.
+        order = np.argsort(elem_indices, kind="stable")
+        unique_indices, starts = np.unique(elem_indices[order], return_index=True)
         dfs = {}
-        for elem_index, vals in elem_data.items():
-            elem_name = names[elem_index]
-            cols = self._fix_columns(elem_name, columns)
+        for elem_index, rows in zip(unique_indices, np.split(order, starts[1:])):
+            elem_name = all_names[elem_index]
             dfs[elem_name] = pd.DataFrame(
-                vals,
-                columns=cols,
-                index=elem_timestamps[elem_index],
+                data_vals[rows],
+                columns=self._fix_columns(elem_name, columns),
+                index=timestamps[time_steps[rows]],
             )
-        return dfs
+        if names is None:
+            return dfs
+
+        # Match get_dataframe, which returns an empty dataframe for an element
+        # with no stored values.
+        for name in names:
+            if name not in dfs:
+                dfs[name] = pd.DataFrame(
+                    data_vals[:0],
+                    columns=self._fix_columns(name, columns),
+                    index=timestamps[:0],
+                )
+        return {x: dfs[x] for x in names}
 
-    def get_full_dataframe(self, element_class, prop, real_only=False, abs_val=False, **kwargs):
+    def get_full_dataframe(self, element_class, prop, real_only=False, abs_val=False,
+                           start_time=None, end_time=None, **kwargs):
         """Return a dataframe containing all data.  The dataframe is copied.
 
         Parameters
@@ -538,6 +855,10 @@ class PyDssScenarioResults:
             If dtype of any column is complex, drop the imaginary component.
         abs_val : bool
             If dtype of any column is complex, compute its absolute value.
+        start_time : datetime | str | None
+            If set, exclude time points before this time.
+        end_time : datetime | str | None
+            If set, exclude time points after this time.
         kwargs
             Filter on options; values can be strings or regular expressions.
 
@@ -550,15 +871,25 @@ class PyDssScenarioResults:
             raise InvalidParameter(f"property {prop} is not stored")
 
         dataset = self._group[f"{element_class}/ElementProperties/{prop}"]
-        df = DatasetBuffer.to_dataframe(dataset)
+        step_range = self._get_time_step_range(start_time, end_time)
+        if get_dataset_property_type(dataset) == DatasetPropertyType.ON_CHANGE:
+            df = self._read_on_change_dataframe(dataset, step_range=step_range)
+        else:
+            df = DatasetBuffer.to_dataframe(
+                dataset,
+                row_range=self._get_row_range(dataset, step_range),
+                cache=self._chunk_cache,
+            )
         if kwargs:
             options = self._check_options(element_class, prop, **kwargs)
-            names = self._elems_by_class.get(element_class, set())
+            names = self._get_class_index(element_class).element_names
             columns = ValueStorageBase.get_columns(df, names, options, **kwargs)
             columns = list(columns)
             columns.sort()
             df = df[columns]
-        self._finalize_dataframe(df, dataset, real_only=real_only, abs_val=abs_val)
+        self._finalize_dataframe(
+            df, dataset, real_only=real_only, abs_val=abs_val, step_range=step_range
+        )
         return df
 
     def get_summed_element_total(self, element_class, prop, group=None):
@@ -583,20 +914,22 @@ class PyDssScenarioResults:
         """
         if group is not None:
             prop = ValueStorageBase.DELIMITER.join((prop, group))
-        if element_class not in self._summed_elem_props:
+        summed_values = self._get_class_index(element_class).summed_values
+        if not summed_values:
             raise InvalidParameter(f"{element_class} is not stored")
-        if prop not in self._summed_elem_props[element_class]:
+        if prop not in summed_values:
             raise InvalidParameter(f"{prop} is not stored")
 
-        return self._summed_elem_props[element_class][prop]
+        return summed_values[prop]
 
     def get_element_property_value(self, element_class, prop, element_name):
         """Return the number stored for the element property."""
-        if element_class not in self._elem_values_by_prop:
+        value_props = self._get_class_index(element_class).list_value_properties()
+        if not value_props:
             raise InvalidParameter(f"{element_class} is not stored")
-        if prop not in self._elem_values_by_prop[element_class]:
+        if prop not in value_props:
             raise InvalidParameter(f"{prop} is not stored")
-        if element_name not in self._elem_values_by_prop[element_class][prop]:
+        if element_name not in value_props[prop]:
             raise InvalidParameter(f"{element_name} is not stored")
         dataset = self._group[f"{element_class}/ElementProperties/{prop}"]
         col_range = self._get_element_column_range(element_class, prop, element_name)
@@ -621,7 +954,8 @@ class PyDssScenarioResults:
         df = self.get_dataframe(element_class, prop, element_name)
         return ValueStorageBase.get_option_values(df, element_name)
 
-    def get_summed_element_dataframe(self, element_class, prop, real_only=False, abs_val=False, group=None):
+    def get_summed_element_dataframe(self, element_class, prop, real_only=False, abs_val=False,
+                                     group=None, start_time=None, end_time=None):
         """Return the dataframe for a summed element property.
 
         Parameters
@@ -634,6 +968,10 @@ class PyDssScenarioResults:
             If dtype of any column is complex, drop the imaginary component.
         abs_val : bool
             If dtype of any column is complex, compute its absolute value.
+        start_time : datetime | str | None
+            If set, exclude time points before this time.
+        end_time : datetime | str | None
+            If set, exclude time points after this time.
 
         Returns
         -------
@@ -647,28 +985,28 @@ class PyDssScenarioResults:
         """
         if group is not None:
             prop = ValueStorageBase.DELIMITER.join((prop, group))
-        if element_class not in self._summed_elem_timeseries_props:
+        summed_props = self._get_class_index(element_class).list_summed_time_series_properties()
+        if not summed_props:
             raise InvalidParameter(f"{element_class} is not stored")
-        if prop not in self._summed_elem_timeseries_props[element_class]:
+        if prop not in summed_props:
             raise InvalidParameter(f"{prop} is not stored")
 
         elem_group = self._group[element_class]["SummedElementProperties"]
         dataset = elem_group[prop]
-        df = DatasetBuffer.to_dataframe(dataset)
-        self._add_indices_to_dataframe(df)
+        step_range = self._get_time_step_range(start_time, end_time)
+        df = DatasetBuffer.to_dataframe(
+            dataset,
+            row_range=self._get_row_range(dataset, step_range),
+            cache=self._chunk_cache,
+        )
+        self._add_indices_to_dataframe(df, dataset, step_range=step_range)
 
-        if real_only:
-            for column in df.columns:
-                if df[column].dtype == complex:
-                    df[column] = [x.real for x in df[column]]
-        elif abs_val:
-            for column in df.columns:
-                if df[column].dtype == complex:
-                    df[column] = [abs(x) for x in df[column]]
+        _convert_complex_columns(df, real_only=real_only, abs_val=abs_val)
 
         return df
 
-    def iterate_dataframes(self, element_class, prop, real_only=False, abs_val=False, **kwargs):
+    def iterate_dataframes(self, element_class, prop, real_only=False, abs_val=False,
+                           start_time=None, end_time=None, **kwargs):
         """Returns a generator over the dataframes by element name.
 
         Parameters
@@ -679,6 +1017,10 @@ class PyDssScenarioResults:
             If dtype of any column is complex, drop the imaginary component.
         abs_val : bool
             If dtype of any column is complex, compute its absolute value.
+        start_time : datetime | str | None
+            If set, exclude time points before this time.
+        end_time : datetime | str | None
+            If set, exclude time points after this time.
         kwargs : dict
             Filter on options; values can be strings or regular expressions.
 
@@ -688,10 +1030,12 @@ class PyDssScenarioResults:
             Tuple containing the name or property and a pd.DataFrame
 
         """
+        element_properties = self._get_class_index(element_class).element_properties
         for name in self.list_element_names(element_class):
-            if prop in self._elem_props[name]:
+            if prop in element_properties[name]:
                 df = self.get_dataframe(
-                    element_class, prop, name, real_only=real_only, abs_val=abs_val, **kwargs
+                    element_class, prop, name, real_only=real_only, abs_val=abs_val,
+                    start_time=start_time, end_time=end_time, **kwargs
                 )
                 yield name, df
 
@@ -704,9 +1048,10 @@ class PyDssScenarioResults:
             element_class, property, element_name, value
 
         """
-        for elem_class in self._elem_values_by_prop:
-            for prop in self._elem_values_by_prop[elem_class]:
-                for name in self._elem_values_by_prop[elem_class][prop]:
+        for elem_class in self._elem_classes:
+            value_props = self._get_class_index(elem_class).list_value_properties()
+            for prop, names in value_props.items():
+                for name in names:
                     val = self.get_element_property_value(elem_class, prop, name)
                     yield elem_class, prop, name, val
 
@@ -734,7 +1079,7 @@ class PyDssScenarioResults:
 
         """
         # TODO: prop is deprecated
-        return sorted(list(self._elems_by_class.get(element_class, [])))
+        return sorted(self._get_class_index(element_class).element_names)
 
     def list_element_properties(self, element_class, element_name=None):
         """Return the properties stored in the results for a class.
@@ -750,18 +1095,18 @@ class PyDssScenarioResults:
         list
 
         """
-        if element_class not in self._props_by_class:
-            return []
+        index = self._get_class_index(element_class)
         if element_name is None:
-            return sorted(list(self._props_by_class[element_class]))
-        return self._elem_props.get(element_name, [])
+            return sorted(index.list_properties())
+        return index.element_properties.get(element_name, [])
 
     def list_element_value_names(self, element_class, prop):
-        if element_class not in self._elem_values_by_prop:
+        value_props = self._get_class_index(element_class).list_value_properties()
+        if not value_props:
             raise InvalidParameter(f"{element_class} is not stored")
-        if prop not in self._elem_values_by_prop[element_class]:
+        if prop not in value_props:
             raise InvalidParameter(f"{element_class} / {prop} is not stored")
-        return sorted(self._elem_values_by_prop[element_class][prop])
+        return sorted(value_props[prop])
 
     def list_element_property_values(self, element_name):
         nums = []
@@ -816,9 +1161,10 @@ class PyDssScenarioResults:
             Raised if the element_class is not stored.
 
         """
-        if element_class not in self._summed_elem_props:
+        summed_values = self._get_class_index(element_class).summed_values
+        if not summed_values:
             raise InvalidParameter(f"class={element_class} is not stored")
-        return self._summed_elem_props[element_class]
+        return summed_values
 
     def list_summed_element_time_series_properties(self, element_class):
         """Return the properties stored for a class where the values are a sum
@@ -838,9 +1184,10 @@ class PyDssScenarioResults:
             Raised if the element_class is not stored.
 
         """
-        if element_class not in self._summed_elem_timeseries_props:
+        summed_props = self._get_class_index(element_class).list_summed_time_series_properties()
+        if not summed_props:
             raise InvalidParameter(f"class={element_class} is not stored")
-        return self._summed_elem_timeseries_props[element_class]
+        return summed_props
 
     def read_element_info_file(self, filename):
         """Return the contents of file describing an OpenDSS element object.
@@ -940,8 +1287,20 @@ class PyDssScenarioResults:
         """
         return self._fs_intf.read_file(path)
 
-    def _add_indices_to_dataframe(self, df):
-        indices_df = self._get_indices_df()
+    def _get_indices_for_dataset(self, dataset, step_range=None):
+        # The dataset only has rows for every sample_interval time steps.
+        sample_interval = get_sample_interval(dataset)
+        if step_range is None:
+            indices_df = self._get_indices_df()
+            if sample_interval > 1:
+                indices_df = indices_df.iloc[::sample_interval].reset_index(drop=True)
+        else:
+            start = self._get_row_range(dataset, step_range)[0] * sample_interval
+            indices_df = self._read_indices_df(start, step_range[1], sample_interval)
+        return indices_df
+
+    def _add_indices_to_dataframe(self, df, dataset, step_range=None):
+        indices_df = self._get_indices_for_dataset(dataset, step_range=step_range)
         df["Timestamp"] = indices_df["Timestamp"]
         if self._add_frequency:
             df["Frequency"] = indices_df["Frequency"]
@@ -949,26 +1308,37 @@ class PyDssScenarioResults:
             df["Simulation Mode"] = indices_df["Simulation Mode"]
         df.set_index("Timestamp", inplace=True)
 
-    def _finalize_dataframe(self, df, dataset, real_only=False, abs_val=False):
+    def _finalize_dataframe(self, df, dataset, real_only=False, abs_val=False, step_range=None):
         if df.empty:
             return
         dataset_property_type = get_dataset_property_type(dataset)
         if dataset_property_type == DatasetPropertyType.FILTERED:
             time_step_path = get_time_step_path(dataset)
             time_step_dataset = self._hdf_store[time_step_path]
-            df["TimeStep"] = DatasetBuffer.to_datetime(time_step_dataset)
+            df["TimeStep"] = DatasetBuffer.to_datetime(
+                time_step_dataset,
+                row_range=self._get_row_range(dataset, step_range),
+                cache=self._chunk_cache,
+            )
             df.set_index("TimeStep", inplace=True)
         else:
-            self._add_indices_to_dataframe(df)
+            self._add_indices_to_dataframe(df, dataset, step_range=step_range)
 
-        if real_only:
-            for column in df.columns:
-                if df[column].dtype == complex:
-                    df[column] = [x.real for x in df[column]]
-        elif abs_val:
-            for column in df.columns:
-                if df[column].dtype == complex:
-                    df[column] = [abs(x) for x in df[column]]
+        _convert_complex_columns(df, real_only=real_only, abs_val=abs_val)
+
+    def _check_element_names(self, element_class, prop, names):
+        """Return the names to read and the dataset index of each element.
+        Defaults to all elements that store prop, in dataset order.
+        """
+        if prop not in self.list_element_properties(element_class):
+            raise InvalidParameter(f"property {prop} is not stored")
+        elem_indices = self._get_class_index(element_class).get_element_indices(prop)
+        if names is None:
+            names = sorted(elem_indices, key=lambda x: elem_indices[x])
+        for name in names:
+            if name not in elem_indices:
+                raise InvalidParameter(f"element {name} is not stored for {prop}")
+        return names, elem_indices
 
     @staticmethod
     def _fix_columns(name, columns):
@@ -979,56 +1349,180 @@ class PyDssScenarioResults:
             cols.append(ValueStorageBase.DELIMITER.join(fields))
         return cols
 
-    def _get_elem_prop_dataframe(self, elem_class, prop, name, dataset, real_only=False, abs_val=False, **kwargs):
+    def _get_elem_prop_dataframe(self, elem_class, prop, name, dataset, real_only=False, abs_val=False,
+                                 step_range=None, **kwargs):
         col_range = self._get_element_column_range(elem_class, prop, name)
-        df = DatasetBuffer.to_dataframe(dataset, column_range=col_range)
+        df = DatasetBuffer.to_dataframe(
+            dataset,
+            column_range=col_range,
+            row_range=self._get_row_range(dataset, step_range),
+            cache=self._chunk_cache,
+        )
 
         if kwargs:
             options = self._check_options(elem_class, prop, **kwargs)
             columns = ValueStorageBase.get_columns(df, name, options, **kwargs)
             df = df[columns]
 
-        self._finalize_dataframe(df, dataset, real_only=real_only, abs_val=abs_val)
+        self._finalize_dataframe(
+            df, dataset, real_only=real_only, abs_val=abs_val, step_range=step_range
+        )
         return df
 
     def _get_element_column_range(self, elem_class, prop, name):
-        elem_index = self._elem_indices_by_prop[elem_class][prop][name]
-        col_range = self._column_ranges_per_elem[elem_class][prop][elem_index]
-        return col_range
+        index = self._get_class_index(elem_class)
+        elem_index = index.get_element_indices(prop)[name]
+        return index.get_column_ranges(prop)[elem_index]
 
     def _get_filtered_dataframe(self, elem_class, prop, name, dataset,
-                                real_only=False, abs_val=False, **kwargs):
-        indices_df = self._get_indices_df()
-        elem_index = self._elem_indices_by_prop[elem_class][prop][name]
+                                real_only=False, abs_val=False, step_range=None, **kwargs):
+        elem_index = self._get_class_index(elem_class).get_element_indices(prop)[name]
+        data_vals, time_steps, elem_indices = self._read_filtered_data(
+            dataset, real_only=real_only, abs_val=abs_val,
+            row_range=self._get_row_range(dataset, step_range),
+        )
+        rows = elem_indices == elem_index
+        if step_range is None:
+            timestamps = self._get_indices_df()["Timestamp"].values
+        else:
+            timestamps = self._read_indices_df(*step_range)["Timestamp"].values
+            time_steps = time_steps - step_range[0]
+        columns = self._fix_columns(name, DatasetBuffer.get_columns(dataset))
+        return pd.DataFrame(
+            data_vals[rows],
+            columns=columns,
+            index=timestamps[time_steps[rows]],
+        )
+
+    def _read_filtered_data(self, dataset, real_only=False, abs_val=False, row_range=None):
+        """Read a filtered dataset and its time step dataset.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+        real_only : bool
+        abs_val : bool
+        row_range : tuple | None
+            Read rows [start, end). Defaults to all rows.
+
+        Returns
+        -------
+        tuple
+            data values (np.ndarray), time step indices (np.ndarray),
+            element indices (np.ndarray). Row i of each array describes the
+            same stored value.
+
+        """
         length = dataset.attrs["length"]
-        data_vals = dataset[:length]
+        start, end = (0, length) if row_range is None else row_range
+        data_vals = DatasetBuffer.read(dataset, slice(start, end), cache=self._chunk_cache)
 
         # The time_step_dataset has these columns:
         # 1. time step index
         # 2. element index
         # Each row describes the source data in the dataset row.
         path = dataset.attrs["time_step_path"]
-        time_step_data = self._hdf_store[path][:length]
-
         assert length == self._hdf_store[path].attrs["length"]
-        data = []
-        timestamps = []
-        for i in range(length):
-            stored_elem_index = time_step_data[:, 1][i]
-            if stored_elem_index == elem_index:
-                ts_index = time_step_data[:, 0][i]
-                # TODO DT: more than one column?
-                val = data_vals[i, 0]
-                # TODO: profile this vs a df operation at end
-                if real_only:
-                    val = val.real
-                elif abs_val:
-                    val = abs(val)
-                data.append(val)
-                timestamps.append(indices_df.iloc[ts_index, 0])
+        time_step_data = DatasetBuffer.read(
+            self._hdf_store[path], slice(start, end), cache=self._chunk_cache
+        )
 
-        columns = self._fix_columns(name, DatasetBuffer.get_columns(dataset))
-        return pd.DataFrame(data, columns=columns, index=timestamps)
+        if real_only:
+            data_vals = np.real(data_vals)
+        elif abs_val:
+            data_vals = np.abs(data_vals)
+        return data_vals, time_step_data[:, 0], time_step_data[:, 1]
+
+    def _read_filtered_array(self, dataset, elem_indices, step_range=None):
+        """Return the values of a filtered dataset in an array with a row for
+        every time step and the columns of each element side by side. Values
+        that were not stored are NaN.
+        """
+        data_vals, time_steps, stored_elem_indices = self._read_filtered_data(
+            dataset, row_range=self._get_row_range(dataset, step_range),
+        )
+        if step_range is None:
+            step_range = (0, len(self._get_indices_df()))
+        num_columns = data_vals.shape[1]
+        dtype = data_vals.dtype if np.issubdtype(data_vals.dtype, np.inexact) else np.float64
+        dense = np.full(
+            (step_range[1] - step_range[0], len(elem_indices), num_columns), np.NaN, dtype=dtype
+        )
+        # Map each stored element index to its position in the output.
+        positions = np.full(max(elem_indices, default=-1) + 2, -1, dtype=np.int64)
+        positions[elem_indices] = np.arange(len(elem_indices))
+        stored_positions = positions[np.minimum(stored_elem_indices, len(positions) - 1)]
+        rows = stored_positions >= 0
+        dense[time_steps[rows] - step_range[0], stored_positions[rows]] = data_vals[rows]
+        return dense.reshape(len(dense), len(elem_indices) * num_columns)
+
+    def _read_on_change_dataframe(self, dataset, elem_indices=None, step_range=None):
+        """Return a dataframe with a row for every time point from a dataset
+        that only stores changes. Each element's value is filled forward from
+        the time step of each change. Values before an element's first change
+        are NaN.
+
+        Parameters
+        ----------
+        dataset : h5py.Dataset
+        elem_indices : list | None
+            Indices of the elements to read. Defaults to all elements.
+        step_range : tuple | None
+            Time steps [start, end) to include. Defaults to all time steps.
+
+        Returns
+        -------
+        pd.DataFrame
+
+        """
+        columns = DatasetBuffer.get_columns(dataset)
+        if dataset.attrs.get("num_columns_per_element") != len(columns):
+            raise InvalidConfiguration(
+                f"{dataset.name} may store elements with different numbers of values, which "
+                "on_change does not support. Run the simulation again with this version of "
+                "PyDSS to check the elements."
+            )
+        names = DatasetBuffer.get_names(dataset)
+        length = dataset.attrs["length"]
+        data = DatasetBuffer.read(dataset, slice(0, length), cache=self._chunk_cache)
+        time_step_data = DatasetBuffer.read(
+            self._hdf_store[get_time_step_path(dataset)], slice(0, length),
+            cache=self._chunk_cache,
+        )
+        if step_range is None:
+            step_range = (0, len(self._get_indices_df()))
+        time_steps = np.arange(*step_range)
+        num_time_steps = len(time_steps)
+        dtype = data.dtype if np.issubdtype(data.dtype, np.inexact) else np.float64
+        if elem_indices is None:
+            elem_indices = range(len(names))
+
+        # Group the rows by element in one pass. The stable sort keeps each
+        # element's rows in time order.
+        order = np.argsort(time_step_data[:, 1], kind="stable")
+        unique_indices, starts = np.unique(time_step_data[order, 1], return_index=True)
+        rows_by_element = dict(zip(unique_indices.tolist(), np.split(order, starts[1:])))
+        no_rows = order[:0]
+
+        arrays = []
+        all_columns = []
+        for elem_index in elem_indices:
+            rows = rows_by_element.get(elem_index, no_rows)
+            change_time_steps = time_step_data[rows, 0]
+            # Rows are written in time step order. Find the last change at or
+            # before each time step.
+            positions = np.searchsorted(change_time_steps, time_steps, side="right") - 1
+            dense = np.full((num_time_steps, len(columns)), np.NaN, dtype=dtype)
+            is_set = positions >= 0
+            dense[is_set] = data[rows[positions[is_set]]]
+            arrays.append(dense)
+            all_columns += self._fix_columns(names[elem_index], columns)
+
+        if arrays:
+            values = np.concatenate(arrays, axis=1)
+        else:
+            values = np.empty((num_time_steps, 0), dtype=dtype)
+        return pd.DataFrame(values, columns=all_columns)
 
     def _get_indices_df(self):
         if self._indices_df is None:
@@ -1036,15 +1530,226 @@ class PyDssScenarioResults:
         return self._indices_df
 
     def _make_indices_df(self):
-        data = {
-            "Timestamp": make_timestamps(self._group["Timestamp"][:, 0])
-        }
+        self._indices_df = self._read_indices_df()
+
+    def _read_indices_df(self, start=None, end=None, interval=1):
+        """Read the time point indices for time steps [start, end) in
+        increments of interval. Only converts the timestamps that are read.
+        """
+        def read(name):
+            dataset = self._group[name]
+            data = DatasetBuffer.read(dataset, slice(start, end), cache=self._chunk_cache)
+            return data[::interval, 0]
+
+        data = {"Timestamp": make_timestamps(read("Timestamp"))}
         if self._add_frequency:
-            data["Frequency"] = self._group["Frequency"][:, 0]
+            data["Frequency"] = read("Frequency")
         if self._add_mode:
-            data["Simulation Mode"] = self._group["Mode"][:, 0]
-        df = pd.DataFrame(data)
-        self._indices_df = df
+            data["Simulation Mode"] = read("Mode")
+        return pd.DataFrame(data)
+
+    def _get_time_step_seconds(self, dataset):
+        """Return the number of seconds between rows of the dataset."""
+        timestamps = self._group["Timestamp"]
+        if timestamps.attrs["length"] < 2:
+            return 0.0
+        seconds = timestamps[1, 0] - timestamps[0, 0]
+        return float(seconds * get_sample_interval(dataset))
+
+    def _get_time_step_range(self, start_time=None, end_time=None):
+        """Return the time steps [start, end) with timestamps between
+        start_time and end_time, inclusive. Performs a binary search over the
+        Timestamp dataset.
+
+        Returns
+        -------
+        tuple | None
+            None if both times are None
+
+        """
+        if start_time is None and end_time is None:
+            return None
+
+        dataset = self._group["Timestamp"]
+        start = 0
+        end = dataset.attrs["length"]
+        if start_time is not None:
+            start = DatasetBuffer.search_sorted(
+                dataset, _to_epoch_seconds(start_time), cache=self._chunk_cache
+            )
+        if end_time is not None:
+            end = DatasetBuffer.search_sorted(
+                dataset, _to_epoch_seconds(end_time), side="right", cache=self._chunk_cache
+            )
+        return start, max(start, end)
+
+    def _read_element_columns(self, dataset, column_ranges, step_range):
+        """Read the column ranges of elements from a dataset stored at every
+        time point. Each run of contiguous columns is read once and columns
+        between the runs are not read. Every chunk spans all columns, so the
+        chunk cache decodes each chunk once for all runs.
+
+        Returns
+        -------
+        tuple
+            np.ndarray of the columns of the runs, their names, and for each
+            column range the index of its first column in the array
+
+        """
+        runs, offsets = _make_column_runs(column_ranges)
+        rows = DatasetBuffer._make_row_slice(dataset, self._get_row_range(dataset, step_range))
+        arrays = [
+            DatasetBuffer.read(dataset, rows, slice(start, start + length), cache=self._chunk_cache)
+            for start, length in runs or [(0, 0)]
+        ]
+        data = arrays[0] if len(arrays) == 1 else np.concatenate(arrays, axis=1)
+        dataset_columns = DatasetBuffer.get_columns(dataset)
+        columns = [x for start, length in runs for x in dataset_columns[start:start + length]]
+        return data, columns, offsets
+
+    def _get_row_range(self, dataset, step_range):
+        """Return the rows [start, end) of dataset that hold time steps in
+        step_range.
+
+        Returns
+        -------
+        tuple | None
+            None if step_range is None
+
+        """
+        if step_range is None:
+            return None
+
+        if get_dataset_property_type(dataset) == DatasetPropertyType.FILTERED:
+            # Rows are stored in time step order.
+            time_step_dataset = self._hdf_store[get_time_step_path(dataset)]
+            return tuple(
+                DatasetBuffer.search_sorted(time_step_dataset, x, cache=self._chunk_cache)
+                for x in step_range
+            )
+
+        # Row i holds time step i * sample_interval.
+        sample_interval = get_sample_interval(dataset)
+        return tuple(-(-x // sample_interval) for x in step_range)
+
+
+def _convert_complex_columns(df, real_only=False, abs_val=False):
+    """Replace complex columns with their real components or absolute values."""
+    if not real_only and not abs_val:
+        return
+    for column in df.columns:
+        if df[column].dtype == complex:
+            values = df[column].values
+            df[column] = values.real if real_only else np.abs(values)
+
+
+def _make_column_runs(column_ranges):
+    """Merge column ranges into runs of contiguous columns.
+
+    Parameters
+    ----------
+    column_ranges : list
+        list of (start, length)
+
+    Returns
+    -------
+    tuple
+        list of (start, length) of the runs in column order and, for each
+        column range, the index of its first column in the concatenated runs
+
+    """
+    runs = []
+    for start, length in sorted(map(tuple, column_ranges)):
+        if runs and start <= runs[-1][0] + runs[-1][1]:
+            run_start, run_length = runs[-1]
+            runs[-1] = (run_start, max(run_length, start + length - run_start))
+        else:
+            runs.append((start, length))
+
+    run_starts = [x[0] for x in runs]
+    run_offsets = np.cumsum([0] + [x[1] for x in runs]).tolist()
+    offsets = []
+    for start, _ in column_ranges:
+        index = bisect.bisect_right(run_starts, start) - 1
+        offsets.append(run_offsets[index] + start - run_starts[index])
+    return runs, offsets
+
+
+def _split_column_label(column):
+    """Return the terminal and component of a column. Ex:
+    Line.one__A1__mag [Volts] -> ("A1", "mag [Volts]")
+    Line.one__A1 [Amps] -> ("A1 [Amps]", "")
+    """
+    fields = column.split(ValueStorageBase.DELIMITER)
+    if len(fields) > 2:
+        return ValueStorageBase.DELIMITER.join(fields[1:-1]), fields[-1]
+    return fields[-1], ""
+
+
+def _make_element_array(data, elem_columns, offsets):
+    """Arrange the columns of each element in an array with dimensions
+    (time, element, terminal, component).
+
+    Parameters
+    ----------
+    data : np.ndarray
+        Two-dimensional array of (time, column)
+    elem_columns : list
+        Column names of each element
+    offsets : list
+        Column in data of each element's first column
+
+    Returns
+    -------
+    tuple
+        np.ndarray, terminal labels (list), component labels (list)
+
+    """
+    terminals = {}
+    components = {}
+    positions = []
+    for columns in elem_columns:
+        elem_positions = []
+        for column in columns:
+            terminal, component = _split_column_label(column)
+            elem_positions.append((
+                terminals.setdefault(terminal, len(terminals)),
+                components.setdefault(component, len(components)),
+            ))
+        positions.append(elem_positions)
+
+    num_times = data.shape[0]
+    num_elements = len(elem_columns)
+    shape = (num_times, num_elements, len(terminals), len(components))
+    full_layout = [
+        (i, j) for i in range(len(terminals)) for j in range(len(components))
+    ]
+    num_columns = len(full_layout)
+    is_uniform = all(
+        x == full_layout and offset == i * num_columns
+        for i, (x, offset) in enumerate(zip(positions, offsets))
+    )
+    if is_uniform and data.shape[1] == num_elements * num_columns:
+        return data.reshape(shape), list(terminals), list(components)
+
+    dtype = data.dtype if np.issubdtype(data.dtype, np.inexact) else np.float64
+    array = np.full(shape, np.NaN, dtype=dtype)
+    for i, (elem_positions, offset) in enumerate(zip(positions, offsets)):
+        if not elem_positions:
+            continue
+        terminal_indices, component_indices = zip(*elem_positions)
+        array[:, i, terminal_indices, component_indices] = \
+            data[:, offset:offset + len(elem_positions)]
+    return array, list(terminals), list(components)
+
+
+def _to_epoch_seconds(timestamp):
+    # The Timestamp dataset stores seconds since the Epoch without any
+    # timezone conversions, so the stored times compare like UTC times.
+    timestamp = pd.Timestamp(timestamp)
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.tz_convert(None)
+    return (timestamp - pd.Timestamp(0)).total_seconds()
 
 
 def _read_capacitor_changes(event_log_text):
@@ -169,6 +169,35 @@ class ReportBase(abc.ABC):
 
         """
 
+    def _get_in_memory_metrics_files(self, filename):
+        """Return the metrics files written by the data stores of each scenario.
+        A Monte Carlo run writes one file per sample.
+
+        Parameters
+        ----------
+        filename : str
+            base name of the file
+
+        Returns
+        -------
+        dict
+            Maps the data store name, such as scenario_1 or scenario_1_MC0, to
+            the path of its file.
+
+        """
+        exports_dir = os.path.join(str(self._settings.project.active_project_path), "Exports")
+        num_samples = self._settings.monte_carlo.num_scenarios
+        files = {}
+        for scenario in self._results.scenarios:
+            if num_samples > 0:
+                names = [f"{scenario.name}_MC{i}" for i in range(num_samples)]
+            else:
+                names = [scenario.name]
+            for name in names:
+                files[name] = os.path.join(exports_dir, name, filename)
+
+        return files
+
     @staticmethod
     @abc.abstractmethod
     def get_required_exports(simulation_config):
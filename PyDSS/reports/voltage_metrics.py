@@ -109,14 +109,8 @@ class VoltageMetrics(ReportBase):
 
     def _generate_from_in_memory_metrics(self):
         scenarios = {}
-        for scenario in self._results.scenarios:
-            filename = os.path.join(
-                str(self._settings.project.active_project_path),
-                "Exports",
-                scenario.name,
-                self.FILENAME,
-            )
-            scenarios[scenario.name] = VoltageMetricsByBusTypeModel(**load_data(filename))
+        for name, filename in self._get_in_memory_metrics_files(self.FILENAME).items():
+            scenarios[name] = VoltageMetricsByBusTypeModel(**load_data(filename))
             # We won't need this file after we write the consolidated file.
             self._files_to_delete.append(filename)
 
@@ -0,0 +1,311 @@
+"""Contains the index of element datasets stored in a PyDSS HDF5 file."""
+
+import json
+import logging
+
+from PyDSS.common import DatasetPropertyType
+from PyDSS.dataset_buffer import DatasetBuffer
+from PyDSS.value_storage import get_dataset_property_type
+
+
+RESULT_INDEX_DATASET = "ResultIndex"
+RESULT_INDEX_VERSION = 1
+
+logger = logging.getLogger(__name__)
+
+
+class ElementClassIndex:
+    """Describes the element property datasets stored for one element class.
+
+    ResultData writes the index into each element class group when it closes.
+    Readers load it with one dataset read instead of decoding the Names
+    datasets for every property. Files without a current index are parsed
+    from the datasets.
+
+    """
+
+    def __init__(self, class_group, element_names, properties, summed_properties):
+        """Constructor for ElementClassIndex
+
+        Parameters
+        ----------
+        class_group : h5py.Group
+        element_names : list
+            All element names stored for the class.
+        properties : dict
+            Maps property name to a tuple of DatasetPropertyType and the
+            element names in dataset order.
+        summed_properties : dict
+            Maps summed property name to DatasetPropertyType.
+
+        """
+        self._class_group = class_group
+        self._element_names = set(element_names)
+        self._properties = properties
+        self._summed_properties = summed_properties
+        self._element_indices = {}
+        self._element_properties = None
+        self._column_ranges = {}
+        self._summed_values = None
+
+    @classmethod
+    def load(cls, class_group):
+        """Load the index for an element class.
+
+        Parameters
+        ----------
+        class_group : h5py.Group
+
+        Returns
+        -------
+        ElementClassIndex
+
+        """
+        dataset = class_group.get(RESULT_INDEX_DATASET)
+        if dataset is not None and dataset.attrs.get("version") == RESULT_INDEX_VERSION:
+            return cls._from_index(class_group, json.loads(dataset[()]))
+
+        if dataset is not None:
+            logger.info("Ignoring result index with version=%s in %s",
+                        dataset.attrs.get("version"), class_group.name)
+        return cls.from_datasets(class_group)
+
+    @classmethod
+    def _from_index(cls, class_group, data):
+        names = data["names"]
+        properties = {}
+        for prop, info in data["properties"].items():
+            indices = info["names"]
+            prop_names = names if indices is None else [names[i] for i in indices]
+            properties[prop] = (DatasetPropertyType(info["type"]), prop_names)
+        summed_properties = {
+            x: DatasetPropertyType(y) for x, y in data["summed_properties"].items()
+        }
+        return cls(class_group, names, properties, summed_properties)
+
+    @classmethod
+    def from_datasets(cls, class_group):
+        """Create the index by parsing the datasets in an element class group.
+
+        Parameters
+        ----------
+        class_group : h5py.Group
+
+        Returns
+        -------
+        ElementClassIndex
+
+        """
+        element_names = []
+        properties = {}
+        if "ElementProperties" in class_group:
+            names_seen = set()
+            for prop, dataset in class_group["ElementProperties"].items():
+                prop_type = get_dataset_property_type(dataset)
+                if prop_type not in (
+                    DatasetPropertyType.PER_TIME_POINT,
+                    DatasetPropertyType.FILTERED,
+                    DatasetPropertyType.ON_CHANGE,
+                    DatasetPropertyType.VALUE,
+                ):
+                    continue
+                names = DatasetBuffer.get_names(dataset)
+                properties[prop] = (prop_type, names)
+                for name in names:
+                    if name not in names_seen:
+                        names_seen.add(name)
+                        element_names.append(name)
+
+        summed_properties = {}
+        for prop, dataset in class_group.get("SummedElementProperties", {}).items():
+            prop_type = get_dataset_property_type(dataset)
+            if prop_type in (DatasetPropertyType.VALUE, DatasetPropertyType.PER_TIME_POINT):
+                summed_properties[prop] = prop_type
+
+        return cls(class_group, element_names, properties, summed_properties)
+
+    def serialize(self):
+        """Serialize the index to a dictionary.
+
+        Returns
+        -------
+        dict
+
+        """
+        names = sorted(self._element_names)
+        name_indices = {x: i for i, x in enumerate(names)}
+        properties = {}
+        for prop, (prop_type, prop_names) in self._properties.items():
+            if prop_names == names:
+                # This is the common case. Avoid storing the names again.
+                indices = None
+            else:
+                indices = [name_indices[x] for x in prop_names]
+            properties[prop] = {"type": prop_type.value, "names": indices}
+
+        return {
+            "version": RESULT_INDEX_VERSION,
+            "names": names,
+            "properties": properties,
+            "summed_properties": {x: y.value for x, y in self._summed_properties.items()},
+        }
+
+    @property
+    def element_names(self):
+        """Return the names of all elements stored for the class.
+
+        Returns
+        -------
+        set
+
+        """
+        return self._element_names
+
+    @property
+    def element_properties(self):
+        """Return the properties stored for each element.
+
+        Returns
+        -------
+        dict
+            Maps element name to a list of property names.
+
+        """
+        if self._element_properties is None:
+            self._element_properties = {x: [] for x in self._element_names}
+            for prop, (_, names) in self._properties.items():
+                for name in names:
+                    self._element_properties[name].append(prop)
+        return self._element_properties
+
+    def get_column_ranges(self, prop):
+        """Return the column ranges per element for a property.
+
+        Parameters
+        ----------
+        prop : str
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        column_ranges = self._column_ranges.get(prop)
+        if column_ranges is None:
+            dataset = self._class_group["ElementProperties"][prop]
+            column_ranges = DatasetBuffer.get_column_ranges(dataset)
+            self._column_ranges[prop] = column_ranges
+        return column_ranges
+
+    def get_element_indices(self, prop):
+        """Return the dataset index of each element for a property.
+
+        Parameters
+        ----------
+        prop : str
+
+        Returns
+        -------
+        dict
+            Maps element name to index.
+
+        """
+        indices = self._element_indices.get(prop)
+        if indices is None:
+            indices = {x: i for i, x in enumerate(self._properties[prop][1])}
+            self._element_indices[prop] = indices
+        return indices
+
+    def list_properties(self):
+        """Return the properties stored for the class.
+
+        Returns
+        -------
+        list
+
+        """
+        return list(self._properties)
+
+    def list_time_series_properties(self):
+        """Return the properties stored with values over time.
+
+        Returns
+        -------
+        dict
+            Maps property name to the element names in dataset order.
+
+        """
+        return {
+            x: y[1] for x, y in self._properties.items()
+            if y[0] != DatasetPropertyType.VALUE
+        }
+
+    def list_value_properties(self):
+        """Return the properties stored with one value per element.
+
+        Returns
+        -------
+        dict
+            Maps property name to the element names in dataset order.
+
+        """
+        return {
+            x: y[1] for x, y in self._properties.items()
+            if y[0] == DatasetPropertyType.VALUE
+        }
+
+    def list_summed_time_series_properties(self):
+        """Return the summed properties stored with values over time.
+
+        Returns
+        -------
+        list
+
+        """
+        return [
+            x for x, y in self._summed_properties.items()
+            if y == DatasetPropertyType.PER_TIME_POINT
+        ]
+
+    @property
+    def summed_values(self):
+        """Return the summed properties stored as one value.
+
+        Returns
+        -------
+        dict
+            Maps property name to a dict of column to value.
+
+        """
+        if self._summed_values is None:
+            self._summed_values = {}
+            for prop, prop_type in self._summed_properties.items():
+                if prop_type == DatasetPropertyType.VALUE:
+                    dataset = self._class_group["SummedElementProperties"][prop]
+                    df = DatasetBuffer.to_dataframe(dataset)
+                    assert len(df) == 1
+                    self._summed_values[prop] = {x: df[x].values[0] for x in df.columns}
+        return self._summed_values
+
+
+def write_result_index(scenario_group):
+    """Write an index into each element class group of a scenario.
+
+    Parameters
+    ----------
+    scenario_group : h5py.Group
+
+    """
+    for name, class_group in scenario_group.items():
+        if not hasattr(class_group, "items"):
+            # Timestamp, Frequency, Mode
+            continue
+        index = ElementClassIndex.from_datasets(class_group)
+        if RESULT_INDEX_DATASET in class_group:
+            del class_group[RESULT_INDEX_DATASET]
+        dataset = class_group.create_dataset(
+            RESULT_INDEX_DATASET, data=json.dumps(index.serialize())
+        )
+        dataset.attrs["type"] = DatasetPropertyType.METADATA.value
+        dataset.attrs["version"] = RESULT_INDEX_VERSION
+        logger.debug("Wrote result index for %s", class_group.name)
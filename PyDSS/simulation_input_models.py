@@ -12,13 +12,16 @@ from pydantic.json import isoformat, timedelta_isoformat
 from PyDSS.common import (
     ControlMode,
     FileFormat,
+    HdfCompression,
     LoggingLevel,
     ReportGranularity,
     SimulationType,
     SnapshotTimePointSelectionMode,
     SIMULATION_SETTINGS_FILENAME,
 )
-from PyDSS.dataset_buffer import DEFAULT_MAX_CHUNK_BYTES
+from PyDSS.async_hdf_writer import DEFAULT_MAX_QUEUE_SIZE
+from PyDSS.dataset_buffer import DEFAULT_MAX_CHUNK_BYTES, make_compression_kwargs
+from PyDSS.exceptions import InvalidConfiguration
 from PyDSS.utils.utils import dump_data, load_data
 
 
@@ -245,6 +248,30 @@ class ProjectModel(InputsBaseModel):
         alias="Use Controller Registry",
         default=False,
     )
+    reuse_compiled_circuit: bool = Field(
+        title="reuse_compiled_circuit",
+        description="Reuse the compiled circuit in later scenarios of the same process if the "
+                    "DSS files have not changed. PyDSS restores the circuit's state instead of "
+                    "compiling it again.",
+        alias="Reuse compiled circuit",
+        default=False,
+    )
+    cache_circuit_metadata: bool = Field(
+        title="cache_circuit_metadata",
+        description="Store metadata of the compiled circuit, such as the voltage bases of its "
+                    "nodes, in the Exports directory and load it in later runs if the DSS files "
+                    "have not changed.",
+        alias="Cache circuit metadata",
+        default=True,
+    )
+    verify_active_object: bool = Field(
+        title="verify_active_object",
+        description="Check with OpenDSS that the element or bus that PyDSS tracks as active is "
+                    "active before using it. This is slower and meant for debugging code that "
+                    "activates elements without PyDSS.",
+        alias="Verify active object",
+        default=False,
+    )
 
     @root_validator(pre=True)
     def pre_process(cls, values):
@@ -294,6 +321,39 @@ class ProjectModel(InputsBaseModel):
         return data
 
 
+class HdfCompressionModel(InputsBaseModel):
+    """Defines the compression settings for datasets in the HDF5 data store."""
+
+    codec: Optional[HdfCompression] = Field(
+        title="codec",
+        description="Compression codec. 'blosc' and 'zstd' require the hdf5plugin package.",
+        default=HdfCompression.GZIP,
+    )
+    level: Optional[int] = Field(
+        title="level",
+        description="Compression level. Ignored by 'none' and 'lzf'. Uses the codec default if "
+                    "not set.",
+        default=None,
+    )
+    shuffle: Optional[bool] = Field(
+        title="shuffle",
+        description="Set to true to apply the byte-shuffle filter before compression.",
+        default=True,
+    )
+
+    @root_validator
+    def check_level(cls, values):
+        codec = values.get("codec")
+        if codec is not None:
+            try:
+                make_compression_kwargs(codec, level=values.get("level"), shuffle=values.get("shuffle"))
+            except InvalidConfiguration as exc:
+                # hdf5plugin may be installed only where the simulation runs.
+                if "hdf5plugin" not in str(exc):
+                    raise ValueError(str(exc))
+        return values
+
+
 class ExportsModel(InputsBaseModel):
     """Defines the user inputs for defining data exports."""
 
@@ -369,6 +429,34 @@ class ExportsModel(InputsBaseModel):
         default=DEFAULT_MAX_CHUNK_BYTES,
         alias="HDF Max Chunk Bytes",
     )
+    hdf_compression: Optional[HdfCompressionModel] = Field(
+        title="hdf_compression",
+        description="Compression settings for time-series datasets in the HDF5 data store.",
+        default=HdfCompressionModel(codec=HdfCompression.GZIP, level=4),
+        alias="HDF Compression",
+    )
+    hdf_metadata_compression: Optional[HdfCompressionModel] = Field(
+        title="hdf_metadata_compression",
+        description="Compression settings for small datasets in the HDF5 data store, such as "
+                    "aggregated values and column names.",
+        default=HdfCompressionModel(codec=HdfCompression.NONE),
+        alias="HDF Metadata Compression",
+    )
+    hdf_async_writes: Optional[bool] = Field(
+        title="hdf_async_writes",
+        description="Set to true to write time-series data to the HDF5 data store in a background "
+                    "thread so that the simulation does not wait for compression and disk I/O. "
+                    "Requires memory for a second buffer per dataset.",
+        default=False,
+        alias="HDF Async Writes",
+    )
+    hdf_async_write_queue_size: Optional[int] = Field(
+        title="hdf_async_write_queue_size",
+        description="Maximum number of buffers waiting to be written when 'hdf_async_writes' is "
+                    "true. The simulation blocks when the queue is full.",
+        default=DEFAULT_MAX_QUEUE_SIZE,
+        alias="HDF Async Write Queue Size",
+    )
 
     @root_validator(pre=True)
     def pre_process(cls, values):
@@ -386,6 +474,12 @@ class ExportsModel(InputsBaseModel):
             raise ValueError(f"hdf_max_chunk_bytes must be a multiple of 512")
         return val
 
+    @validator("hdf_async_write_queue_size")
+    def check_hdf_async_write_queue_size(cls, val):
+        if val < 1:
+            raise ValueError(f"hdf_async_write_queue_size must be >= 1")
+        return val
+
 
 class FrequencyModel(InputsBaseModel):
     """Defines the user inputs for defining frequency parameters."""
@@ -590,6 +684,14 @@ class MonteCarloModel(InputsBaseModel):
         default=-1,
         alias="Number of Monte Carlo scenarios",
     )
+    seed: Optional[int] = Field(
+        title="seed",
+        description="Seed for the random values of the samples. Each sample draws its values "
+                    "from a generator seeded with this value and the sample index. If not set, "
+                    "PyDSS chooses a seed and logs it.",
+        default=None,
+        alias="Seed",
+    )
 
 
 class PlotsModel(InputsBaseModel):
@@ -1,13 +1,13 @@
 
 import abc
-import copy
 import logging
 
 import numpy as np
 
 from PyDSS.common import StoreValuesType
-from PyDSS.utils.simulation_utils import CircularBufferHelper
-from PyDSS.value_storage import ValueContainer
+from PyDSS.exceptions import InvalidConfiguration
+from PyDSS.utils.simulation_utils import CircularBufferArray
+from PyDSS.value_storage import ValueColumns, ValueContainer
 
 logger = logging.getLogger(__name__)
 
@@ -27,6 +27,9 @@ class StorageFilterBase(abc.ABC):
             max_chunk_bytes,
             values,
             elem_names,
+            writer=kwargs.get("writer"),
+            compression=kwargs.get("compression"),
+            metadata_compression=kwargs.get("metadata_compression"),
         )
         logger.debug("Created %s path=%s", self.__class__.__name__, path)
 
@@ -53,7 +56,8 @@ class StorageFilterBase(abc.ABC):
         return self._container.max_num_bytes()
 
     @staticmethod
-    def make_container(hdf_store, path, prop, num_steps, max_chunk_bytes, values, elem_names):
+    def make_container(hdf_store, path, prop, num_steps, max_chunk_bytes, values, elem_names,
+                       writer=None, compression=None, metadata_compression=None):
         """Return an instance of ValueContainer for storing values."""
         container = ValueContainer(
             values,
@@ -64,6 +68,10 @@ class StorageFilterBase(abc.ABC):
             prop.get_dataset_property_type(),
             max_chunk_bytes=max_chunk_bytes,
             store_time_step=prop.should_store_time_step(),
+            writer=writer,
+            compression=compression,
+            metadata_compression=metadata_compression,
+            sample_interval=prop.sample_interval,
         )
         logger.debug("Created storage container path=%s", path)
         return container
@@ -95,6 +103,43 @@ class StorageChangeCount(StorageFilterBase):
 """
 
 
+class StorageOnChange(StorageFilterBase):
+    """Stores an element's value only when it changes. Each stored value is
+    recorded with its time step and element index. The first time point stores
+    all elements.
+
+    """
+    def __init__(self, hdf_store, path, prop, num_steps, max_chunk_bytes, values, elem_names,
+                 **kwargs):
+        # Each stored row holds the values of one element in the columns of
+        # the first element.
+        num_columns = {x.num_columns for x in values}
+        if len(num_columns) > 1:
+            raise InvalidConfiguration(
+                f"on_change requires all elements to have the same number of values: {path}"
+            )
+        super().__init__(
+            hdf_store, path, prop, num_steps, max_chunk_bytes, values, elem_names, **kwargs
+        )
+        self._last_values = None
+
+    def append_values(self, values, time_step):
+        array = ValueColumns.get_array(values)
+        if self._last_values is None:
+            self._last_values = array.copy()
+            changed = range(len(values))
+        else:
+            is_changed = array != self._last_values
+            # NaN never equals itself. Only a transition to or from NaN is a change.
+            is_changed &= ~(np.isnan(array) & np.isnan(self._last_values))
+            # All elements have the same number of columns.
+            changed = np.flatnonzero(is_changed.reshape(len(values), -1).any(axis=1))
+            np.copyto(self._last_values, array)
+
+        for i in changed:
+            self._container.append_by_time_step(values[i], time_step, int(i))
+
+
 class StorageMin(StorageFilterBase):
     """Stores the min value across time points."""
     def __init__(self, *args, **kwargs):
@@ -113,13 +158,10 @@ class StorageMin(StorageFilterBase):
 
     def _handle_values(self, values):
         if self._min is None:
-            self._min = [copy.deepcopy(x) for x in values]
+            self._min = ValueColumns.from_copies(values)
         else:
-            for i, new_val in enumerate(values):
-                cur_val = self._min[i]
-                if (np.isnan(cur_val.value) and not np.isnan(new_val.value)) or \
-                        new_val < cur_val:
-                    self._min[i].set_value(new_val.value)
+            # fmin ignores NaN unless both values are NaN.
+            np.fmin(self._min.array, ValueColumns.get_array(values), out=self._min.array)
 
 
 class StorageMax(StorageFilterBase):
@@ -140,13 +182,10 @@ class StorageMax(StorageFilterBase):
 
     def _handle_values(self, values):
         if self._max is None:
-            self._max = [copy.deepcopy(x) for x in values]
+            self._max = ValueColumns.from_copies(values)
         else:
-            for i, new_val in enumerate(values):
-                cur_val = self._max[i]
-                if (np.isnan(cur_val.value) and not np.isnan(new_val.value)) or \
-                        new_val > cur_val:
-                    self._max[i].set_value(new_val.value)
+            # fmax ignores NaN unless both values are NaN.
+            np.fmax(self._max.array, ValueColumns.get_array(values), out=self._max.array)
 
 
 class StorageMovingAverage(StorageFilterBase):
@@ -172,13 +211,11 @@ class StorageMovingAverage(StorageFilterBase):
         # Store every value in the circular buffer. Apply limits to the
         # moving average.
         if self._bufs is None:
-            self._averages = [copy.deepcopy(x) for x in values]
-            self._bufs = _make_circular_buffers(len(values), self._prop, self._window_sizes)
+            self._averages = ValueColumns.from_copies(values)
+            self._bufs = _make_circular_buffers(values, self._prop, self._window_sizes)
 
-        for i, val in enumerate(values):
-            buf = self._bufs[i]
-            buf.append(val.value)
-            self._averages[i].set_value(buf.average())
+        self._bufs.append(ValueColumns.get_array(values))
+        self._bufs.average(out=self._averages.array)
 
         if self._prop.limits:
             for i, avg in enumerate(self._averages):
@@ -209,14 +246,11 @@ class StorageMovingAverageMax(StorageMax):
         if values[0].is_nan():
             return
         if self._bufs is None:
-            self._averages = [copy.deepcopy(x) for x in values]
-            self._bufs = _make_circular_buffers(len(values), self._prop, self._window_sizes)
-
-        for i, val in enumerate(values):
-            buf = self._bufs[i]
-            buf.append(val.value)
-            self._averages[i].set_value(buf.average())
+            self._averages = ValueColumns.from_copies(values)
+            self._bufs = _make_circular_buffers(values, self._prop, self._window_sizes)
 
+        self._bufs.append(ValueColumns.get_array(values))
+        self._bufs.average(out=self._averages.array)
         self._handle_values(self._averages)
 
 
@@ -230,10 +264,9 @@ class StorageSum(StorageFilterBase):
         if values[0].is_nan():
             return
         if self._sum is None:
-            self._sum = [copy.deepcopy(x) for x in values]
+            self._sum = ValueColumns.from_copies(values)
         else:
-            for i, val in enumerate(values):
-                self._sum[i] += val
+            np.add(self._sum.array, ValueColumns.get_array(values), out=self._sum.array)
 
     def close(self):
         if self._sum is not None:
@@ -241,13 +274,16 @@ class StorageSum(StorageFilterBase):
             self._container.flush_data()
 
 
-def _make_circular_buffers(num_elements, prop, window_sizes):
+def _make_circular_buffers(values, prop, window_sizes):
+    """Return a CircularBufferArray with one column per stored value."""
     if window_sizes is None:
-        window_size = prop.window_size
-        bufs = [CircularBufferHelper(window_size) for _ in range(num_elements)]
+        window_sizes = prop.window_size
     else:
-        bufs = [CircularBufferHelper(window_sizes[i]) for i in range(num_elements)]
-    return bufs
+        # Each element may store multiple columns.
+        window_sizes = np.repeat(window_sizes, [x.num_columns for x in values])
+    num_columns = sum((x.num_columns for x in values))
+    dtype = np.complex128 if issubclass(values[0].value_type, complex) else np.float64
+    return CircularBufferArray(window_sizes, num_columns, dtype=dtype)
 
 
 STORAGE_TYPE_MAP = {
@@ -257,5 +293,6 @@ STORAGE_TYPE_MAP = {
     StoreValuesType.MIN: StorageMin,
     StoreValuesType.MOVING_AVERAGE: StorageMovingAverage,
     StoreValuesType.MOVING_AVERAGE_MAX: StorageMovingAverageMax,
+    StoreValuesType.ON_CHANGE: StorageOnChange,
     StoreValuesType.SUM: StorageSum,
 }
@@ -0,0 +1,192 @@
+"""Contains StreamingAggregator"""
+
+import logging
+import re
+
+import numpy as np
+
+from PyDSS.exceptions import InvalidParameter
+
+
+DEFAULT_RESERVOIR_SIZE = 10000
+
+AGGREGATION_OPS = ("count", "max", "mean", "min", "sum", "time_above_threshold")
+_QUANTILE_REGEX = re.compile(r"^p(\d+(?:\.\d+)?)$")
+
+logger = logging.getLogger(__name__)
+
+
+class StreamingAggregator:
+    """Computes aggregations of columns from blocks of rows, holding only
+    accumulators in memory.
+
+    Supported ops are count, max, mean, min, sum, time_above_threshold, and
+    percentiles written as p<number>, such as p95. NaN values are ignored.
+    Percentiles are approximate: they are computed from a uniform random
+    sample of rows (reservoir sampling) with a fixed size.
+
+    """
+
+    def __init__(self, ops, num_columns, threshold=None, reservoir_size=DEFAULT_RESERVOIR_SIZE,
+                 seed=None):
+        """Constructor for StreamingAggregator
+
+        Parameters
+        ----------
+        ops : list
+            Names of the aggregations to compute.
+        num_columns : int
+        threshold : float | None
+            Required for time_above_threshold.
+        reservoir_size : int
+            Number of rows to sample for percentiles.
+        seed : int | None
+            Seed for the random sampling of rows.
+
+        """
+        self._ops = list(ops)
+        self._quantiles = {}
+        for op in self._ops:
+            match = _QUANTILE_REGEX.search(op)
+            if match:
+                quantile = float(match.group(1))
+                if quantile > 100:
+                    raise InvalidParameter(f"invalid percentile: {op}")
+                self._quantiles[op] = quantile
+            elif op not in AGGREGATION_OPS:
+                raise InvalidParameter(f"invalid aggregation: {op}")
+        if "time_above_threshold" in self._ops and threshold is None:
+            raise InvalidParameter("time_above_threshold requires a threshold")
+
+        self._threshold = threshold
+        self._num_rows = 0
+        self._count = np.zeros(num_columns, dtype=np.int64)
+        self._sum = np.zeros(num_columns)
+        self._min = np.full(num_columns, np.NaN)
+        self._max = np.full(num_columns, np.NaN)
+        self._above = None
+        self._reservoir = None
+        self._reservoir_size = reservoir_size
+        self._rng = np.random.default_rng(seed)
+        if self._quantiles:
+            self._reservoir = np.empty((reservoir_size, num_columns))
+
+    @property
+    def num_rows(self):
+        """Return the number of rows aggregated."""
+        return self._num_rows
+
+    def update(self, block, groups=None):
+        """Add a block of rows to the aggregations.
+
+        Parameters
+        ----------
+        block : np.ndarray
+            Two-dimensional array of (row, column)
+        groups : np.ndarray | None
+            Index of the first column of each group of columns. If set,
+            time_above_threshold counts the rows where any column of a group
+            exceeds the threshold.
+
+        """
+        is_nan = np.isnan(block)
+        self._count += len(block) - is_nan.sum(axis=0)
+        self._sum += np.where(is_nan, 0, block).sum(axis=0)
+        if len(block) > 0:
+            # fmin and fmax ignore NaN unless all values are NaN.
+            np.fmin(self._min, np.fmin.reduce(block, axis=0), out=self._min)
+            np.fmax(self._max, np.fmax.reduce(block, axis=0), out=self._max)
+        if "time_above_threshold" in self._ops:
+            above = block > self._threshold
+            if groups is not None and len(groups) > 0:
+                above = np.logical_or.reduceat(above, groups, axis=1)
+            if self._above is None:
+                self._above = np.zeros(above.shape[1], dtype=np.int64)
+            self._above += above.sum(axis=0)
+        if self._reservoir is not None:
+            self._sample(block)
+        self._num_rows += len(block)
+
+    def _sample(self, block):
+        size = self._reservoir_size
+        start = self._num_rows
+        # Fill the reservoir with the first rows.
+        num_fill = max(0, min(size - start, len(block)))
+        self._reservoir[start:start + num_fill] = block[:num_fill]
+        if num_fill == len(block):
+            return
+
+        # Algorithm R: row i replaces a random reservoir row with probability
+        # size / (i + 1). Later rows overwrite earlier ones that pick the same
+        # slot, as they would in a sequential loop.
+        row_numbers = np.arange(start + num_fill, start + len(block))
+        slots = self._rng.integers(0, row_numbers + 1)
+        selected = slots < size
+        self._reservoir[slots[selected]] = block[num_fill:][selected]
+
+    def finalize(self, groups=None, time_step_seconds=1.0):
+        """Return the aggregations.
+
+        Parameters
+        ----------
+        groups : np.ndarray | None
+            Index of the first column of each group of columns. If set, pool
+            the values of each group's columns. Must match the groups passed
+            to update.
+        time_step_seconds : float
+            Time between rows, used for time_above_threshold
+
+        Returns
+        -------
+        dict
+            Maps each op to an np.ndarray with one value per column or group.
+
+        """
+        count = self._count
+        total = self._sum
+        min_vals = self._min
+        max_vals = self._max
+        if groups is not None:
+            if len(groups) == 0:
+                return {x: np.empty(0) for x in self._ops}
+            count = np.add.reduceat(count, groups)
+            total = np.add.reduceat(total, groups)
+            min_vals = np.fmin.reduceat(min_vals, groups)
+            max_vals = np.fmax.reduceat(max_vals, groups)
+
+        results = {}
+        for op in self._ops:
+            if op == "count":
+                results[op] = count
+            elif op == "sum":
+                results[op] = total
+            elif op == "min":
+                results[op] = min_vals
+            elif op == "max":
+                results[op] = max_vals
+            elif op == "mean":
+                results[op] = np.where(count > 0, total / np.maximum(count, 1), np.NaN)
+            elif op == "time_above_threshold":
+                above = self._above
+                if above is None:
+                    above = np.zeros(len(count), dtype=np.int64)
+                results[op] = above * time_step_seconds
+            else:
+                results[op] = self._compute_quantile(self._quantiles[op], groups)
+        return results
+
+    def _compute_quantile(self, quantile, groups):
+        sample = self._reservoir[:min(self._num_rows, self._reservoir_size)]
+        if groups is None:
+            columns = [slice(i, i + 1) for i in range(sample.shape[1])]
+        else:
+            ends = list(groups[1:]) + [sample.shape[1]]
+            columns = [slice(x, y) for x, y in zip(groups, ends)]
+
+        values = np.full(len(columns), np.NaN)
+        for i, column in enumerate(columns):
+            data = sample[:, column].ravel()
+            data = data[~np.isnan(data)]
+            if len(data) > 0:
+                values[i] = np.quantile(data, quantile / 100)
+        return values
@@ -6,9 +6,10 @@ from datetime import datetime, timedelta
 from pathlib import Path
 from typing import Dict, List, Union
 
+import numpy as np
 from pydantic import BaseModel, Field
 
-from PyDSS.utils.simulation_utils import CircularBufferHelper
+from PyDSS.utils.simulation_utils import CircularBufferArray
 from PyDSS.utils.utils import dump_data, load_data
 
 
@@ -322,45 +323,40 @@ class ThermalMetrics:
 
         """
         if self._line_bufs is None:
-            self._line_bufs = [CircularBufferHelper(self._line_window_size) for _ in range(len(self._line_names))]
-            self._transformer_bufs = [CircularBufferHelper(self._transformer_window_size) for _ in range(len(self._transformer_names))]
+            self._line_bufs = CircularBufferArray(self._line_window_size, len(self._line_names))
+            self._transformer_bufs = CircularBufferArray(self._transformer_window_size, len(self._transformer_names))
             self._max_inst_line_violations = [0.0] * len(self._line_names)
             self._max_mavg_line_violations = [0.0] * len(self._line_names)
             self._max_inst_transformer_violations = [0.0] * len(self._transformer_names)
             self._max_mavg_transformer_violations = [0.0] * len(self._transformer_names)
 
         has_inst_line_violation = False
-        has_mavg_line_violation = False
         for i, loading in enumerate(line_loadings):
             if loading.value > self._max_inst_line_violations[i]:
                 self._max_inst_line_violations[i] = loading.value
             if not has_inst_line_violation and loading.value > self._line_loading_percent_threshold:
                 has_inst_line_violation = True
 
-            buf = self._line_bufs[i]
-            buf.append(loading.value)
-            moving_avg = buf.average()
-
-            if moving_avg > self._max_mavg_line_violations[i]:
-                self._max_mavg_line_violations[i] = moving_avg
-            if not has_mavg_line_violation and moving_avg > self._line_loading_percent_mavg_threshold:
-                has_mavg_line_violation = True
+        has_mavg_line_violation = self._update_moving_averages(
+            self._line_bufs,
+            line_loadings,
+            self._max_mavg_line_violations,
+            self._line_loading_percent_mavg_threshold,
+        )
 
         has_inst_transformer_violation = False
-        has_mavg_transformer_violation = False
         for i, loading in enumerate(transformer_loadings):
             if loading.value > self._max_inst_transformer_violations[i]:
                 self._max_inst_transformer_violations[i] = loading.value
             if not has_inst_transformer_violation and loading.value > self._transformer_loading_percent_threshold:
                 has_inst_transformer_violation = True
 
-            buf = self._transformer_bufs[i]
-            buf.append(loading.value)
-            moving_avg = buf.average()
-            if moving_avg > self._max_mavg_transformer_violations[i]:
-                self._max_mavg_transformer_violations[i] = moving_avg
-            if not has_mavg_transformer_violation and moving_avg > self._transformer_loading_percent_mavg_threshold:
-                has_mavg_transformer_violation = True
+        has_mavg_transformer_violation = self._update_moving_averages(
+            self._transformer_bufs,
+            transformer_loadings,
+            self._max_mavg_transformer_violations,
+            self._transformer_loading_percent_mavg_threshold,
+        )
 
         if has_inst_line_violation:
             self._num_time_points_inst_line_violations += 1
@@ -370,3 +366,16 @@ class ThermalMetrics:
             self._num_time_points_inst_transformer_violations += 1
         if has_mavg_transformer_violation:
             self._num_time_points_mavg_transformer_violations += 1
+
+    @staticmethod
+    def _update_moving_averages(bufs, loadings, max_violations, threshold):
+        """Append loadings to the moving-average buffers and update the max
+        moving averages in place. Returns True if any moving average exceeds
+        threshold.
+
+        """
+        bufs.append([x.value for x in loadings])
+        moving_avgs = bufs.average()
+        for i in np.flatnonzero(moving_avgs > max_violations):
+            max_violations[i] = float(moving_avgs[i])
+        return bool(np.any(moving_avgs > threshold))
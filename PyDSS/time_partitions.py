@@ -0,0 +1,447 @@
+"""Splits a QSTS simulation into time windows that run in separate processes
+and stitches their results into one scenario.
+
+Each window after the first starts earlier than its recorded range by a
+warm-up period so that controller, regulator, and storage states settle. The
+window records the warm-up steps too. Stitching drops them, and the boundary
+report compares them with the steps that the previous window recorded for the
+same times. The OpenDSS events of the warm-up steps are dropped in the same way.
+
+"""
+
+import logging
+import math
+from datetime import timedelta
+from functools import reduce
+
+import h5py
+import numpy as np
+
+from PyDSS.common import DatasetPropertyType, SimulationType, SnapshotTimePointSelectionMode
+from PyDSS.exceptions import InvalidConfiguration, InvalidParameter
+from PyDSS.result_index import write_result_index
+from PyDSS.simulation_input_models import SimulationSettingsModel
+from PyDSS.value_storage import get_sample_interval, get_time_step_path
+
+
+TIME_PARTITION_REPORT_FILENAME = "time_partition_boundaries.json"
+DEFAULT_BOUNDARY_RTOL = 1e-3
+DEFAULT_BOUNDARY_ATOL = 1e-6
+
+logger = logging.getLogger(__name__)
+
+
+class TimeWindow:
+    """Defines the steps of a simulation that one process runs."""
+
+    def __init__(self, index, start_step, num_steps, warm_up_steps):
+        """Constructor for TimeWindow
+
+        Parameters
+        ----------
+        index : int
+        start_step : int
+            First recorded step of the window in the full simulation
+        num_steps : int
+            Number of recorded steps
+        warm_up_steps : int
+            Number of steps to run before start_step
+
+        """
+        self.index = index
+        self.start_step = start_step
+        self.num_steps = num_steps
+        self.warm_up_steps = warm_up_steps
+
+    def __repr__(self):
+        return f"TimeWindow(index={self.index}, start_step={self.start_step}, " \
+            f"num_steps={self.num_steps}, warm_up_steps={self.warm_up_steps})"
+
+    @property
+    def first_step(self):
+        """Return the first step that the window runs, including warm-up."""
+        return self.start_step - self.warm_up_steps
+
+    def apply_to_settings(self, settings: SimulationSettingsModel):
+        """Change the start time and duration of settings to run this window.
+        settings must contain the times of the full simulation.
+
+        """
+        resolution = settings.project.step_resolution_sec
+        settings.project.start_time += timedelta(seconds=self.first_step * resolution)
+        settings.project.simulation_duration_min = \
+            (self.warm_up_steps + self.num_steps) * resolution / 60
+
+
+def check_time_partition_support(settings: SimulationSettingsModel, export_list):
+    """Raise InvalidConfiguration if the active scenario cannot be split into
+    time windows.
+
+    Parameters
+    ----------
+    settings : SimulationSettingsModel
+    export_list : ExportListReader
+        Exports of the active scenario
+
+    """
+    if settings.project.simulation_type != SimulationType.QSTS:
+        raise InvalidConfiguration("time partitions require a QSTS simulation")
+    if not settings.exports.export_results:
+        raise InvalidConfiguration("time partitions require export_results")
+    if settings.monte_carlo.num_scenarios > 0:
+        raise InvalidConfiguration("time partitions do not support Monte Carlo simulations")
+    if settings.helics.co_simulation_mode:
+        raise InvalidConfiguration("time partitions do not support co-simulation")
+    if settings.frequency.enable_frequency_sweep:
+        raise InvalidConfiguration("time partitions do not support frequency sweeps")
+    if settings.plots.create_dynamic_plots:
+        raise InvalidConfiguration("time partitions do not support dynamic plots")
+    for scenario in settings.project.scenarios:
+        if scenario.name == settings.project.active_scenario and \
+                scenario.snapshot_time_point_selection_config.mode != SnapshotTimePointSelectionMode.NONE:
+            raise InvalidConfiguration(
+                f"time partitions do not support snapshot time point selection: {scenario.name}"
+            )
+
+    for prop in export_list.iter_export_properties():
+        # Values aggregated over the whole simulation, such as min, max, and
+        # change counts, and the summaries written by custom metrics cannot
+        # be combined from windows that include warm-up steps.
+        if prop.get_dataset_property_type() == DatasetPropertyType.VALUE:
+            raise InvalidConfiguration(
+                f"time partitions do not support store_values_type={prop.store_values_type.value}: "
+                f"{prop.elem_class}.{prop.name}"
+            )
+        if prop.custom_metric is not None:
+            raise InvalidConfiguration(
+                f"time partitions do not support custom metrics: {prop.elem_class}.{prop.name}"
+            )
+
+
+def make_time_windows(settings: SimulationSettingsModel, num_partitions, warm_up_min,
+                      sample_interval=1):
+    """Split the simulation into consecutive time windows.
+
+    Window boundaries and warm-up periods are multiples of sample_interval so
+    that every window samples the same steps as one simulation would. The
+    warm-up period is rounded up to a whole number of steps and the first
+    window has none.
+
+    Parameters
+    ----------
+    settings : SimulationSettingsModel
+    num_partitions : int
+    warm_up_min : float
+        Minutes to simulate before each window's recorded range
+    sample_interval : int
+        Least common multiple of the sample intervals of the exports
+
+    Returns
+    -------
+    list
+        list of TimeWindow. Has fewer than num_partitions items if there are
+        not enough steps.
+
+    """
+    if num_partitions < 1:
+        raise InvalidParameter(f"num_partitions must be at least 1: {num_partitions}")
+    if warm_up_min < 0:
+        raise InvalidParameter(f"warm_up_min cannot be negative: {warm_up_min}")
+
+    resolution = settings.project.step_resolution_sec
+    total_steps = math.ceil(settings.project.simulation_duration_min * 60 / resolution)
+    window_steps = _round_up(math.ceil(total_steps / num_partitions), sample_interval)
+    warm_up_steps = _round_up(math.ceil(warm_up_min * 60 / resolution), sample_interval)
+    windows = []
+    for index, start_step in enumerate(range(0, total_steps, window_steps)):
+        windows.append(
+            TimeWindow(
+                index,
+                start_step,
+                min(window_steps, total_steps - start_step),
+                min(warm_up_steps, start_step),
+            )
+        )
+    return windows
+
+
+def get_sample_interval_multiple(export_list):
+    """Return the least common multiple of the sample intervals of the
+    exports.
+
+    Parameters
+    ----------
+    export_list : ExportListReader
+
+    Returns
+    -------
+    int
+
+    """
+    intervals = [x.sample_interval for x in export_list.iter_export_properties()]
+    return reduce(lambda x, y: x * y // math.gcd(x, y), intervals, 1)
+
+
+def stitch_time_windows(filenames, windows, scenario, hdf_store):
+    """Combine the results of the time windows of a scenario into one store.
+
+    The first window's results are copied without decompressing them. The
+    recorded steps of each later window are appended to them.
+
+    Parameters
+    ----------
+    filenames : list
+        HDF5 file for each window
+    windows : list
+        list of TimeWindow
+    scenario : str
+    hdf_store : h5py.File
+
+    """
+    exports = hdf_store.require_group("Exports")
+    if scenario in exports:
+        del exports[scenario]
+
+    with h5py.File(filenames[0], mode="r") as src:
+        src.copy(src[f"Exports/{scenario}"], exports, name=scenario)
+    dst = exports[scenario]
+
+    paths = []
+    dst.visititems(lambda name, obj: paths.append(name) if isinstance(obj, h5py.Dataset) else None)
+    for filename, window in zip(filenames[1:], windows[1:]):
+        with h5py.File(filename, mode="r") as src:
+            src_group = src[f"Exports/{scenario}"]
+            for path in paths:
+                _append_window_dataset(src_group, dst, path, window)
+        logger.debug("Appended time window %s from %s", window.index, filename)
+
+    write_result_index(dst)
+
+
+def write_time_window_event_log(event_logs, filename):
+    """Write the OpenDSS event log of a scenario from the events of its time
+    windows.
+
+    Parameters
+    ----------
+    event_logs : list
+        For each window in time order, the lines of its event log that
+        follow its warm-up steps
+    filename : str
+
+    """
+    with open(filename, "w") as f_out:
+        for event_log in event_logs:
+            for line in event_log:
+                f_out.write(line + "\n")
+    logger.debug("Wrote the event log of %s time windows to %s", len(event_logs), filename)
+
+
+def _append_window_dataset(src_group, dst_group, path, window):
+    dataset = dst_group[path]
+    dataset_type = dataset.attrs.get("type")
+    if dataset_type is None:
+        # Timestamp, Frequency, and Mode store every step.
+        if dataset.maxshape[0] is None:
+            _append_rows(dataset, src_group[path][window.warm_up_steps:])
+        return
+
+    dataset_type = DatasetPropertyType(dataset_type)
+    if dataset_type == DatasetPropertyType.PER_TIME_POINT:
+        skip = window.warm_up_steps // get_sample_interval(dataset)
+        _append_rows(dataset, src_group[path][skip:])
+    elif dataset_type in (DatasetPropertyType.FILTERED, DatasetPropertyType.ON_CHANGE):
+        _append_time_step_rows(src_group, dst_group, path, window, dataset_type)
+    elif dataset_type == DatasetPropertyType.VALUE:
+        raise InvalidConfiguration(f"cannot stitch time windows of dataset {dataset.name}")
+    # METADATA and TIME_STEP datasets are the same in every window or are
+    # handled with their data.
+
+
+def _append_rows(dataset, data):
+    if data.shape[1:] != dataset.shape[1:]:
+        raise InvalidConfiguration(
+            f"time windows have different shapes for dataset {dataset.name}: "
+            f"{data.shape[1:]} {dataset.shape[1:]}"
+        )
+    start = dataset.shape[0]
+    end = start + len(data)
+    dataset.resize(end, axis=0)
+    dataset[start:end] = data
+    dataset.attrs["length"] = end
+
+
+def _append_time_step_rows(src_group, dst_group, path, window, dataset_type):
+    dataset = dst_group[path]
+    time_step_path = _get_relative_path(src_group, get_time_step_path(src_group[path]))
+    data = src_group[path][:]
+    time_steps = src_group[time_step_path][:]
+    keep = time_steps[:, 0] >= window.warm_up_steps
+    new_data = [data[keep]]
+    new_time_steps = [time_steps[keep]]
+
+    if dataset_type == DatasetPropertyType.ON_CHANGE and window.warm_up_steps > 0:
+        # Values are stored only when they change, so the previous window's
+        # final value of an element stays in effect unless this window
+        # records a new one. Record the element's value at the start of the
+        # window if it settled on a different value during warm-up.
+        dst_time_steps = dst_group[time_step_path][:]
+        prev_rows = _get_last_rows(dst_time_steps[:, 1], np.ones(len(dst_time_steps), dtype=bool))
+        start_rows = _get_last_rows(time_steps[:, 1], time_steps[:, 0] < window.warm_up_steps)
+        recorded = set(time_steps[time_steps[:, 0] == window.warm_up_steps][:, 1])
+        extra = []
+        for elem_index, row in start_rows.items():
+            if elem_index in recorded:
+                continue
+            prev_row = prev_rows.get(elem_index)
+            if prev_row is None or not _are_equal(dataset[prev_row], data[row]):
+                extra.append(row)
+        if extra:
+            extra_time_steps = time_steps[extra]
+            extra_time_steps[:, 0] = window.warm_up_steps
+            new_data.insert(0, data[extra])
+            new_time_steps.insert(0, extra_time_steps)
+
+    new_time_steps = np.concatenate(new_time_steps)
+    new_time_steps[:, 0] += window.start_step - window.warm_up_steps
+    _append_rows(dataset, np.concatenate(new_data))
+    _append_rows(dst_group[time_step_path], new_time_steps)
+
+
+def _get_relative_path(group, path):
+    prefix = group.name + "/"
+    path = "/" + path.lstrip("/")
+    if not path.startswith(prefix):
+        raise InvalidConfiguration(f"{path} is not in {group.name}")
+    return path[len(prefix):]
+
+
+def _get_last_rows(elem_indices, mask):
+    """Return a dict mapping element index to its last row where mask is
+    True."""
+    rows = np.flatnonzero(mask)[::-1]
+    elems, first = np.unique(elem_indices[rows], return_index=True)
+    return dict(zip(elems.tolist(), rows[first].tolist()))
+
+
+def _are_equal(values1, values2):
+    return np.array_equal(values1, values2) or \
+        bool(np.all((values1 == values2) | (np.isnan(values1) & np.isnan(values2))))
+
+
+def compare_window_boundaries(filenames, windows, scenario, step_resolution_sec,
+                              rtol=DEFAULT_BOUNDARY_RTOL, atol=DEFAULT_BOUNDARY_ATOL):
+    """Compare the warm-up steps of each window with the steps that the
+    previous window recorded for the same times.
+
+    The previous window is the reference because it simulated those steps
+    continuously. Only datasets stored at every time point are compared.
+
+    Parameters
+    ----------
+    filenames : list
+        HDF5 file for each window
+    windows : list
+        list of TimeWindow
+    scenario : str
+    step_resolution_sec : float
+    rtol : float
+        Relative tolerance for values to match, as in numpy.isclose
+    atol : float
+        Absolute tolerance for values to match, as in numpy.isclose
+
+    Returns
+    -------
+    list
+        One dict per boundary. settled_after_min is the warm-up time after
+        which all values match the previous window, or None if they never
+        match. It is None for the boundary if any dataset never matches.
+
+    """
+    boundaries = []
+    for i in range(1, len(windows)):
+        prev_window = windows[i - 1]
+        window = windows[i]
+        # The previous window's own warm-up steps are not a reference.
+        first_step = max(window.first_step, prev_window.start_step)
+        boundary = {
+            "window": window.index,
+            "start_step": window.start_step,
+            "num_overlap_steps": window.start_step - first_step,
+            "settled_after_min": 0.0,
+            "datasets": [],
+        }
+        boundaries.append(boundary)
+        if first_step == window.start_step:
+            boundary["settled_after_min"] = None
+            continue
+
+        with h5py.File(filenames[i - 1], mode="r") as prev_file, \
+                h5py.File(filenames[i], mode="r") as cur_file:
+            prev_group = prev_file[f"Exports/{scenario}"]
+            cur_group = cur_file[f"Exports/{scenario}"]
+            for path in _list_per_time_point_datasets(cur_group):
+                result = _compare_overlap(
+                    prev_group[path], cur_group[path], prev_window, window, first_step,
+                    step_resolution_sec, rtol, atol,
+                )
+                if result is None:
+                    continue
+                result["path"] = path
+                boundary["datasets"].append(result)
+                if result["settled_after_min"] is None:
+                    boundary["settled_after_min"] = None
+                elif boundary["settled_after_min"] is not None:
+                    boundary["settled_after_min"] = max(
+                        boundary["settled_after_min"], result["settled_after_min"]
+                    )
+
+    return boundaries
+
+
+def _list_per_time_point_datasets(group):
+    paths = []
+
+    def visit(name, obj):
+        if isinstance(obj, h5py.Dataset) and \
+                obj.attrs.get("type") == DatasetPropertyType.PER_TIME_POINT.value:
+            paths.append(name)
+
+    group.visititems(visit)
+    return paths
+
+
+def _compare_overlap(prev_dataset, cur_dataset, prev_window, window, first_step,
+                     step_resolution_sec, rtol, atol):
+    sample_interval = get_sample_interval(cur_dataset)
+    num_rows = (window.start_step - first_step) // sample_interval
+    prev_start = (first_step - prev_window.first_step) // sample_interval
+    cur_start = (first_step - window.first_step) // sample_interval
+    reference = prev_dataset[prev_start:prev_start + num_rows]
+    values = cur_dataset[cur_start:cur_start + num_rows]
+    if len(values) == 0 or values.shape != reference.shape:
+        return None
+
+    diffs = np.abs(values - reference).astype(float)
+    diffs[np.isnan(values) & np.isnan(reference)] = 0.0
+    # A value that is NaN in only one window is a mismatch.
+    diffs[np.isnan(diffs)] = np.inf
+    max_diffs = diffs.max(axis=1)
+    is_close = np.isclose(values, reference, rtol=rtol, atol=atol, equal_nan=True).all(axis=1)
+    if not is_close[-1]:
+        settled_after_min = None
+    else:
+        mismatches = np.flatnonzero(~is_close)
+        settled_row = 0 if len(mismatches) == 0 else mismatches[-1] + 1
+        settled_step = first_step + settled_row * sample_interval
+        settled_after_min = (settled_step - window.first_step) * step_resolution_sec / 60
+
+    return {
+        "max_abs_diff": float(max_diffs.max()),
+        "final_abs_diff": float(max_diffs[-1]),
+        "settled_after_min": settled_after_min,
+    }
+
+
+def _round_up(value, multiple):
+    return int(math.ceil(value / multiple)) * multiple
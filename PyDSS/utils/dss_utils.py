@@ -4,6 +4,7 @@ import re
 
 import opendssdirect as dss
 
+from PyDSS.circuit_metadata import get_circuit_metadata, read_node_kv_bases
 from PyDSS.exceptions import InvalidConfiguration
 from PyDSS.utils.utils import iter_elements
 
@@ -69,12 +70,26 @@ def get_node_names_by_type(kv_base_threshold=1.0):
 
     """
     names_by_type = {"primaries": [], "secondaries": []}
-    for i, name in enumerate(dss.Circuit.AllNodeNames()):
-        dss.Circuit.SetActiveBus(name)
-        kv_base = dss.Bus.kVBase()
+    for name, kv_base in zip(*get_node_kv_bases()):
         if kv_base > kv_base_threshold:
             names_by_type["primaries"].append(name)
         else:
             names_by_type["secondaries"].append(name)
 
     return names_by_type
+
+
+def get_node_kv_bases():
+    """Return the names of all nodes and their voltage bases. Uses the cached
+    circuit metadata if it is available.
+
+    Returns
+    -------
+    tuple
+        list of node names, list of kVBase values
+
+    """
+    metadata = get_circuit_metadata()
+    if metadata is not None:
+        return metadata.node_names, metadata.kv_bases
+    return read_node_kv_bases()
@@ -1,7 +1,6 @@
 
 import logging
 import time
-from collections import deque
 from datetime import datetime, timedelta
 
 import numpy as np
@@ -14,22 +13,137 @@ from PyDSS.simulation_input_models import SimulationSettingsModel
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_RESUM_INTERVAL = 10000
+
 
 class CircularBufferHelper:
+    """Maintains a moving average for one value. This is a single-column
+    wrapper around CircularBufferArray kept for existing callers. Use
+    CircularBufferArray to track many values at once.
+
+    """
     def __init__(self, window_size):
-        self._buf = deque(maxlen=window_size)
+        self._buf = CircularBufferArray(window_size, 1)
+        self._value = np.empty(1)
         self._window_size = window_size
 
     def __len__(self):
         return len(self._buf)
 
     def append(self, val):
-        self._buf.append(val)
+        self._value[0] = val
+        self._buf.append(self._value)
 
     def average(self):
-        if len(self._buf) < self._window_size:
-            return np.NaN
-        return sum(self._buf) / len(self._buf)
+        return float(self._buf.average()[0])
+
+
+class CircularBufferArray:
+    """Maintains moving averages for many values at once. Stores the window in
+    a 2-D ring buffer of shape (window, num_columns) and keeps a running sum,
+    so each append and average is one NumPy operation regardless of the
+    window size. The sum excludes NaN and inf, which are counted per column
+    instead, so that they can leave the window without a recomputation.
+
+    """
+
+    def __init__(self, window_sizes, num_columns, dtype=np.float64,
+                 resum_interval=DEFAULT_RESUM_INTERVAL):
+        """Constructor for CircularBufferArray
+
+        Parameters
+        ----------
+        window_sizes : int | list
+            One window size for all columns or one per column.
+        num_columns : int
+        dtype : np.dtype
+        resum_interval : int
+            Recompute the running sums from the buffer after this many
+            appends to bound floating-point drift.
+
+        """
+        self._window_sizes = np.empty(num_columns, dtype=np.int64)
+        self._window_sizes[:] = window_sizes
+        self._max_window_size = int(self._window_sizes.max(initial=1))
+        self._is_uniform = bool((self._window_sizes == self._max_window_size).all())
+        self._columns = np.arange(num_columns)
+        self._buf = np.zeros((self._max_window_size, num_columns), dtype=dtype)
+        self._sum = np.zeros(num_columns, dtype=dtype)
+        self._num_non_finite = np.zeros(num_columns, dtype=np.int64)
+        self._index = 0
+        self._count = 0
+        self._resum_interval = resum_interval
+        self._num_appends_since_resum = 0
+
+    def __len__(self):
+        return min(self._count, self._max_window_size)
+
+    def append(self, values):
+        """Append one value per column.
+
+        Parameters
+        ----------
+        values : np.ndarray
+
+        """
+        if self._is_uniform:
+            leaving = self._buf[self._index]
+        else:
+            # The value leaving each column's window was appended
+            # window_size steps ago.
+            indices = (self._index - self._window_sizes) % self._max_window_size
+            leaving = self._buf[indices, self._columns]
+            leaving[self._count < self._window_sizes] = 0
+
+        self._sum -= self._count_non_finite(leaving, -1)
+        self._buf[self._index] = values
+        self._sum += self._count_non_finite(self._buf[self._index], 1)
+        self._index = (self._index + 1) % self._max_window_size
+        self._count += 1
+        self._num_appends_since_resum += 1
+        if self._num_appends_since_resum >= self._resum_interval:
+            self._resum()
+
+    def average(self, out=None):
+        """Return the average of each column. Columns with fewer values than
+        their window size or with NaN or inf in their window are NaN.
+
+        Parameters
+        ----------
+        out : np.ndarray | None
+            Optional array in which to store the result.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        out = np.divide(self._sum, self._window_sizes, out=out)
+        if self._count < self._max_window_size:
+            out[self._count < self._window_sizes] = np.NaN
+        out[self._num_non_finite > 0] = np.NaN
+        return out
+
+    def _count_non_finite(self, values, increment):
+        """Add increment to the counts of the columns where values are NaN or
+        inf and return values with those replaced by 0."""
+        is_finite = np.isfinite(values)
+        if is_finite.all():
+            return values
+        self._num_non_finite[~is_finite] += increment
+        return np.where(is_finite, values, 0)
+
+    def _resum(self):
+        is_finite = np.isfinite(self._buf)
+        if self._is_uniform:
+            # Unfilled rows are zero.
+            in_window = True
+        else:
+            ages = (self._index - 1 - np.arange(self._max_window_size)) % self._max_window_size
+            in_window = ages[:, np.newaxis] < self._window_sizes
+        np.sum(self._buf, axis=0, where=in_window & is_finite, out=self._sum)
+        np.sum(in_window & ~is_finite, axis=0, out=self._num_non_finite)
+        self._num_appends_since_resum = 0
 
 
 class SimulationFilteredTimeRange:
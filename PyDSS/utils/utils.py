@@ -17,6 +17,7 @@ import pandas as pd
 import toml
 import yaml
 
+from PyDSS.active_object import invalidate_active_objects
 from PyDSS.exceptions import InvalidParameter
 
 MAX_PATH_LENGTH = 255
@@ -215,8 +216,10 @@ def iter_elements(element_class, element_func):
     """
     element_class.First()
     for _ in range(element_class.Count()):
+        invalidate_active_objects()
         yield element_func()
         element_class.Next()
+    invalidate_active_objects()
 
 
 def make_human_readable_size(size, decimals=2):
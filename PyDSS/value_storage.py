@@ -1,5 +1,6 @@
 
 import abc
+import copy
 import enum
 import logging
 import os
@@ -121,6 +122,28 @@ class ValueStorageBase(abc.ABC):
         fields.insert(0, name)
         return fields
 
+    @abc.abstractmethod
+    def bind(self, array):
+        """Store the value in array from now on. Refer to ValueColumns.
+
+        Parameters
+        ----------
+        array : np.ndarray
+            View of a larger array with num_columns entries.
+
+        """
+
+    @abc.abstractmethod
+    def get_raw_indices(self):
+        """Return the indices of the stored values in the raw output from
+        opendssdirect. Complex values are indexed by pairs of numbers.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+
     @abc.abstractmethod
     def is_nan(self):
         """Return True if the value is NaN.
@@ -247,25 +270,28 @@ class ValueByList(ValueStorageBase):
         self._name = name
         self._prop = prop
         self._labels = []
-        self._value_type = None
-        self._value = []
         assert (isinstance(values, list) and len(values) == len(label_suffixes)), \
             '"values" and "label_suffixes" should be lists of equal lengths'
-        for val, lab_suf in zip(values, label_suffixes):
+        for lab_suf in label_suffixes:
             label = prop + self.DELIMITER + lab_suf
             self._labels.append(label)
-            self._value.append(val)
-            if self._value_type is None:
-                self._value_type = type(val)
+        self._value_type = type(values[0])
+        self._value = np.array(values)
 
     def __iadd__(self, other):
-        for i in range(len(self._value)):
-            self._value[i] += other.value[i]
+        self._value += other.value
         return self
 
     def __gt__(self, other):
         # TODO
-        return sum(self._value) > sum(other.value)
+        return np.sum(self._value) > np.sum(other.value)
+
+    def bind(self, array):
+        array[:] = self._value
+        self._value = array
+
+    def get_raw_indices(self):
+        return np.arange(len(self._value))
 
     def is_nan(self):
         if np.issubdtype(self._value_type, np.int64):
@@ -295,16 +321,18 @@ class ValueByList(ValueStorageBase):
         self._name = name
 
     def set_nan(self):
-        for i in range(len(self._value)):
-            self._value[i] = np.NaN
+        if np.issubdtype(self._value.dtype, np.integer):
+            self._value[:] = INTEGER_NAN
+        else:
+            self._value[:] = np.NaN
 
     def set_value(self, value):
-        self._value = value
-        if not isinstance(value[0], self._value_type):
-            self._value_type = type(value[0])
+        self._value, self._value_type = _assign_array(self._value, value)
 
     def set_value_from_raw(self, value):
-        self._value = value
+        # Some callers pass more values than there are labels, like all taps
+        # of a transformer.
+        self._value[:] = value[:self._value.size]
 
     @property
     def value(self):
@@ -328,19 +356,28 @@ class ValueByNumber(ValueStorageBase):
                 f"Data export feature does not support strings: name={name} prop={prop} value={value}"
             )
         self._value = value
+        # Set by bind when the value lives in an array shared with other elements.
+        self._array = None
         self._is_complex = isinstance(self._value_type, complex)
 
     def __iadd__(self, other):
-        self._value += other.value
+        self.set_value_from_raw(self.value + other.value)
         return self
 
     def __gt__(self, other):
-        return self._value > other.value
+        return self.value > other.value
+
+    def bind(self, array):
+        array[0] = self.value
+        self._array = array
+
+    def get_raw_indices(self):
+        return np.zeros(1, dtype=np.int64)
 
     def is_nan(self):
         if np.issubdtype(self._value_type, np.int64):
-            return self._value == INTEGER_NAN
-        return np.isnan(self._value)
+            return self.value == INTEGER_NAN
+        return np.isnan(self.value)
 
     def make_columns(self):
         return [ValueStorageBase.DELIMITER.join((self._name, self._prop))]
@@ -357,21 +394,29 @@ class ValueByNumber(ValueStorageBase):
 
     def set_nan(self):
         if np.issubdtype(self._value_type, np.int64):
-            self._value = INTEGER_NAN
+            self.set_value_from_raw(INTEGER_NAN)
         else:
-            self._value = np.NaN
+            self.set_value_from_raw(np.NaN)
 
     def set_value(self, value):
-        self._value = value
         if not isinstance(value, self._value_type):
             self._value_type = type(value)
+            if self._array is not None:
+                # The shared array can't hold the new type.
+                self._array = None
+        self.set_value_from_raw(value)
 
     def set_value_from_raw(self, value):
-        self._value = value
+        if self._array is None:
+            self._value = value
+        else:
+            self._array[0] = value
 
     @property
     def value(self):
-        return self._value
+        if self._array is None:
+            return self._value
+        return self._array[0]
 
     @property
     def value_type(self):
@@ -410,63 +455,57 @@ class ValueByLabel(ValueStorageBase):
         self._prop = prop
         self._nodes = Nodes
         self._labels = []
-        self._value = []
         self._value_type = complex if is_complex else float
         self._is_complex = is_complex
 
         n = 2
         m = int(len(value) / (len(Nodes)*n))
 
-        self._m = m
-        self._n = n
-        value = self._fix_value(value)
-
-        # Chunk_list example
-        # X = list(range(12)) , nList= 2
-        # Y = chunk_list(X, nList) -> [[0, 1], [2, 3], [4, 5], [6, 7], [8, 9], [10, 11]]
-        # Given element has 2 terminals m = 12 / (2*2) = 3
-        # Z =  chunk_list(Y, m) - > [
-        #                            [[0, 1], [2, 3], [4, 5]],  Terminal one complex pairs
-        #                            [[6, 7], [8, 9], [10, 11]] Terminal two complex pairs
-        #                            ]
-
-        for i, node_val in enumerate(zip(self._nodes, value)):
-            node, val = node_val
-            for v, x in zip(node, val):
+        # The raw value has n numbers per quantity and m quantities per
+        # terminal. Example for 2 terminals with 3 conductors:
+        # X = list(range(12)) -> terminal one is [0, 5], terminal two is [6, 11]
+        # Complex values are indexed by pair: [0, 1, 2] and [3, 4, 5].
+        # Magnitude/angle values are indexed by number: [0, 1, ..., 11].
+        # Nodes limits the quantities stored for each terminal.
+        # The layout is computed once; set_value_from_raw only gathers values.
+        indices = []
+        for i, node in enumerate(self._nodes):
+            for j, v in enumerate(node[:m]):
                 label = '{}{}'.format(phs[v], str(i+1))
-                # Note that the value logic is duplicated in set_value_from_raw
+                index = i * m + j
                 if self._is_complex:
                     label += " " + units[0]
                     self._labels.append(label)
-                    self._value += [complex(x[0], x[1])]
+                    indices.append(index)
                 else:
                     label_mag = label + self.DELIMITER + "mag" + ' ' + units[0]
                     label_ang = label + self.DELIMITER + "ang" + ' ' + units[1]
                     self._labels.extend([label_mag, label_ang])
-                    self._value += [x[0], x[1]]
+                    indices += [index * n, index * n + 1]
+
+        self._layout = np.array(indices, dtype=np.int64)
+        dtype = np.complex128 if self._is_complex else np.float64
+        self._value = np.empty(len(self._layout), dtype=dtype)
+        self.set_value_from_raw(value)
 
     def __iadd__(self, other):
-        for i in range(len(self._value)):
-            self._value[i] += other.value[i]
+        self._value += other.value
         return self
 
     def __gt__(self, other):
         # TODO
-        return sum(self._value) > sum(other.value)
+        return np.sum(self._value) > np.sum(other.value)
 
     @property
     def value(self):
         return self._value
 
-    @staticmethod
-    def chunk_list(values, nLists):
-        # TODO: this breaks for Bus.puVmagAngle in monte carlo example test
-        return  [values[i * nLists:(i + 1) * nLists] for i in range((len(values) + nLists - 1) // nLists)]
+    def bind(self, array):
+        array[:] = self._value
+        self._value = array
 
-    def _fix_value(self, value):
-        value = self.chunk_list(value, self._n)
-        value = self.chunk_list(value, self._m)
-        return value
+    def get_raw_indices(self):
+        return self._layout
 
     def is_nan(self):
         if np.issubdtype(self._value_type, np.int64):
@@ -489,35 +528,182 @@ class ValueByLabel(ValueStorageBase):
         self._name = name
 
     def set_nan(self):
-        for i in range(len(self._value)):
-            self._value[i] = np.NaN
+        self._value[:] = np.NaN
 
     def set_value(self, value):
-        self._value = value
-        if not isinstance(value[0], self._value_type):
-            self._value_type = type(value[0])
+        self._value, self._value_type = _assign_array(self._value, value)
 
     def set_value_from_raw(self, value):
-        value = self._fix_value(value)
-        self._value.clear()
-        for i, node_val in enumerate(zip(self._nodes, value)):
-            node, val = node_val
-            for v, x in zip(node, val):
-                if self._is_complex:
-                    self._value += [complex(x[0], x[1])]
-                else:
-                    self._value += [x[0], x[1]]
+        raw = np.asarray(value, dtype=np.float64)
+        if self._is_complex:
+            raw = raw.view(np.complex128)
+        np.take(raw, self._layout, out=self._value)
 
     @property
     def value_type(self):
         return self._value_type
 
 
+class ValueColumns:
+    """Stores the values of all elements of a metric in one contiguous array.
+
+    Each element's ValueStorageBase instance is bound to a view of the array,
+    so the instances stay valid for code that works on one element at a time,
+    but a new time step is copied from the raw opendssdirect output with one
+    gather operation.
+
+    Instances behave like a sequence of ValueStorageBase.
+
+    """
+
+    def __init__(self, values, raw_offsets=None):
+        """Constructor for ValueColumns
+
+        Parameters
+        ----------
+        values : list
+            list of ValueStorageBase, one per element
+        raw_offsets : np.ndarray | None
+            Start offset of each element's raw values in the buffer that will
+            be passed to set_value_from_raw. The last entry is the total
+            length. Refer to ClassPropertyReader. Not required if the caller
+            sets the array directly.
+
+        """
+        self._values = values
+        self._is_complex = issubclass(values[0].value_type, complex)
+        dtype = np.complex128 if self._is_complex else np.float64
+        num_columns = sum((x.num_columns for x in values))
+        self._array = np.empty(num_columns, dtype=dtype)
+        self._columns = None
+
+        start = 0
+        for value in values:
+            end = start + value.num_columns
+            value.bind(self._array[start:end])
+            start = end
+
+        self._layout = None
+        if raw_offsets is not None:
+            layouts = []
+            for value, raw_offset in zip(values, raw_offsets):
+                if self._is_complex:
+                    raw_offset //= 2
+                layouts.append(value.get_raw_indices() + raw_offset)
+            self._layout = np.concatenate(layouts)
+
+    def __getitem__(self, index):
+        return self._values[index]
+
+    def __iter__(self):
+        return iter(self._values)
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def array(self):
+        """Return the values of all elements.
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        return self._array
+
+    @staticmethod
+    def from_copies(values):
+        """Return a ValueColumns that stores copies of values.
+
+        Parameters
+        ----------
+        values : list | ValueColumns
+            list of ValueStorageBase
+
+        Returns
+        -------
+        ValueColumns
+
+        """
+        return ValueColumns([copy.deepcopy(x) for x in values])
+
+    @staticmethod
+    def get_array(values):
+        """Return the values of all elements as one array.
+
+        Parameters
+        ----------
+        values : list | ValueColumns
+            list of ValueStorageBase
+
+        Returns
+        -------
+        np.ndarray
+
+        """
+        if isinstance(values, ValueColumns):
+            return values.array
+        if isinstance(values[0].value, np.ndarray):
+            return np.concatenate([x.value for x in values])
+        return np.array([x.value for x in values])
+
+    def make_columns(self):
+        """Return the column names of all elements.
+
+        Returns
+        -------
+        list
+
+        """
+        if self._columns is None:
+            self._columns = [x for y in self._values for x in y.make_columns()]
+        return self._columns
+
+    def set_nan(self):
+        """Set all values to NaN."""
+        self._array[:] = np.NaN
+
+    def set_value_from_raw(self, raw):
+        """Set the values of all elements from raw opendssdirect output.
+
+        Parameters
+        ----------
+        raw : np.ndarray
+            float64 array laid out according to raw_offsets
+
+        """
+        if self._is_complex:
+            raw = raw.view(np.complex128)
+        np.take(raw, self._layout, out=self._array)
+
+
+def _assign_array(array, value):
+    """Assign value to array in place if possible. Otherwise, return a new
+    array; this happens when a conversion changes the type.
+
+    """
+    value = np.asarray(value)
+    if value.shape == array.shape and value.dtype == array.dtype:
+        array[:] = value
+    else:
+        array = value.copy()
+    if np.iscomplexobj(array):
+        value_type = complex
+    elif np.issubdtype(array.dtype, np.integer):
+        value_type = int
+    else:
+        value_type = float
+    return array, value_type
+
+
 class ValueContainer:
     """Container for a sequence of instances of ValueStorageBase."""
 
     def __init__(self, values, hdf_store, path, max_size, elem_names,
-                 dataset_property_type, max_chunk_bytes=None, store_time_step=False):
+                 dataset_property_type, max_chunk_bytes=None, store_time_step=False,
+                 writer=None, compression=None, metadata_compression=None,
+                 sample_interval=1):
         group_name = os.path.dirname(path)
         basename = os.path.basename(path)
         try:
@@ -550,6 +736,9 @@ class ValueContainer:
                 scaleoffset=0,
                 max_chunk_bytes=max_chunk_bytes,
                 attributes=attributes,
+                writer=writer,
+                compression=compression,
+                metadata_compression=metadata_compression,
             )
             columns = []
             tmp_columns = values[0].make_columns()
@@ -574,6 +763,13 @@ class ValueContainer:
         attributes = {"type": dataset_property_type.value}
         if store_time_step:
             attributes["time_step_path"] = time_step_path
+            if all(x.num_columns == len(columns) for x in values):
+                # Every row holds the values of one element in the columns of
+                # the first element. Readers of on_change datasets check this.
+                attributes["num_columns_per_element"] = len(columns)
+        if dataset_property_type == DatasetPropertyType.PER_TIME_POINT:
+            # Row i of the dataset corresponds to time step i * sample_interval.
+            attributes["sample_interval"] = sample_interval
 
         self._dataset = DatasetBuffer(
             hdf_store,
@@ -586,6 +782,11 @@ class ValueContainer:
             attributes=attributes,
             names=elem_names,
             column_ranges_per_name=column_ranges,
+            writer=writer,
+            # Datasets with one value per element are small.
+            compression=metadata_compression if dataset_property_type == DatasetPropertyType.VALUE \
+                else compression,
+            metadata_compression=metadata_compression,
         )
 
     @staticmethod
@@ -597,16 +798,11 @@ class ValueContainer:
 
         Parameters
         ----------
-        value : list
+        value : list | ValueColumns
             list of ValueStorageBase
 
         """
-        if isinstance(values[0].value, list):
-            vals = [x for y in values for x in y.value]
-        else:
-            vals = [x.value for x in values]
-
-        self._dataset.write_value(vals)
+        self._dataset.write_value(ValueColumns.get_array(values))
 
     def append_by_time_step(self, value, time_step, elem_index):
         """Append a value to the container.
@@ -618,12 +814,7 @@ class ValueContainer:
         elem_index : int
 
         """
-        if isinstance(value.value, list):
-            vals = [x for x in value.value]
-        else:
-            vals = value.value
-
-        self._dataset.write_value(vals)
+        self._dataset.write_value(value.value)
         self._time_steps.write_value([time_step, elem_index])
 
     def flush_data(self):
@@ -663,3 +854,15 @@ def get_time_step_path(dataset):
 
     """
     return dataset.attrs["time_step_path"]
+
+
+def get_sample_interval(dataset):
+    """Return the number of time steps between rows of this dataset. Datasets
+    written by older versions do not have the attribute and store every step.
+
+    Returns
+    -------
+    int
+
+    """
+    return int(dataset.attrs.get("sample_interval", 1))
@@ -0,0 +1,133 @@
+"""Benchmarks HDF5 compression codecs for PyDSS time-series exports.
+
+Solves a reference circuit for a number of time points, collects line currents
+and load powers, and then writes the same data with each codec through
+DatasetBuffer. Reports write throughput and file size.
+
+Example::
+
+    $ python scripts/benchmark_hdf_compression.py --num-steps 2880
+
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+import h5py
+import numpy as np
+import opendssdirect as dss
+
+from PyDSS.class_property_reader import ClassPropertyReader
+from PyDSS.common import HdfCompression
+from PyDSS.dataset_buffer import DatasetBuffer, MiB
+from PyDSS.dssElementFactory import create_dss_element
+from PyDSS.exceptions import InvalidConfiguration
+from PyDSS.simulation_input_models import HdfCompressionModel
+
+
+DEFAULT_DSS_FILE = os.path.join(
+    "tests", "data", "project", "DSSfiles", "Master_Spohn_existing_VV.dss"
+)
+DEFAULT_CODECS = ("none", "lzf", "gzip:1", "gzip:4", "gzip:9", "blosc:5", "zstd:3")
+EXPORTS = (
+    (dss.Lines, "Line", "Currents"),
+    (dss.Loads, "Load", "Powers"),
+)
+
+
+def compile_circuit(dss_file):
+    orig = os.getcwd()
+    try:
+        result = dss.run_command(f"compile {os.path.abspath(dss_file)}")
+    finally:
+        os.chdir(orig)
+    if result:
+        sys.exit(f"Failed to compile {dss_file}: {result}")
+
+
+def collect_data(num_steps, seed):
+    """Return a dict of dataset name to complex array of shape (num_steps, num_columns)."""
+    readers = {}
+    for elem_class, class_name, prop in EXPORTS:
+        elements = []
+        flag = elem_class.First()
+        while flag > 0:
+            dss.Circuit.SetActiveElement(f"{class_name}.{elem_class.Name()}")
+            elements.append(create_dss_element(class_name, elem_class.Name(), dss))
+            flag = elem_class.Next()
+        readers[f"{class_name}_{prop}"] = ClassPropertyReader(elem_class, prop, elements)
+
+    rng = np.random.default_rng(seed)
+    # Smooth load variation, similar to a daily load shape with noise.
+    multipliers = 0.6 + 0.3 * np.sin(np.linspace(0, 2 * np.pi, num_steps)) \
+        + rng.normal(0, 0.02, num_steps)
+    data = {name: [] for name in readers}
+    for step in range(num_steps):
+        dss.Solution.LoadMult(multipliers[step])
+        dss.Solution.Solve()
+        for name, reader in readers.items():
+            data[name].append(reader.read().view(np.complex128).copy())
+
+    return {name: np.array(rows) for name, rows in data.items()}
+
+
+def parse_codec(text):
+    fields = text.split(":")
+    level = int(fields[1]) if len(fields) > 1 else None
+    return HdfCompressionModel(codec=HdfCompression(fields[0]), level=level)
+
+
+def run_codec(data, compression, filename, max_chunk_bytes):
+    start = time.time()
+    with h5py.File(filename, "w") as store:
+        for name, array in data.items():
+            columns = [str(i) for i in range(array.shape[1])]
+            dataset = DatasetBuffer(
+                store, name, len(array), np.complex128, columns,
+                max_chunk_bytes=max_chunk_bytes, compression=compression,
+            )
+            for row in array:
+                dataset.write_value(row)
+            dataset.flush_data()
+    duration = time.time() - start
+    return duration, os.path.getsize(filename)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--dss-file", default=DEFAULT_DSS_FILE, help="OpenDSS master file")
+    parser.add_argument("--num-steps", type=int, default=2880, help="Number of time points")
+    parser.add_argument(
+        "--codecs", nargs="+", default=DEFAULT_CODECS,
+        help="Codecs to test, formatted as codec[:level]",
+    )
+    parser.add_argument("--max-chunk-bytes", type=int, default=MiB, help="HDF5 max chunk bytes")
+    parser.add_argument("--seed", type=int, default=42, help="Random seed for load variation")
+    args = parser.parse_args()
+
+    compile_circuit(args.dss_file)
+    data = collect_data(args.num_steps, args.seed)
+    raw_bytes = sum((x.nbytes for x in data.values()))
+    print(f"Collected {raw_bytes / MiB:.1f} MiB over {args.num_steps} time points")
+    print(f"{'codec':<10} {'seconds':>8} {'MiB/s':>8} {'size MiB':>9} {'ratio':>6}")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for text in args.codecs:
+            try:
+                compression = parse_codec(text)
+                filename = os.path.join(tmpdir, f"{text.replace(':', '_')}.h5")
+                duration, size = run_codec(data, compression, filename, args.max_chunk_bytes)
+            except (InvalidConfiguration, ValueError) as exc:
+                print(f"{text:<10} skipped: {exc}")
+                continue
+            print(
+                f"{text:<10} {duration:>8.2f} {raw_bytes / MiB / duration:>8.1f} "
+                f"{size / MiB:>9.2f} {raw_bytes / size:>6.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
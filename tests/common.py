@@ -5,16 +5,22 @@ import tarfile
 import zipfile
 from pathlib import Path
 
+import h5py
+import numpy as np
 import opendssdirect as dss
 import pytest
 
+from PyDSS.active_object import enable_active_object_verification, invalidate_active_objects
+from PyDSS.circuit_metadata import clear_circuit_model
 from PyDSS.common import PROJECT_TAR, PROJECT_ZIP, RUN_SIMULATION_FILENAME
+from PyDSS.parameter_cache import invalidate_all
 from PyDSS.pydss_fs_interface import STORE_FILENAME
 from PyDSS.pydss_project import PyDssProject
-from PyDSS.utils.utils import dump_data
+from PyDSS.utils.utils import dump_data, load_data
 
 
 RUN_PROJECT_PATH = os.path.join("tests", "data", "project")
+MASTER_FILE = os.path.join(RUN_PROJECT_PATH, "DSSfiles", "Master_Spohn_existing_VV.dss")
 CUSTOM_EXPORTS_PROJECT_PATH = os.path.join(
     "tests", "data", "custom_exports_project"
 )
@@ -34,6 +40,8 @@ AUTOMATED_UPGRADES_PROJECT_PATH = os.path.join(
 EDLIFO_PROJECT_PATH = os.path.join(
     "tests", "data", "edlifo-project")
 
+MONTE_CARLO_EXAMPLE_PATH = os.path.join("examples", "monte_carlo")
+
 SCENARIO_NAME = "scenario1"
 
 
@@ -45,6 +53,27 @@ class FakeElement:
         self._Class = dss.PVsystems
 
 
+@pytest.fixture
+def circuit():
+    """Compile and solve the circuit of the test project."""
+    orig = os.getcwd()
+    try:
+        dss.run_command("clear")
+        result = dss.run_command(f"compile {os.path.abspath(MASTER_FILE)}")
+        assert result == "", result
+    finally:
+        # OpenDSS changes the current directory on compile.
+        os.chdir(orig)
+    dss.Solution.Solve()
+    invalidate_active_objects()
+    invalidate_all()
+    yield
+    enable_active_object_verification(False)
+    invalidate_active_objects()
+    clear_circuit_model()
+    dss.run_command("clear")
+
+
 @pytest.fixture
 def cleanup_project():
     projects = (
@@ -110,3 +139,66 @@ def run_project_with_custom_exports(path, scenario, sim_file, data):
     finally:
         os.remove(exports)
         os.rename(backup, exports)
+
+
+def create_monte_carlo_project(path, scenario_names, num_samples=-1, duration_min=60.0):
+    """Create a small project from the Monte Carlo example. Its scenarios are
+    copies of the example's scenario. Set num_samples to -1 to run the
+    scenarios without Monte Carlo samples.
+
+    Returns
+    -------
+    str
+        project directory
+
+    """
+    project_dir = os.path.join(path, "monte_carlo")
+    shutil.copytree(
+        MONTE_CARLO_EXAMPLE_PATH,
+        project_dir,
+        ignore=shutil.ignore_patterns(
+            "*.log", "scenario_*", RUN_SIMULATION_FILENAME, STORE_FILENAME
+        ),
+    )
+    for name in scenario_names:
+        shutil.copytree(
+            os.path.join(MONTE_CARLO_EXAMPLE_PATH, "Scenarios", "scenario_1"),
+            os.path.join(project_dir, "Scenarios", name),
+            ignore=shutil.ignore_patterns(RUN_SIMULATION_FILENAME),
+        )
+
+    filename = os.path.join(project_dir, "simulation.toml")
+    data = load_data(filename)
+    data["Project"]["Project Path"] = str(path)
+    data["Project"]["Simulation duration (min)"] = duration_min
+    data["Project"]["Scenarios"] = [
+        {"name": x, "post_process_infos": []} for x in scenario_names
+    ]
+    data["Logging"]["Display on screen"] = False
+    data["MonteCarlo"]["Number of Monte Carlo scenarios"] = num_samples
+    data["MonteCarlo"]["Seed"] = 42
+    dump_data(data, filename)
+    return project_dir
+
+
+def read_store_datasets(filename):
+    """Return the datasets of the exports in a store keyed by their paths."""
+    datasets = {}
+
+    def visit(name, obj):
+        if isinstance(obj, h5py.Dataset):
+            datasets[name] = np.array(obj[()])
+
+    with h5py.File(filename, "r") as f:
+        f["Exports"].visititems(visit)
+    return datasets
+
+
+def assert_datasets_equal(expected, actual):
+    """Assert that two results of read_store_datasets are equal."""
+    assert expected.keys() == actual.keys()
+    for name, data in expected.items():
+        if data.dtype.kind in "fc":
+            assert np.allclose(data, actual[name], equal_nan=True), name
+        else:
+            assert np.array_equal(data, actual[name]), name
@@ -0,0 +1,44 @@
+import opendssdirect as dss
+import pytest
+
+from PyDSS.active_object import (
+    enable_active_object_verification, invalidate_active_objects, is_active_object,
+)
+from PyDSS.dssElementFactory import create_dss_element_by_name
+from PyDSS.exceptions import ActiveObjectError
+from tests.common import circuit
+
+
+def _create_loads():
+    names = [x for x in dss.Circuit.AllElementNames() if x.startswith("Load.")][:2]
+    return [create_dss_element_by_name(x, dss) for x in names]
+
+
+def test_active_object_tracking(circuit):
+    load1, load2 = _create_loads()
+    assert is_active_object(load2)
+    assert not is_active_object(load1)
+
+    load1.GetValue("Powers")
+    assert is_active_object(load1)
+    assert dss.Element.Name() == load1.FullName
+
+    kw = load2.GetParameter("kW")
+    load2.SetParameter("kW", kw * 2)
+    assert is_active_object(load2)
+    assert dss.Element.Name() == load2.FullName
+
+    invalidate_active_objects()
+    assert not is_active_object(load2)
+
+
+def test_active_object_verification(circuit):
+    load1, load2 = _create_loads()
+    enable_active_object_verification()
+    assert is_active_object(load2)
+
+    # Activating an element outside of PyDSS without invalidating the tracker
+    # is a bug that verification catches.
+    dss.Circuit.SetActiveElement(load1.FullName)
+    with pytest.raises(ActiveObjectError):
+        load2.GetValue("Powers")
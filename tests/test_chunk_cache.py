@@ -0,0 +1,67 @@
+
+import h5py
+import numpy as np
+
+from PyDSS.chunk_cache import ChunkCache
+from PyDSS.dataset_buffer import DatasetBuffer
+
+
+def _make_dataset(store):
+    # 8 bytes per row * 4 rows per chunk
+    dataset = DatasetBuffer(store, "data", 100, float, ("1", "2"), max_chunk_bytes=64)
+    for i in range(10):
+        dataset.write_value([i, i * 10.0])
+    dataset.flush_data()
+    return store["data"]
+
+
+def test_chunk_cache():
+    with h5py.File("cache.h5", "w", driver="core", backing_store=False) as store:
+        dataset = _make_dataset(store)
+        assert dataset.chunks[0] == 4
+        expected = dataset[:]
+        cache = ChunkCache()
+        data = cache.read(dataset, slice(2, 9))
+        assert np.array_equal(data, expected[2:9])
+        assert cache.misses == 3
+        assert cache.hits == 0
+        assert len(cache) == 3
+
+        data = cache.read(dataset, slice(5, 6), slice(1, 2))
+        assert np.array_equal(data, expected[5:6, 1:2])
+        assert cache.hits == 1
+        assert cache.misses == 3
+
+        # The caller must not be able to modify the cache.
+        data[0, 0] = -1
+        assert cache.read(dataset, slice(5, 6))[0, 1] == expected[5, 1]
+
+        assert cache.read(dataset, slice(20, 30)).shape == (0, 2)
+        assert np.array_equal(cache.read(dataset, slice(None)), expected)
+
+        df = DatasetBuffer.to_dataframe(dataset, column_range=(1, 1), row_range=(3, 5), cache=cache)
+        assert list(df["2"].values) == [30.0, 40.0]
+        assert DatasetBuffer.search_sorted(dataset, 7.0, cache=cache) == 7
+
+        cache.clear()
+        assert len(cache) == 0
+        assert cache.num_bytes == 0
+        assert cache.hits == 0
+
+
+def test_chunk_cache_eviction():
+    with h5py.File("cache.h5", "w", driver="core", backing_store=False) as store:
+        dataset = _make_dataset(store)
+        block_size = dataset[0:4].nbytes
+        cache = ChunkCache(max_bytes=block_size * 2)
+        cache.read(dataset, slice(0, 1))
+        cache.read(dataset, slice(4, 5))
+        cache.read(dataset, slice(0, 1))
+        # Evicts the block at rows 4-8, which is the least recently used.
+        cache.read(dataset, slice(8, 9))
+        assert len(cache) == 2
+        assert cache.num_bytes <= cache.max_bytes
+        cache.read(dataset, slice(0, 1))
+        assert cache.hits == 2
+        cache.read(dataset, slice(4, 5))
+        assert cache.misses == 4
@@ -0,0 +1,81 @@
+import os
+from pathlib import Path
+from unittest import mock
+
+import opendssdirect as dss
+import pytest
+
+import PyDSS.circuit_metadata
+from PyDSS.circuit_metadata import (
+    CIRCUIT_METADATA_FILENAME, get_circuit_metadata, hash_dss_files,
+    read_node_kv_bases, set_circuit_model,
+)
+from PyDSS.utils.dss_utils import get_node_kv_bases, get_node_names_by_type
+from tests.common import MASTER_FILE, circuit
+
+
+def test_circuit_metadata_cache(circuit, tmp_path, monkeypatch):
+    expected = read_node_kv_bases()
+    expected_by_type = get_node_names_by_type()
+    set_circuit_model(Path(MASTER_FILE), tmp_path)
+    assert get_node_kv_bases() == expected
+    assert (tmp_path / CIRCUIT_METADATA_FILENAME).exists()
+
+    def read():
+        raise Exception("read from OpenDSS")
+
+    # The next run of the same model loads the metadata from the cache.
+    monkeypatch.setattr(PyDSS.circuit_metadata, "read_node_kv_bases", read)
+    set_circuit_model(Path(MASTER_FILE), tmp_path)
+    assert get_node_kv_bases() == expected
+    assert get_node_names_by_type() == expected_by_type
+
+
+def test_circuit_metadata_no_model(circuit):
+    assert get_circuit_metadata() is None
+    assert get_node_kv_bases() == read_node_kv_bases()
+
+
+def test_hash_dss_files(tmp_path):
+    dss_file = tmp_path / "Master.dss"
+    dss_file.write_text("clear\nRedirect Lines.dss\n")
+    lines = tmp_path / "Lines.dss"
+    lines.write_text("\n")
+    loadshape = tmp_path / "loadshape.csv"
+    loadshape.write_text("1.0\n")
+
+    model_hash = hash_dss_files(dss_file)
+    assert hash_dss_files(dss_file) == model_hash
+    lines.write_text("New Line.a\n")
+    assert hash_dss_files(dss_file) != model_hash
+
+    # Other files only change the hash if their size or modification time
+    # changes, and their contents are not read.
+    loadshape.write_text("2.0\n")
+    os.utime(loadshape, ns=(0, 0))
+    model_hash = hash_dss_files(dss_file)
+    real_open = open
+
+    def fake_open(path, *args, **kwargs):
+        assert Path(path) != loadshape
+        return real_open(path, *args, **kwargs)
+
+    with mock.patch("builtins.open", fake_open):
+        assert hash_dss_files(dss_file) == model_hash
+    os.utime(loadshape, ns=(1, 1))
+    assert hash_dss_files(dss_file) != model_hash
+
+
+def test_hash_dss_files_redirect_outside_directory(tmp_path):
+    model_dir = tmp_path / "model"
+    model_dir.mkdir()
+    dss_file = model_dir / "Master.dss"
+    dss_file.write_text("clear\nredirect ../shared/Lines.dss ! lines\n")
+    shared_dir = tmp_path / "shared"
+    shared_dir.mkdir()
+    lines = shared_dir / "Lines.dss"
+    lines.write_text("Redirect Lines.dss\n")
+
+    model_hash = hash_dss_files(dss_file)
+    lines.write_text("Redirect Lines.dss\nNew Line.a\n")
+    assert hash_dss_files(dss_file) != model_hash
@@ -0,0 +1,178 @@
+import os
+import shutil
+import tempfile
+from pathlib import Path
+
+import h5py
+import numpy as np
+import opendssdirect as dss
+import pytest
+
+from PyDSS.class_property_reader import ClassPropertyReader, read_class_properties
+from PyDSS.dataset_buffer import DatasetBuffer
+from PyDSS.dssElementFactory import create_dss_element
+from PyDSS.export_list_reader import ExportListProperty
+from PyDSS.metrics import OpenDssPropertyMetric, SummedElementsOpenDssPropertyMetric
+from PyDSS.simulation_input_models import create_simulation_settings, load_simulation_settings
+from tests.common import circuit
+
+
+STORE_FILENAME = os.path.join(tempfile.gettempdir(), "store.h5")
+
+
+@pytest.fixture
+def simulation_settings():
+    project_path = Path(tempfile.gettempdir()) / "pydss_projects"
+    if project_path.exists():
+        shutil.rmtree(project_path)
+    project_path.mkdir()
+    filename = create_simulation_settings(project_path, "test_project", ["s1"])
+    yield load_simulation_settings(filename)
+    if os.path.exists(STORE_FILENAME):
+        os.remove(STORE_FILENAME)
+    if project_path.exists():
+        shutil.rmtree(project_path)
+
+
+def _make_elements(elem_class, class_name):
+    elements = []
+    flag = elem_class.First()
+    while flag > 0:
+        dss.Circuit.SetActiveElement(f"{class_name}.{elem_class.Name()}")
+        elements.append(create_dss_element(class_name, elem_class.Name(), dss))
+        flag = elem_class.Next()
+    return elements
+
+
+@pytest.mark.parametrize(
+    "elem_class, class_name, prop",
+    [
+        (dss.Lines, "Line", "Currents"),
+        (dss.Lines, "Line", "Losses"),
+        (dss.Loads, "Load", "Powers"),
+        (dss.PVsystems, "PVSystem", "Powers"),
+        (dss.Lines, "Line", "NormalAmps"),
+    ],
+)
+def test_class_property_reader(circuit, elem_class, class_name, prop):
+    elements = _make_elements(elem_class, class_name)
+    # Reverse the order to make sure that the buffer follows dss_objs.
+    elements.reverse()
+    assert ClassPropertyReader.is_supported(elements[0], prop)
+    reader = ClassPropertyReader(elem_class, prop, elements)
+    for _ in range(2):
+        buf = reader.read()
+        for i, element in enumerate(elements):
+            expected = element.GetValue(prop)
+            if reader.is_scalar:
+                assert buf[reader.offsets[i]] == expected
+            else:
+                assert np.array_equal(reader.get_element_values(i), expected)
+
+
+def test_class_property_reader_unsupported(circuit):
+    elements = _make_elements(dss.Lines, "Line")
+    assert not ClassPropertyReader.is_supported(elements[0], "BusNames")
+    assert not ClassPropertyReader.is_supported(elements[0], "InvalidProperty")
+
+
+def test_opendss_property_metric_with_reader(circuit, simulation_settings):
+    elements = _make_elements(dss.Lines, "Line")
+    prop = ExportListProperty("Lines", {"property": "Currents", "store_values_type": "all"})
+    metric = OpenDssPropertyMetric(prop, elements, simulation_settings)
+    num_steps = 3
+    expected = []
+    with h5py.File(STORE_FILENAME, mode="w", driver="core") as hdf_store:
+        metric.initialize_data_store(hdf_store, "", num_steps)
+        for i in range(num_steps):
+            dss.Loads.First()
+            dss.Loads.kW(dss.Loads.kW() * 1.1)
+            dss.Solution.Solve()
+            expected.append([x for y in elements for x in y.GetValue("Currents")])
+            metric.append_values(i)
+        assert metric._reader is not None
+        metric.close()
+
+        df = DatasetBuffer.to_dataframe(hdf_store["Lines/ElementProperties/Currents"])
+        for i in range(num_steps):
+            row = df.iloc[i].values
+            assert np.allclose(row.real, expected[i][::2])
+            assert np.allclose(row.imag, expected[i][1::2])
+
+
+def test_read_class_properties(circuit, monkeypatch):
+    lines = _make_elements(dss.Lines, "Line")
+    loads = _make_elements(dss.Loads, "Load")
+    readers = [
+        ClassPropertyReader(dss.Lines, "Currents", lines),
+        ClassPropertyReader(dss.Lines, "Powers", lines),
+        ClassPropertyReader(dss.Lines, "NormalAmps", lines),
+        ClassPropertyReader(dss.Loads, "Powers", loads),
+    ]
+    # Readers are not shared until they have read once on their own.
+    assert read_class_properties(readers) == (0, 0)
+    for reader in readers:
+        reader.read()
+
+    dss.Loads.First()
+    dss.Loads.kW(dss.Loads.kW() * 1.1)
+    dss.Solution.Solve()
+    calls = []
+
+    def count_calls(func):
+        def wrapper(*args):
+            calls.append(func)
+            return func(*args)
+        return wrapper
+
+    for name in ("Count", "First", "Next"):
+        monkeypatch.setattr(dss.Lines, name, count_calls(getattr(dss.Lines, name)))
+    for reader in readers:
+        monkeypatch.setattr(reader, "_func", count_calls(reader._func))
+    num_calls, num_separate_calls = read_class_properties(readers)
+    monkeypatch.undo()
+    # The single Loads reader reads on its own.
+    count = len(lines)
+    assert num_calls == len(calls)
+    assert num_calls == 2 + count * 4
+    assert num_separate_calls == 3 * (2 + count * 2)
+    for reader in readers:
+        elements = loads if reader.elem_class is dss.Loads else lines
+        buf = reader.read()
+        for i, element in enumerate(elements):
+            expected = element.GetValue(reader._prop)
+            if reader.is_scalar:
+                assert buf[reader.offsets[i]] == expected
+            else:
+                assert np.array_equal(reader.get_element_values(i), expected)
+
+    # Values from a shared pass are only used in the same pass.
+    read_class_properties(readers[:2])
+    dss.Loads.kW(dss.Loads.kW() * 1.1)
+    dss.Solution.Solve()
+    read_class_properties([])
+    assert np.array_equal(readers[0].read(), [x for y in lines for x in y.GetValue("Currents")])
+
+
+def test_summed_metric_with_reader(circuit, simulation_settings):
+    elements = _make_elements(dss.Lines, "Line")
+    prop = ExportListProperty(
+        "Lines", {"property": "Losses", "store_values_type": "all", "sum_elements": True}
+    )
+    metric = SummedElementsOpenDssPropertyMetric(prop, elements, simulation_settings)
+    num_steps = 3
+    expected = []
+    with h5py.File(STORE_FILENAME, mode="w", driver="core") as hdf_store:
+        metric.initialize_data_store(hdf_store, "", num_steps)
+        for i in range(num_steps):
+            dss.Loads.First()
+            dss.Loads.kW(dss.Loads.kW() * 1.1)
+            dss.Solution.Solve()
+            expected.append(sum(complex(*x.GetValue("Losses")) for x in elements))
+            read_class_properties(list(metric.iter_class_readers()))
+            metric.append_values(i)
+        assert metric._reader is not None
+        metric.close()
+
+        df = DatasetBuffer.to_dataframe(hdf_store["Lines/SummedElementProperties/Losses"])
+        assert np.allclose(df.iloc[:, 0].values, expected)
@@ -0,0 +1,105 @@
+from dss import DSSException
+import opendssdirect as dss
+import pytest
+
+from PyDSS.active_object import invalidate_active_objects
+from PyDSS.compiled_circuit import (
+    CompiledCircuit, get_compiled_circuit, make_circuit_key, set_compiled_circuit,
+)
+from PyDSS.NetworkModifier import Modifier
+from PyDSS.dssElementFactory import LazyObjectDict, create_dss_element_by_name
+from PyDSS.parameter_cache import invalidate_all
+from PyDSS.simulation_input_models import create_simulation_settings, load_simulation_settings
+from tests.common import circuit
+
+
+def _create_objects():
+    return LazyObjectDict(
+        dss.Circuit.AllElementNames(), lambda x: create_dss_element_by_name(x, dss)
+    )
+
+
+def test_compiled_circuit_restore(circuit):
+    objects = _create_objects()
+    compiled = CompiledCircuit(None, objects, {}, {})
+    load_name = next(x for x in objects if x.startswith("Load."))
+    storage_name = next(x for x in objects if x.startswith("Storage."))
+    load = objects[load_name]
+    storage = objects[storage_name]
+    kw = load.GetParameter("kW")
+    stored = storage.GetParameter("%stored")
+
+    load.SetParameter("kW", kw * 2)
+    load.SetParameter("kW", kw * 3)
+    dss.run_command(f"{storage_name}.%stored={stored / 2}")
+    # The command activated and edited the storage element without PyDSS.
+    invalidate_active_objects()
+    invalidate_all()
+    dss.Solution.Mode(2)
+    dss.Solution.Convergence(0.01)
+    assert load.GetParameter("kW") == pytest.approx(kw * 3)
+
+    compiled.restore()
+    assert load.GetParameter("kW") == kw
+    assert storage.GetParameter("%stored") == stored
+    assert dss.Solution.Mode() == 0
+    assert dss.Solution.Convergence() == 0.0001
+
+
+def test_compiled_circuit_restore_modifier_edits(circuit, tmp_path):
+    objects = _create_objects()
+    compiled = CompiledCircuit(None, objects, {}, {})
+    filename = create_simulation_settings(tmp_path, "test_project", ["s1"])
+    modifier = Modifier(dss, dss.run_command, load_simulation_settings(filename), compiled)
+    load_name = next(x for x in objects if x.startswith("Load."))
+    load = objects[load_name]
+    kw = load.GetParameter("kW")
+
+    modifier.Edit_Element("Load", load_name.split(".", 1)[1], {"kW": kw * 2})
+    assert load.GetParameter("kW") == kw * 2
+    compiled.restore()
+    assert load.GetParameter("kW") == kw
+
+
+def test_make_circuit_key(tmp_path):
+    filename = create_simulation_settings(tmp_path, "test_project", ["s1"])
+    settings = load_simulation_settings(filename)
+    dss_file = tmp_path / "Master.dss"
+    dss_file.write_text("clear\n")
+    other = tmp_path / "Lines.dss"
+    other.write_text("\n")
+
+    key = make_circuit_key(dss_file, settings)
+    assert make_circuit_key(dss_file, settings) == key
+    other.write_text("New Line.a\n")
+    assert make_circuit_key(dss_file, settings) != key
+    key = make_circuit_key(dss_file, settings)
+    settings.frequency.neglect_shunt_admittance = True
+    assert make_circuit_key(dss_file, settings) != key
+
+
+def test_get_compiled_circuit(circuit):
+    compiled = CompiledCircuit("key", _create_objects(), {}, {})
+    set_compiled_circuit(compiled)
+    try:
+        assert get_compiled_circuit("key") is compiled
+        assert get_compiled_circuit("other") is None
+        dss.run_command("clear")
+        assert get_compiled_circuit("key") is None
+    finally:
+        set_compiled_circuit(None)
+
+
+def test_get_compiled_circuit_error(circuit, monkeypatch):
+    compiled = CompiledCircuit("key", _create_objects(), {}, {})
+    set_compiled_circuit(compiled)
+
+    def num_circuits():
+        raise DSSException(33004, 'Invalid property index "0"')
+
+    # OpenDSS reports the error of a failed call on the next call.
+    monkeypatch.setattr(dss.Basic, "NumCircuits", num_circuits)
+    try:
+        assert get_compiled_circuit("key") is None
+    finally:
+        set_compiled_circuit(None)
@@ -5,8 +5,13 @@ import tempfile
 import h5py
 import numpy as np
 import pandas as pd
+import pytest
 
-from PyDSS.dataset_buffer import DatasetBuffer
+from PyDSS.async_hdf_writer import AsyncHdfWriter
+from PyDSS.common import HdfCompression
+from PyDSS.dataset_buffer import DatasetBuffer, make_compression_kwargs
+from PyDSS.exceptions import InvalidConfiguration
+from PyDSS.simulation_input_models import HdfCompressionModel
 
 
 def test_dataset_buffer__compute_chunk_count():
@@ -74,3 +79,121 @@ def test_dataset_buffer__write_value():
     finally:
         if os.path.exists(filename):
             os.remove(filename)
+
+
+def test_dataset_buffer__resizable():
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            columns = ("1", "2")
+            # Write more rows than expected.
+            dataset = DatasetBuffer(store, "data", 10, float, columns)
+            assert dataset.chunk_count == 10
+            assert store["data"].shape == (0, 2)
+            for i in range(25):
+                dataset.write_value(np.ones(2) * i)
+                assert store["data"].shape[0] <= 20
+            dataset.flush_data()
+            assert store["data"].shape == (25, 2)
+            assert store["data"].maxshape == (None, 2)
+
+            # Write fewer rows than expected.
+            dataset = DatasetBuffer(store, "data2", 100, float, columns)
+            dataset.write_value(np.ones(2))
+            dataset.flush_data()
+            assert store["data2"].shape == (1, 2)
+
+        with h5py.File(filename, "r") as store:
+            assert store["data"].attrs["length"] == 25
+            assert np.array_equal(store["data"][:, 0], np.arange(25, dtype=float))
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+def test_dataset_buffer__write_value_async():
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            columns = ("1", "2", "3", "4")
+            max_size = 5000
+            writer = AsyncHdfWriter(max_queue_size=1)
+            datasets = [
+                DatasetBuffer(store, f"data{i}", max_size, float, columns,
+                              max_chunk_bytes=16 * 1024, writer=writer)
+                for i in range(3)
+            ]
+            for i in range(max_size):
+                for dataset in datasets:
+                    dataset.write_value(np.ones(4) * i)
+            for dataset in datasets:
+                dataset.flush_data()
+                assert dataset._buf_index == 0
+            writer.close()
+
+        with h5py.File(filename, "r") as store:
+            for i in range(3):
+                data = store[f"data{i}"][:]
+                assert store[f"data{i}"].attrs["length"] == max_size
+                assert np.array_equal(data[:, 0], np.arange(max_size, dtype=float))
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+def test_dataset_buffer__compression():
+    assert make_compression_kwargs(HdfCompression.NONE) == {}
+    assert make_compression_kwargs(HdfCompression.GZIP, level=9, shuffle=False) == \
+        {"compression": "gzip", "compression_opts": 9, "shuffle": False}
+    with pytest.raises(InvalidConfiguration):
+        make_compression_kwargs(HdfCompression.GZIP, level=10)
+
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            columns = ("1", "2")
+            dataset = DatasetBuffer(
+                store, "data1", 10, float, columns,
+                compression=HdfCompressionModel(codec=HdfCompression.LZF),
+                metadata_compression=HdfCompressionModel(codec=HdfCompression.GZIP, level=1),
+            )
+            dataset.write_value(np.ones(2))
+            dataset.flush_data()
+            dataset = DatasetBuffer(
+                store, "data2", 10, float, columns,
+                compression=HdfCompressionModel(codec=HdfCompression.NONE),
+            )
+
+        with h5py.File(filename, "r") as store:
+            assert store["data1"].compression == "lzf"
+            assert store["data1Columns"].compression == "gzip"
+            assert store["data2"].compression is None
+            assert store["data2Columns"].compression is None
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+def test_dataset_buffer__row_range():
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            dataset = DatasetBuffer(store, "data", 100, float, ("1",), max_chunk_bytes=80)
+            for i in range(50):
+                dataset.write_value([i * 2.0])
+            dataset.flush_data()
+
+        with h5py.File(filename, "r") as store:
+            dataset = store["data"]
+            assert DatasetBuffer.search_sorted(dataset, 10.0) == 5
+            assert DatasetBuffer.search_sorted(dataset, 10.0, side="right") == 6
+            assert DatasetBuffer.search_sorted(dataset, 11.0) == 6
+            assert DatasetBuffer.search_sorted(dataset, -1.0) == 0
+            assert DatasetBuffer.search_sorted(dataset, 1000.0) == 50
+            df = DatasetBuffer.to_dataframe(dataset, row_range=(5, 8))
+            assert list(df["1"].values) == [10.0, 12.0, 14.0]
+            df = DatasetBuffer.to_dataframe(dataset, row_range=(48, 60))
+            assert list(df["1"].values) == [96.0, 98.0]
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
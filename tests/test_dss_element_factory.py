@@ -0,0 +1,30 @@
+import opendssdirect as dss
+import pytest
+
+from PyDSS.dssElementFactory import LazyObjectDict, create_dss_element_by_name
+from tests.common import circuit
+
+
+def test_lazy_object_dict(circuit):
+    names = dss.Circuit.AllElementNames()
+    objects = LazyObjectDict(names, lambda x: create_dss_element_by_name(x, dss))
+    assert list(objects) == names
+    assert len(objects) == len(names)
+    assert not list(objects.iter_created())
+
+    load_name = next(x for x in names if x.startswith("Load."))
+    load = objects[load_name]
+    assert load.FullName == load_name
+    assert objects[load_name] is load
+    assert list(objects.iter_created()) == [load]
+    with pytest.raises(KeyError):
+        objects["Load.invalid"]
+
+
+def test_shared_tables(circuit):
+    names = [x for x in dss.Circuit.AllElementNames() if x.startswith("Load.")][:2]
+    objects = LazyObjectDict(names, lambda x: create_dss_element_by_name(x, dss))
+    load1, load2 = objects.values()
+    assert load1._Parameters is load2._Parameters
+    assert load1._Variables is load2._Variables
+    assert load1.sBus[0].Name == load1.Bus[0].split(".")[0]
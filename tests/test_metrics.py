@@ -12,11 +12,13 @@ import pytest
 
 from PyDSS.common import LimitsFilter
 from PyDSS.dataset_buffer import DatasetBuffer
+from PyDSS.exceptions import InvalidConfiguration
 from PyDSS.export_list_reader import ExportListProperty
 from PyDSS.metrics import MultiValueTypeMetricBase
 from PyDSS.simulation_input_models import (
     SimulationSettingsModel, create_simulation_settings, load_simulation_settings
 )
+from PyDSS.storage_filters import StorageOnChange
 from PyDSS.value_storage import ValueByNumber, ValueByList
 from PyDSS.utils.utils import load_data
 from tests.common import FakeElement
@@ -110,6 +112,33 @@ def test_metrics_store_all(simulation_settings):
         assert metric.max_num_bytes() == len(values) * len(OBJS) * 8 
 
 
+def test_metrics_store_all_sample_interval(simulation_settings):
+    data = {
+        "property": "Property",
+        "store_values_type": "all",
+        "sample_interval": 2,
+    }
+    values = FLOATS
+    prop = ExportListProperty("Fake", data)
+    assert prop.get_max_size(len(values)) == 3
+    metric = FakeMetric(prop, OBJS, simulation_settings, values)
+    with h5py.File(STORE_FILENAME, mode="w", driver="core") as hdf_store:
+        metric.initialize_data_store(hdf_store, "", len(values))
+        for i in range(len(values)):
+            if metric.should_sample_value(i):
+                metric.append_values(i)
+        metric.close()
+
+        dataset = hdf_store["Fake/ElementProperties/Property"]
+        assert dataset.attrs["length"] == 3
+        assert dataset.attrs["sample_interval"] == 2
+        df = DatasetBuffer.to_dataframe(dataset)
+        # The skipped steps are never acquired, so the fake values advance
+        # once per sample.
+        for column in df.columns:
+            assert list(df[column].values) == list(values[:3])
+
+
 def test_metrics_store_all_complex_abs(simulation_settings):
     data = {
         "property": "Property",
@@ -217,6 +246,48 @@ def test_metrics_store_all_filtered(simulation_settings):
         assert [x for x in time_step_dataset[3]] == [4, 1]
 
 
+def test_metrics_store_on_change(simulation_settings):
+    data = {
+        "property": "Property",
+        "store_values_type": "on_change",
+    }
+    values = (1.0, 1.0, 2.0, 2.0, 3.0)
+    prop = ExportListProperty("Fake", data)
+    metric = FakeMetric(prop, OBJS, simulation_settings, values)
+    with h5py.File(STORE_FILENAME, mode="w", driver="core") as hdf_store:
+        metric.initialize_data_store(hdf_store, "", len(values))
+        for i in range(len(values)):
+            metric.append_values(i)
+        metric.close()
+
+        dataset = hdf_store["Fake/ElementProperties/Property"]
+        assert dataset.attrs["type"] == "on_change"
+        assert dataset.attrs["length"] == 3 * len(OBJS)
+        assert [x for x in dataset[:6, 0]] == [1, 1, 2, 2, 3, 3]
+        time_step_dataset = hdf_store["Fake/ElementProperties/PropertyTimeStep"]
+        assert time_step_dataset.attrs["length"] == 6
+        assert [list(x) for x in time_step_dataset[:6]] == \
+            [[0, 0], [0, 1], [2, 0], [2, 1], [4, 0], [4, 1]]
+
+
+def test_metrics_store_on_change_non_uniform(simulation_settings):
+    data = {
+        "property": "Property",
+        "store_values_type": "on_change",
+    }
+    prop = ExportListProperty("Fake", data)
+    values = [
+        ValueByList("Fake.a", "Property", [1.0, 2.0], ["A1", "B1"]),
+        ValueByList("Fake.b", "Property", [1.0], ["A1"]),
+    ]
+    with h5py.File(STORE_FILENAME, mode="w", driver="core") as hdf_store:
+        with pytest.raises(InvalidConfiguration, match="same number of values"):
+            StorageOnChange(
+                hdf_store, "Fake/ElementProperties/Property", prop, 5, None, values,
+                [x.FullName for x in OBJS],
+            )
+
+
 def test_metrics_store_moving_average_and_max(simulation_settings):
     window_size = 10
     values = [float(i) for i in range(50)] + [float(i) for i in range(25)]
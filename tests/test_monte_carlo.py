@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+
+from PyDSS.dssInstance import OpenDSS
+from PyDSS.Extensions.MonteCarlo import make_sample_random_state
+from PyDSS.pydss_fs_interface import STORE_FILENAME
+from PyDSS.pydss_project import PyDssProject
+from PyDSS.utils.utils import dump_data, load_data
+from tests.common import (
+    assert_datasets_equal, create_monte_carlo_project, read_store_datasets,
+)
+
+
+NUM_SAMPLES = 3
+
+
+def test_make_sample_random_state():
+    values = [make_sample_random_state(42, i).uniform(size=3) for i in range(3)]
+    assert not np.array_equal(values[0], values[1])
+    assert not np.array_equal(values[1], values[2])
+
+    # A sample draws the same values regardless of the samples before it.
+    for i in reversed(range(3)):
+        assert np.array_equal(make_sample_random_state(42, i).uniform(size=3), values[i])
+    assert not np.array_equal(make_sample_random_state(43, 0).uniform(size=3), values[0])
+
+
+def test_monte_carlo_parallel(tmp_path):
+    project_dir = create_monte_carlo_project(tmp_path, ["s1"], num_samples=NUM_SAMPLES)
+    PyDssProject.run_project(project_dir, simulation_file="simulation.toml")
+    serial = read_store_datasets(os.path.join(project_dir, STORE_FILENAME))
+    PyDssProject.run_project(project_dir, simulation_file="simulation.toml", parallel=2)
+    parallel = read_store_datasets(os.path.join(project_dir, STORE_FILENAME))
+
+    groups = {x.split("/")[0] for x in serial}
+    assert groups == {f"s1_MC{i}" for i in range(NUM_SAMPLES)}
+    assert_datasets_equal(serial, parallel)
+
+
+def test_monte_carlo_compiles_once(tmp_path, monkeypatch):
+    project_dir = create_monte_carlo_project(tmp_path, ["s1"], num_samples=NUM_SAMPLES)
+    compilations = []
+    compile_model = OpenDSS._CompileModel
+
+    def count_compilations(self):
+        compilations.append(self)
+        compile_model(self)
+
+    monkeypatch.setattr(OpenDSS, "_CompileModel", count_compilations)
+    PyDssProject.run_project(project_dir, simulation_file="simulation.toml")
+    assert len(compilations) == 1
+    assert compilations[0].can_restore_circuit
+
+
+def test_monte_carlo_in_memory_metrics(tmp_path):
+    project_dir = create_monte_carlo_project(tmp_path, ["s1"], num_samples=2)
+    filename = os.path.join(project_dir, "simulation.toml")
+    data = load_data(filename)
+    data["Project"]["Reuse compiled circuit"] = True
+    data["Reports"] = {
+        "Format": "h5",
+        "Granularity": "per_element_per_time_point",
+        "Types": [
+            {
+                "name": "Voltage Metrics",
+                "enabled": True,
+                "window_size_minutes": 60,
+                "store_per_element_data": False,
+            },
+        ],
+    }
+    dump_data(data, filename)
+    PyDssProject.run_project(project_dir, simulation_file="simulation.toml")
+
+    # Each sample reports its own time points instead of accumulating them
+    # across samples.
+    report = load_data(os.path.join(project_dir, "Reports", "voltage_metrics.json"))
+    assert sorted(report["scenarios"]) == ["s1_MC0", "s1_MC1"]
+    num_time_points = [
+        x["primaries"]["summary"]["total_num_time_points"]
+        for x in report["scenarios"].values()
+    ]
+    assert num_time_points[0] > 0
+    assert num_time_points[0] == num_time_points[1]
@@ -0,0 +1,46 @@
+import opendssdirect as dss
+import pytest
+
+from PyDSS.active_object import invalidate_active_objects
+from PyDSS.dssElementFactory import create_dss_element_by_name
+from PyDSS.parameter_cache import invalidate_all, invalidate_solution_parameters
+from tests.common import circuit
+
+
+@pytest.fixture
+def load(circuit):
+    name = next(x for x in dss.Circuit.AllElementNames() if x.startswith("Load."))
+    yield create_dss_element_by_name(name, dss)
+
+
+def _edit(load, param, value):
+    # Edit the element the way code outside of PyDSS does.
+    dss.run_command(f"{load.FullName}.{param}={value}")
+    invalidate_active_objects()
+
+
+def test_parameter_cache_static(load):
+    kv = load.GetParameter("kv")
+    _edit(load, "kv", kv * 2)
+    assert load.GetParameter("kV") == kv
+    invalidate_solution_parameters()
+    assert load.GetParameter("kv") == kv
+    invalidate_all()
+    assert load.GetParameter("kv") == kv * 2
+
+
+def test_parameter_cache_solution(load):
+    kw = load.GetParameter("kW")
+    _edit(load, "kW", kw * 2)
+    assert load.GetParameter("kW") == kw
+    invalidate_solution_parameters()
+    assert load.GetParameter("kW") == kw * 2
+
+
+def test_parameter_cache_set_parameter(load):
+    kw = load.GetParameter("kW")
+    kvar = load.GetParameter("kvar")
+    assert load.SetParameter("kW", kw * 2) == kw * 2
+    assert load.GetParameter("kw") == kw * 2
+    # Changing kW at a constant power factor changes kvar.
+    assert load.GetParameter("kvar") == pytest.approx(kvar * 2)
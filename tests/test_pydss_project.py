@@ -1,19 +1,24 @@
 
 import datetime
+import logging
 import os
 import re
 import shutil
 import tempfile
 
+import h5py
 import pandas as pd
 import pytest
 
 from PyDSS.common import PROJECT_TAR, PROJECT_ZIP
+from PyDSS.dataset_buffer import DatasetBuffer
 from PyDSS.exceptions import InvalidParameter
 from PyDSS.pydss_fs_interface import PROJECT_DIRECTORIES, SCENARIOS, STORE_FILENAME
-from PyDSS.pydss_project import PyDssProject, PyDssScenario, DATA_FORMAT_VERSION
+from PyDSS.pydss_project import PyDssProject, PyDssScenario, DATA_FORMAT_VERSION, \
+    merge_scenario_store, _run_jobs_in_processes
 from PyDSS.pydss_results import PyDssResults, PyDssScenarioResults
-from tests.common import RUN_PROJECT_PATH, SCENARIO_NAME, cleanup_project
+from tests.common import RUN_PROJECT_PATH, SCENARIO_NAME, cleanup_project, \
+    assert_datasets_equal, create_monte_carlo_project, read_store_datasets
 from PyDSS.common import SIMULATION_SETTINGS_FILENAME
 
 
@@ -185,3 +190,103 @@ def run_test_project_by_property(tar_project, zip_project):
     assert isinstance(df, pd.DataFrame)
 
     cap_changes = scenario.read_capacitor_changes()
+
+
+def test_merge_scenario_store():
+    filenames = [os.path.join(tempfile.gettempdir(), f"store{i}.h5") for i in range(4)]
+    try:
+        for i, name in enumerate(("scenario1", "scenario2")):
+            with h5py.File(filenames[i], "w") as store:
+                dataset = DatasetBuffer(store, f"Exports/{name}/Timestamp", 10, float, ["Timestamp"])
+                for j in range(10):
+                    dataset.write_value([j * i])
+                dataset.flush_data()
+
+        with h5py.File(filenames[2], "w") as store:
+            for filename in filenames[:2]:
+                merge_scenario_store(filename, store)
+            # Merging again replaces the scenario.
+            merge_scenario_store(filenames[1], store)
+
+        with h5py.File(filenames[2], "r") as store:
+            assert sorted(store["Exports"]) == ["scenario1", "scenario2"]
+            dataset = store["Exports/scenario2/Timestamp"]
+            assert dataset.attrs["length"] == 10
+            assert list(dataset[:, 0]) == [float(x) for x in range(10)]
+            assert DatasetBuffer.get_columns(dataset) == ["Timestamp"]
+
+        with h5py.File(filenames[3], "w") as store:
+            for filename in filenames[:2]:
+                merge_scenario_store(filename, store, names={"scenario2"})
+            assert list(store["Exports"]) == ["scenario2"]
+    finally:
+        for filename in filenames:
+            if os.path.exists(filename):
+                os.remove(filename)
+
+
+def test_run_scenarios_in_parallel(tmp_path):
+    project_dir = create_monte_carlo_project(tmp_path, ["s1", "s2"])
+    store_filename = os.path.join(project_dir, STORE_FILENAME)
+    PyDssProject.run_project(project_dir, simulation_file="simulation.toml")
+    serial = read_store_datasets(store_filename)
+    PyDssProject.run_project(project_dir, simulation_file="simulation.toml", parallel=2)
+    parallel = read_store_datasets(store_filename)
+
+    assert {x.split("/")[0] for x in serial} == {"s1", "s2"}
+    assert_datasets_equal(serial, parallel)
+    results = PyDssResults(project_dir)
+    assert [x.name for x in results.scenarios] == ["s1", "s2"]
+
+
+def test_run_scenarios_in_parallel_error(tmp_path):
+    project_dir = create_monte_carlo_project(tmp_path, ["s1", "s2"])
+    # The worker process of s2 fails when it creates its exports.
+    filename = os.path.join(
+        project_dir, "Scenarios", "s2", "ExportLists", "ExportMode-byClass.toml"
+    )
+    with open(filename) as f_in:
+        text = f_in.read()
+    with open(filename, "w") as f_out:
+        f_out.write(text.replace('Publish = [ "Powers",]', 'Publish = [ "NotAProperty",]', 1))
+
+    with pytest.raises(InvalidParameter, match="NotAProperty"):
+        PyDssProject.run_project(project_dir, simulation_file="simulation.toml", parallel=2)
+
+    with h5py.File(os.path.join(project_dir, STORE_FILENAME), "r") as store:
+        assert list(store["Exports"]) == ["s1"]
+
+
+def _log_from_worker(message):
+    logging.getLogger("PyDSS.test").info(message)
+    return os.getpid()
+
+
+class _RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+
+    def emit(self, record):
+        self.records.append(record)
+
+
+def test_run_jobs_in_processes_logging():
+    pydss_logger = logging.getLogger("PyDSS")
+    orig_level = pydss_logger.level
+    handler = _RecordingHandler()
+    pydss_logger.addHandler(handler)
+    pydss_logger.setLevel(logging.INFO)
+    try:
+        jobs = {x: (_log_from_worker, (f"message {x}",)) for x in range(2)}
+        completed, error = _run_jobs_in_processes(jobs, 2)
+    finally:
+        pydss_logger.removeHandler(handler)
+        pydss_logger.setLevel(orig_level)
+
+    assert error is None
+    assert sorted(completed) == [0, 1]
+    assert all(x != os.getpid() for x in completed.values())
+    records = {x.getMessage(): x for x in handler.records}
+    for key, pid in completed.items():
+        assert records[f"message {key}"].process == pid
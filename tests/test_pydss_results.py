@@ -0,0 +1,425 @@
+import datetime
+import os
+import shutil
+import sys
+from collections import defaultdict
+
+import h5py
+import numpy as np
+import pandas as pd
+import pytest
+
+from PyDSS.dataset_buffer import DatasetBuffer
+from PyDSS.exceptions import InvalidConfiguration
+from PyDSS.pydss_fs_interface import STORE_FILENAME
+from PyDSS.pydss_project import PyDssProject
+from PyDSS.pydss_results import (
+    PyDssResults, _make_column_runs, _make_element_array, _split_column_label,
+)
+from PyDSS.utils.utils import dump_data
+from tests.common import create_monte_carlo_project
+
+
+SCENARIO = "scenario_1"
+
+# Lines store normamps only if it is within the limits, which selects
+# elements that are not contiguous.
+EXPORTS = {
+    "Loads": [
+        {"property": "Powers", "store_values_type": "all"},
+    ],
+    "Buses": [
+        {"property": "puVmagAngle", "store_values_type": "all"},
+    ],
+    "Storages": [
+        {"property": "%stored", "store_values_type": "on_change"},
+    ],
+    "Lines": [
+        {
+            "property": "normamps",
+            "store_values_type": "all",
+            "limits": [100.0, 300.0],
+            "limits_filter": "inside",
+        },
+    ],
+}
+
+
+@pytest.fixture(scope="module")
+def results_project(tmp_path_factory):
+    path = tmp_path_factory.mktemp("results")
+    project_dir = create_monte_carlo_project(path, [SCENARIO], duration_min=120.0)
+    dump_data(
+        EXPORTS,
+        os.path.join(project_dir, "Scenarios", SCENARIO, "ExportLists", "Exports.toml"),
+    )
+    PyDssProject.run_project(project_dir, simulation_file="simulation.toml")
+    yield project_dir
+
+
+@pytest.fixture(scope="module")
+def scenario_results(results_project):
+    yield PyDssResults(results_project).get_scenario(SCENARIO)
+
+
+def test_make_element_array_uniform():
+    columns = [
+        ["Line.one__A1__mag [Amps]", "Line.one__A1__ang [Deg]",
+         "Line.one__B1__mag [Amps]", "Line.one__B1__ang [Deg]"],
+        ["Line.two__A1__mag [Amps]", "Line.two__A1__ang [Deg]",
+         "Line.two__B1__mag [Amps]", "Line.two__B1__ang [Deg]"],
+    ]
+    data = np.arange(24, dtype=float).reshape(3, 8)
+    array, terminals, components = _make_element_array(data, columns, [0, 4])
+    assert array.shape == (3, 2, 2, 2)
+    assert terminals == ["A1", "B1"]
+    assert components == ["mag [Amps]", "ang [Deg]"]
+    # The array is a view of the data.
+    assert np.shares_memory(array, data)
+    assert array[1, 1, 1, 0] == data[1, 6]
+
+
+def test_make_element_array_non_uniform():
+    columns = [
+        ["Line.one__A1 [Amps]", "Line.one__B1 [Amps]"],
+        ["Line.two__B1 [Amps]"],
+    ]
+    data = np.array([[1 + 1j, 2 + 2j, 3 + 3j]])
+    array, terminals, components = _make_element_array(data, columns, [0, 2])
+    assert array.shape == (1, 2, 2, 1)
+    assert terminals == ["A1 [Amps]", "B1 [Amps]"]
+    assert components == [""]
+    assert array[0, 0, :, 0].tolist() == [1 + 1j, 2 + 2j]
+    assert np.isnan(array[0, 1, 0, 0])
+    assert array[0, 1, 1, 0] == 3 + 3j
+
+
+def test_time_step_range(scenario_results):
+    func = scenario_results._get_time_step_range
+    assert func() is None
+    assert func(start_time="2020-01-01 00:15", end_time="2020-01-01 00:45") == (1, 4)
+    # Times between the time steps
+    assert func(start_time="2020-01-01 00:10", end_time="2020-01-01 00:50") == (1, 4)
+    assert func(start_time="2020-01-01 01:00") == (4, 8)
+    assert func(end_time="2020-01-01 00:00") == (0, 1)
+    assert func(start_time="2020-01-01 01:00", end_time="2020-01-01 00:30") == (4, 4)
+    assert func(start_time=datetime.datetime(2020, 1, 1, 0, 15)) == (1, 8)
+    # The store's times have no timezone and compare like UTC times.
+    assert func(start_time="2020-01-01 00:15+00:00") == (1, 8)
+    assert func(start_time="2020-01-01 01:15+01:00") == (1, 8)
+    assert func(
+        start_time=pd.Timestamp("2019-12-31 19:15", tz="US/Eastern"),
+        end_time=datetime.datetime(2020, 1, 1, 0, 45, tzinfo=datetime.timezone.utc),
+    ) == (1, 4)
+
+
+def test_get_dataframe_time_range(scenario_results):
+    start_time = "2020-01-01 00:15"
+    end_time = "2020-01-01 00:45"
+    stored_lines = scenario_results.get_filtered_dataframes("Lines", "normamps")
+    for element_class, prop, name in (
+        ("Loads", "Powers", scenario_results.list_element_names("Loads", "Powers")[0]),
+        ("Lines", "normamps", next(iter(stored_lines))),
+    ):
+        full = scenario_results.get_dataframe(element_class, prop, name)
+        expected = full.loc[start_time:end_time]
+        assert len(expected) == 3
+        for kwargs in (
+            {"start_time": start_time, "end_time": end_time},
+            {"start_time": "2020-01-01 01:15+01:00", "end_time": "2020-01-01 00:45+00:00"},
+        ):
+            df = scenario_results.get_dataframe(element_class, prop, name, **kwargs)
+            pd.testing.assert_frame_equal(df, expected, check_freq=False)
+
+        df = scenario_results.get_dataframe(
+            element_class, prop, name, start_time="2020-01-01 01:00", end_time=start_time,
+        )
+        assert df.empty
+
+
+def test_row_range(scenario_results):
+    group = scenario_results._group
+    dataset = group["Loads/ElementProperties/Powers"]
+    assert scenario_results._get_row_range(dataset, None) is None
+    assert scenario_results._get_row_range(dataset, (1, 4)) == (1, 4)
+
+    # Rows of a filtered dataset are stored in time step order with one row
+    # per stored element value.
+    dataset = group["Lines/ElementProperties/normamps"]
+    num_elements = len(scenario_results.get_filtered_dataframes("Lines", "normamps"))
+    assert scenario_results._get_row_range(dataset, (1, 4)) == (
+        num_elements, 4 * num_elements
+    )
+    assert scenario_results._get_row_range(dataset, (0, 8)) == (0, 8 * num_elements)
+
+
+def _check_get_dataframes(scenario_results, element_class, prop, names, **kwargs):
+    dfs = scenario_results.get_dataframes(element_class, prop, names=names, **kwargs)
+    assert list(dfs) == names
+    for name in names:
+        expected = scenario_results.get_dataframe(element_class, prop, name, **kwargs)
+        pd.testing.assert_frame_equal(dfs[name], expected, check_freq=False)
+
+
+@pytest.mark.parametrize(
+    "element_class, prop",
+    [
+        ("Loads", "Powers"),
+        ("Buses", "puVmagAngle"),
+        ("Storages", "%stored"),
+        ("Lines", "normamps"),
+    ],
+)
+def test_get_dataframes(scenario_results, element_class, prop):
+    all_names = scenario_results.list_element_names(element_class, prop)
+    assert len(all_names) > 2
+    # Non-contiguous names in an order that differs from the store
+    names = all_names[::2][::-1]
+    for kwargs in (
+        {},
+        {"real_only": True},
+        {"start_time": "2020-01-01 00:15", "end_time": "2020-01-01 01:00"},
+    ):
+        _check_get_dataframes(scenario_results, element_class, prop, names, **kwargs)
+
+    dfs = scenario_results.get_dataframes(element_class, prop)
+    assert sorted(dfs) == sorted(all_names)
+
+
+def test_make_column_runs():
+    runs, offsets = _make_column_runs([(6, 2), (0, 2), (2, 1), (10, 3), (6, 2), (7, 2)])
+    assert runs == [(0, 3), (6, 3), (10, 3)]
+    assert offsets == [3, 0, 2, 6, 3, 4]
+    assert _make_column_runs([]) == ([], [])
+
+
+def test_get_dataframes_reads_selected_columns(scenario_results, monkeypatch):
+    path = "Buses/ElementProperties/puVmagAngle"
+    names = scenario_results.list_element_names("Buses", "puVmagAngle")[::2]
+    num_columns = sum(
+        scenario_results._get_element_column_range("Buses", "puVmagAngle", x)[1] for x in names
+    )
+    read = DatasetBuffer.read
+    columns_read = []
+
+    def read_columns(dataset, rows, columns=None, cache=None):
+        if dataset.name.endswith(path):
+            columns_read.append(columns)
+        return read(dataset, rows, columns=columns, cache=cache)
+
+    monkeypatch.setattr(DatasetBuffer, "read", staticmethod(read_columns))
+    dfs = scenario_results.get_dataframes("Buses", "puVmagAngle", names=names)
+    assert sum(len(x.columns) for x in dfs.values()) == num_columns
+    # Adjacent elements are read together, and no other columns are read.
+    assert 1 < len(columns_read) <= len(names)
+    assert sum(x.stop - x.start for x in columns_read) == num_columns
+
+
+def test_get_filtered_dataframes_by_names(scenario_results):
+    dataset = scenario_results._group["Lines/ElementProperties/normamps"]
+    stored = scenario_results.get_filtered_dataframes("Lines", "normamps")
+    stored_names = list(stored)
+    names = stored_names[1::2]
+    dfs = scenario_results._get_filtered_dataframes(dataset, names=names)
+    assert sorted(dfs) == sorted(names)
+    for name in names:
+        pd.testing.assert_frame_equal(dfs[name], stored[name])
+
+    # Requested names without stored values have empty dataframes.
+    not_stored = [
+        x for x in scenario_results.list_element_names("Lines", "normamps")
+        if x not in stored
+    ]
+    assert not_stored
+    names = [not_stored[0], stored_names[0]]
+    dfs = scenario_results._get_filtered_dataframes(dataset, names=names)
+    assert list(dfs) == names
+    assert dfs[not_stored[0]].empty
+    pd.testing.assert_frame_equal(
+        dfs[not_stored[0]],
+        scenario_results.get_dataframe("Lines", "normamps", not_stored[0]),
+    )
+    pd.testing.assert_frame_equal(dfs[stored_names[0]], stored[stored_names[0]])
+
+
+def _interleave_filtered_data(store_filename, scenario, path, seed=7):
+    """Rewrite a filtered dataset so that elements store values at irregular
+    time steps. Rows stay in time step order."""
+    with h5py.File(store_filename, "r+") as store:
+        dataset = store[f"Exports/{scenario}/{path}"]
+        time_step_dataset = store[dataset.attrs["time_step_path"]]
+        length = dataset.attrs["length"]
+        num_names = len(DatasetBuffer.get_names(dataset))
+        num_steps = store[f"Exports/{scenario}/Timestamp"].attrs["length"]
+        rng = np.random.default_rng(seed)
+        pairs = rng.choice(num_steps * num_names, size=length, replace=False)
+        time_steps = pairs // num_names
+        elem_indices = pairs % num_names
+        # Sort by time step and shuffle the elements within each time step.
+        order = np.lexsort((rng.random(length), time_steps))
+        time_step_dataset[:length, 0] = time_steps[order]
+        time_step_dataset[:length, 1] = elem_indices[order]
+        dataset[:length, 0] = rng.random(length) * 100
+
+
+def _read_filtered_data_by_row(scenario_results, element_class, prop):
+    """Read a filtered dataset one row at a time."""
+    dataset = scenario_results._group[f"{element_class}/ElementProperties/{prop}"]
+    names = DatasetBuffer.get_names(dataset)
+    length = dataset.attrs["length"]
+    data_vals = dataset[:length]
+    time_step_data = scenario_results._hdf_store[dataset.attrs["time_step_path"]][:length]
+    timestamps = scenario_results._get_indices_df()["Timestamp"]
+    values = defaultdict(list)
+    index = defaultdict(list)
+    for i in range(length):
+        name = names[time_step_data[i, 1]]
+        values[name].append(data_vals[i, 0])
+        index[name].append(timestamps.iloc[time_step_data[i, 0]])
+    return {x: pd.Series(values[x], index=pd.DatetimeIndex(index[x])) for x in values}
+
+
+def test_read_interleaved_filtered_data(results_project, tmp_path):
+    project_dir = os.path.join(tmp_path, "project")
+    shutil.copytree(results_project, project_dir)
+    _interleave_filtered_data(
+        os.path.join(project_dir, STORE_FILENAME),
+        SCENARIO,
+        "Lines/ElementProperties/normamps",
+    )
+    results = PyDssResults(project_dir).get_scenario(SCENARIO)
+    expected = _read_filtered_data_by_row(results, "Lines", "normamps")
+    # Elements store different numbers of values.
+    assert len({len(x) for x in expected.values()}) > 1
+
+    dfs = results.get_filtered_dataframes("Lines", "normamps")
+    assert sorted(dfs) == sorted(expected)
+    start_time = "2020-01-01 00:30"
+    end_time = "2020-01-01 01:15"
+    ranged_dfs = results.get_dataframes(
+        "Lines", "normamps", names=list(expected), start_time=start_time, end_time=end_time,
+    )
+    for name, series in expected.items():
+        assert np.array_equal(dfs[name].iloc[:, 0].values, series.values)
+        assert np.array_equal(dfs[name].index.values, series.index.values)
+        df = results.get_dataframe("Lines", "normamps", name)
+        pd.testing.assert_frame_equal(df, dfs[name])
+        expected_range = series.loc[start_time:end_time]
+        assert np.array_equal(ranged_dfs[name].iloc[:, 0].values, expected_range.values)
+        assert np.array_equal(ranged_dfs[name].index.values, expected_range.index.values)
+
+
+def test_read_on_change_without_checked_columns(results_project, tmp_path):
+    project_dir = os.path.join(tmp_path, "project")
+    shutil.copytree(results_project, project_dir)
+    # Stores written before PyDSS checked the number of values of each
+    # element do not have the attribute.
+    with h5py.File(os.path.join(project_dir, STORE_FILENAME), "a") as store:
+        dataset = store[f"Exports/{SCENARIO}/Storages/ElementProperties/%stored"]
+        del dataset.attrs["num_columns_per_element"]
+
+    results = PyDssResults(project_dir).get_scenario(SCENARIO)
+    name = results.list_element_names("Storages", "%stored")[0]
+    with pytest.raises(InvalidConfiguration, match="different numbers of values"):
+        results.get_dataframe("Storages", "%stored", name)
+
+
+def test_split_column_label(scenario_results):
+    cases = (
+        ("Loads", "Powers", ("A1 [kVA]", "")),
+        ("Buses", "puVmagAngle", ("A1", "mag [pu]")),
+        ("Storages", "%stored", ("%stored", "")),
+    )
+    for element_class, prop, expected in cases:
+        name = scenario_results.list_element_names(element_class, prop)[0]
+        columns = scenario_results.get_dataframe(element_class, prop, name).columns
+        assert _split_column_label(columns[0]) == expected
+    assert _split_column_label("Line.one__A1__mag [Amps]") == ("A1", "mag [Amps]")
+    assert _split_column_label("Line.one__A1 [Amps]") == ("A1 [Amps]", "")
+
+
+def _check_numpy_array(scenario_results, element_class, prop, names, **kwargs):
+    array, coords = scenario_results.get_numpy_array(
+        element_class, prop, names=names, **kwargs
+    )
+    assert array.shape == tuple(
+        len(coords[x]) for x in ("time", "element", "terminal", "component")
+    )
+    assert coords["element"] == names
+    is_set = np.zeros(array.shape, dtype=bool)
+    for i, name in enumerate(names):
+        df = scenario_results.get_dataframe(element_class, prop, name, **kwargs)
+        # Filtered datasets only store some time points.
+        df = df.reindex(pd.DatetimeIndex(coords["time"]))
+        for column in df.columns:
+            terminal, component = _split_column_label(column)
+            j = coords["terminal"].index(terminal)
+            k = coords["component"].index(component)
+            assert np.allclose(array[:, i, j, k], df[column].values, equal_nan=True), column
+            is_set[:, i, j, k] = True
+    # Values that an element does not have are NaN.
+    assert np.isnan(array[~is_set]).all()
+    return array, coords
+
+
+@pytest.mark.parametrize(
+    "element_class, prop",
+    [
+        ("Loads", "Powers"),
+        ("Buses", "puVmagAngle"),
+        ("Storages", "%stored"),
+        ("Lines", "normamps"),
+    ],
+)
+def test_get_numpy_array(scenario_results, element_class, prop):
+    names = scenario_results.list_element_names(element_class, prop)[::2][::-1]
+    for kwargs in (
+        {},
+        {"start_time": "2020-01-01 00:15", "end_time": "2020-01-01 01:00"},
+    ):
+        array, coords = _check_numpy_array(
+            scenario_results, element_class, prop, names, **kwargs
+        )
+    assert len(coords["time"]) == 4
+
+
+def test_get_numpy_array_complex(scenario_results):
+    names = scenario_results.list_element_names("Loads", "Powers")
+    array, coords = _check_numpy_array(scenario_results, "Loads", "Powers", names)
+    assert np.iscomplexobj(array)
+    assert coords["terminal"] == ["A1 [kVA]", "N1 [kVA]"]
+    assert coords["component"] == [""]
+    real, _ = _check_numpy_array(
+        scenario_results, "Loads", "Powers", names, real_only=True
+    )
+    assert np.array_equal(real, array.real, equal_nan=True)
+    abs_val, _ = _check_numpy_array(
+        scenario_results, "Loads", "Powers", names, abs_val=True
+    )
+    assert np.allclose(abs_val, np.abs(array), equal_nan=True)
+
+    _, coords = scenario_results.get_numpy_array("Buses", "puVmagAngle")
+    assert coords["terminal"] == ["A1", "B1", "C1"]
+    assert coords["component"] == ["mag [pu]", "ang [Deg]"]
+
+
+def test_get_xarray(scenario_results):
+    pytest.importorskip("xarray")
+    names = scenario_results.list_element_names("Buses", "puVmagAngle")[:3]
+    array, coords = scenario_results.get_numpy_array("Buses", "puVmagAngle", names=names)
+    data_array = scenario_results.get_xarray("Buses", "puVmagAngle", names=names)
+    assert data_array.name == "puVmagAngle"
+    assert data_array.dims == ("time", "element", "terminal", "component")
+    assert np.array_equal(data_array.values, array)
+    for dim, values in coords.items():
+        assert list(data_array.coords[dim].values) == list(values)
+    mag = data_array.sel(element=names[0], terminal="A1", component="mag [pu]")
+    df = scenario_results.get_dataframe("Buses", "puVmagAngle", names[0])
+    assert np.array_equal(mag.values, df[f"{names[0]}__A1__mag [pu]"].values)
+
+
+def test_get_xarray_not_installed(scenario_results, monkeypatch):
+    # Importing a module that is None in sys.modules raises ImportError.
+    monkeypatch.setitem(sys.modules, "xarray", None)
+    with pytest.raises(InvalidConfiguration):
+        scenario_results.get_xarray("Buses", "puVmagAngle")
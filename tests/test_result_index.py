@@ -0,0 +1,93 @@
+
+import os
+import tempfile
+
+import h5py
+import numpy as np
+
+from PyDSS.common import DatasetPropertyType
+from PyDSS.result_index import ElementClassIndex, RESULT_INDEX_DATASET, write_result_index
+from PyDSS.value_storage import ValueByNumber, ValueContainer
+
+
+def _write_datasets(store):
+    group = "Exports/scenario/Lines"
+    values = [ValueByNumber("Line.one", "NormalAmps", 1.0), ValueByNumber("Line.two", "NormalAmps", 2.0)]
+    container = ValueContainer(
+        values, store, f"{group}/ElementProperties/NormalAmps", 10,
+        ["Line.one", "Line.two"], DatasetPropertyType.PER_TIME_POINT,
+    )
+    for i in range(3):
+        container.append(values)
+    container.flush_data()
+
+    values = [ValueByNumber("Line.two", "Length", 5.0)]
+    container = ValueContainer(
+        values, store, f"{group}/ElementProperties/Length", 1,
+        ["Line.two"], DatasetPropertyType.VALUE,
+    )
+    container.append(values)
+    container.flush_data()
+
+    values = [ValueByNumber("Lines", "Losses", 3.0)]
+    container = ValueContainer(
+        values, store, f"{group}/SummedElementProperties/Losses", 1,
+        ["Lines"], DatasetPropertyType.VALUE,
+    )
+    container.append(values)
+    container.flush_data()
+
+
+def test_result_index():
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            _write_datasets(store)
+            write_result_index(store["Exports/scenario"])
+            # Rewriting the index must replace it.
+            write_result_index(store["Exports/scenario"])
+
+        with h5py.File(filename, "r") as store:
+            class_group = store["Exports/scenario/Lines"]
+            dataset = class_group[RESULT_INDEX_DATASET]
+            assert dataset.attrs["type"] == DatasetPropertyType.METADATA.value
+            expected = ElementClassIndex.from_datasets(class_group)
+            index = ElementClassIndex.load(class_group)
+            assert index.serialize() == expected.serialize()
+            assert index.element_names == {"Line.one", "Line.two"}
+            assert index.element_properties == {
+                "Line.one": ["NormalAmps"],
+                "Line.two": ["Length", "NormalAmps"],
+            }
+            assert index.get_element_indices("NormalAmps") == {"Line.one": 0, "Line.two": 1}
+            assert index.get_element_indices("Length") == {"Line.two": 0}
+            assert list(index.list_time_series_properties()) == ["NormalAmps"]
+            assert index.list_value_properties() == {"Length": ["Line.two"]}
+            assert index.list_summed_time_series_properties() == []
+            assert list(index.summed_values) == ["Losses"]
+            assert np.array_equal(
+                index.get_column_ranges("NormalAmps"),
+                expected.get_column_ranges("NormalAmps"),
+            )
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
+
+
+def test_result_index_fallback():
+    filename = os.path.join(tempfile.gettempdir(), "store.h5")
+    try:
+        with h5py.File(filename, "w") as store:
+            _write_datasets(store)
+            class_group = store["Exports/scenario/Lines"]
+            # No index
+            index = ElementClassIndex.load(class_group)
+            assert index.element_names == {"Line.one", "Line.two"}
+
+            write_result_index(store["Exports/scenario"])
+            class_group[RESULT_INDEX_DATASET].attrs["version"] = 0
+            index = ElementClassIndex.load(class_group)
+            assert index.serialize() == ElementClassIndex.from_datasets(class_group).serialize()
+    finally:
+        if os.path.exists(filename):
+            os.remove(filename)
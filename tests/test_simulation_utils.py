@@ -0,0 +1,79 @@
+import numpy as np
+
+from PyDSS.utils.simulation_utils import CircularBufferArray, CircularBufferHelper
+
+
+def test_circular_buffer_array():
+    window_sizes = [1, 2, 3]
+    helpers = [CircularBufferHelper(x) for x in window_sizes]
+    buf = CircularBufferArray(window_sizes, 3)
+    for i in range(10):
+        values = np.array([i, i * 2.0, i * 3.0])
+        buf.append(values)
+        for helper, val in zip(helpers, values):
+            helper.append(val)
+        expected = [x.average() for x in helpers]
+        np.testing.assert_allclose(buf.average(), expected)
+    assert len(buf) == 3
+
+
+def test_circular_buffer_array_uniform_complex():
+    buf = CircularBufferArray(2, 2, dtype=np.complex128)
+    buf.append(np.array([1 + 1j, 2 + 2j]))
+    assert np.isnan(buf.average()).all()
+    buf.append(np.array([3 + 3j, 4 + 4j]))
+    buf.append(np.array([5 + 5j, 6 + 6j]))
+    out = np.empty(2, dtype=np.complex128)
+    buf.average(out=out)
+    assert list(out) == [4 + 4j, 5 + 5j]
+
+
+def test_circular_buffer_array_nan_recovery():
+    buf = CircularBufferArray([2, 3], 2)
+    buf.append(np.array([np.NaN, np.NaN]))
+    for i in range(3):
+        buf.append(np.array([1.0, 1.0]))
+    # The NaN has left both windows.
+    assert list(buf.average()) == [1.0, 1.0]
+
+
+def test_circular_buffer_array_non_finite_without_resum(monkeypatch):
+    buf = CircularBufferArray([2, 3, 2], 3)
+    num_resums = []
+    monkeypatch.setattr(buf, "_resum", lambda: num_resums.append(1))
+    for i in range(20):
+        second = np.inf if i == 5 else 1.0
+        buf.append(np.array([np.NaN, second, 2.0]))
+        average = buf.average()
+        assert np.isnan(average[0])
+        if i >= 2:
+            assert np.isnan(average[1]) == (5 <= i < 8)
+            assert average[2] == 2.0
+    assert not num_resums
+    assert list(buf.average()[1:]) == [1.0, 2.0]
+
+
+def test_circular_buffer_array_resum():
+    buf = CircularBufferArray(3, 1, resum_interval=5)
+    values = [1e16, 1.0, 1.0, 1.0, 1.0, 1.0]
+    for val in values:
+        buf.append(np.array([val]))
+    assert buf.average()[0] == 1.0
+
+    # The resum counts the NaN in the window.
+    buf = CircularBufferArray([2, 3], 2, resum_interval=2)
+    for values in ([np.NaN, np.NaN], [1.0, 1.0], [1.0, 1.0]):
+        buf.append(np.array(values))
+    assert np.isnan(buf.average()[1])
+    buf.append(np.array([1.0, 1.0]))
+    assert list(buf.average()) == [1.0, 1.0]
+
+
+def test_circular_buffer_helper():
+    buf = CircularBufferHelper(2)
+    buf.append(1.0)
+    assert np.isnan(buf.average())
+    buf.append(2.0)
+    buf.append(4.0)
+    assert buf.average() == 3.0
+    assert len(buf) == 2
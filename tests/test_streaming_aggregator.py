@@ -0,0 +1,54 @@
+
+import numpy as np
+import pytest
+
+from PyDSS.exceptions import InvalidParameter
+from PyDSS.streaming_aggregator import StreamingAggregator
+
+
+def test_streaming_aggregator():
+    data = np.random.default_rng(1).random((1000, 4)) * 100
+    data[5, 1] = np.NaN
+    ops = ["count", "max", "mean", "min", "sum", "time_above_threshold", "p50", "p95"]
+    aggregator = StreamingAggregator(ops, 4, threshold=50.0, reservoir_size=1000, seed=0)
+    for i in range(0, len(data), 64):
+        aggregator.update(data[i:i + 64])
+    assert aggregator.num_rows == 1000
+
+    results = aggregator.finalize(time_step_seconds=900)
+    assert list(results["count"]) == [1000, 999, 1000, 1000]
+    np.testing.assert_allclose(results["max"], np.nanmax(data, axis=0))
+    np.testing.assert_allclose(results["min"], np.nanmin(data, axis=0))
+    np.testing.assert_allclose(results["sum"], np.nansum(data, axis=0))
+    np.testing.assert_allclose(results["mean"], np.nanmean(data, axis=0))
+    np.testing.assert_array_equal(
+        results["time_above_threshold"], (data > 50).sum(axis=0) * 900
+    )
+    # The reservoir holds every row, so the percentiles are exact.
+    np.testing.assert_allclose(results["p95"], np.nanpercentile(data, 95, axis=0))
+
+
+def test_streaming_aggregator_groups():
+    data = np.array([
+        [1.0, 5.0, 2.0],
+        [3.0, 1.0, 9.0],
+        [np.NaN, 1.0, 0.0],
+    ])
+    groups = np.array([0, 2])
+    ops = ["max", "mean", "time_above_threshold", "p50"]
+    aggregator = StreamingAggregator(ops, 3, threshold=4.0, reservoir_size=2, seed=0)
+    aggregator.update(data, groups=groups)
+    results = aggregator.finalize(groups=groups)
+    assert list(results["max"]) == [5.0, 9.0]
+    assert list(results["mean"]) == [2.2, 11 / 3]
+    assert list(results["time_above_threshold"]) == [1.0, 1.0]
+    assert not np.isnan(results["p50"]).any()
+
+
+def test_streaming_aggregator_invalid():
+    with pytest.raises(InvalidParameter):
+        StreamingAggregator(["median"], 1)
+    with pytest.raises(InvalidParameter):
+        StreamingAggregator(["p101"], 1)
+    with pytest.raises(InvalidParameter):
+        StreamingAggregator(["time_above_threshold"], 1)
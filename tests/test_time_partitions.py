@@ -0,0 +1,175 @@
+import os
+
+import shutil
+import tempfile
+from pathlib import Path
+
+import h5py
+import pytest
+
+from PyDSS.common import DatasetPropertyType
+from PyDSS.dataset_buffer import DatasetBuffer
+from PyDSS.pydss_fs_interface import STORE_FILENAME
+from PyDSS.pydss_project import PyDssProject
+from PyDSS.pydss_results import PyDssResults, PyDssScenarioResults
+from PyDSS.element_options import ElementOptions
+from PyDSS.simulation_input_models import create_simulation_settings, load_simulation_settings
+from PyDSS.time_partitions import (
+    TimeWindow, compare_window_boundaries, make_time_windows, stitch_time_windows,
+)
+from PyDSS.utils.utils import dump_data, load_data
+from tests.common import assert_datasets_equal, create_monte_carlo_project, read_store_datasets
+
+
+SCENARIO = "s1"
+
+
+@pytest.fixture
+def simulation_settings():
+    project_path = Path(tempfile.gettempdir()) / "pydss_projects"
+    if project_path.exists():
+        shutil.rmtree(project_path)
+    project_path.mkdir()
+    filename = create_simulation_settings(project_path, "test_project", [SCENARIO])
+    settings = load_simulation_settings(filename)
+    settings.project.simulation_duration_min = 10
+    settings.project.step_resolution_sec = 60
+    yield settings
+    if project_path.exists():
+        shutil.rmtree(project_path)
+
+
+def test_make_time_windows(simulation_settings):
+    windows = make_time_windows(simulation_settings, 3, 2.0)
+    assert [(x.start_step, x.num_steps, x.warm_up_steps) for x in windows] == \
+        [(0, 4, 0), (4, 4, 2), (8, 2, 2)]
+
+    # Boundaries and warm-up align with the sample interval.
+    windows = make_time_windows(simulation_settings, 4, 0.5, sample_interval=2)
+    assert [(x.start_step, x.num_steps, x.warm_up_steps) for x in windows] == \
+        [(0, 4, 0), (4, 4, 2), (8, 2, 2)]
+
+    start_time = simulation_settings.project.start_time
+    windows[1].apply_to_settings(simulation_settings)
+    assert (simulation_settings.project.start_time - start_time).total_seconds() == 120
+    assert simulation_settings.project.simulation_duration_min == 6
+
+
+def _create_window_store(filename, window, currents, taps):
+    base = f"Exports/{SCENARIO}"
+    with h5py.File(filename, "w") as store:
+        num_steps = window.warm_up_steps + window.num_steps
+        timestamps = DatasetBuffer(store, f"{base}/Timestamp", num_steps, float, ["Timestamp"])
+        for step in range(window.first_step, window.start_step + window.num_steps):
+            timestamps.write_value([step * 60.0])
+        timestamps.flush_data()
+
+        dataset = DatasetBuffer(
+            store, f"{base}/Lines/ElementProperties/Currents", num_steps, float,
+            ["Line.a__A", "Line.b__A"], names=["Line.a", "Line.b"],
+            column_ranges_per_name=[(0, 1), (1, 1)],
+            attributes={"type": DatasetPropertyType.PER_TIME_POINT.value, "sample_interval": 1},
+        )
+        for value in currents:
+            dataset.write_value([value, value])
+        dataset.flush_data()
+
+        time_step_path = f"{base}/Transformers/ElementProperties/TapsTimeStep"
+        time_steps = DatasetBuffer(
+            store, time_step_path, 10, int, ["Time", "Name"],
+            attributes={"type": DatasetPropertyType.TIME_STEP.value},
+        )
+        dataset = DatasetBuffer(
+            store, f"{base}/Transformers/ElementProperties/Taps", 10, float,
+            ["AllNames__Taps"], names=["Transformer.a", "Transformer.b"],
+            column_ranges_per_name=[0, 1],
+            attributes={
+                "type": DatasetPropertyType.ON_CHANGE.value,
+                "time_step_path": time_step_path,
+            },
+        )
+        for time_step, elem_index, value in taps:
+            dataset.write_value([value])
+            time_steps.write_value([time_step, elem_index])
+        dataset.flush_data()
+        time_steps.flush_data()
+
+
+def test_stitch_time_windows(tmp_path):
+    windows = [TimeWindow(0, 0, 4, 0), TimeWindow(1, 4, 4, 2), TimeWindow(2, 8, 2, 2)]
+    filenames = [str(tmp_path / f"window{x.index}.h5") for x in windows]
+    # Window 1 warms up to the same values as window 0.
+    # Window 2 starts with a different current and tap position.
+    _create_window_store(filenames[0], windows[0], [0, 1, 2, 3], [(0, 0, 1), (0, 1, 5), (1, 0, 2)])
+    _create_window_store(filenames[1], windows[1], [2, 3, 4, 5, 6, 7],
+                         [(0, 0, 1), (0, 1, 5), (1, 0, 2), (4, 1, 6)])
+    _create_window_store(filenames[2], windows[2], [100, 7, 8, 9], [(0, 0, 3), (0, 1, 6)])
+
+    store_filename = str(tmp_path / "store.h5")
+    with h5py.File(store_filename, "w") as store:
+        store.attrs["version"] = "1"
+        stitch_time_windows(filenames, windows, SCENARIO, store)
+
+    with h5py.File(store_filename, "r") as store:
+        group = store[f"Exports/{SCENARIO}"]
+        assert list(group["Timestamp"][:, 0]) == [x * 60.0 for x in range(10)]
+        currents = group["Lines/ElementProperties/Currents"]
+        assert currents.attrs["length"] == 10
+        assert list(currents[:, 1]) == list(range(10))
+        time_steps = group["Transformers/ElementProperties/TapsTimeStep"][:]
+        assert time_steps.tolist() == [[0, 0], [0, 1], [1, 0], [6, 1], [8, 0]]
+        assert list(group["Transformers/ElementProperties/Taps"][:, 0]) == [1, 5, 2, 6, 3]
+
+        results = PyDssScenarioResults(SCENARIO, "/tmp", store, None, {}, ElementOptions())
+        df = results.get_dataframe("Lines", "Currents", "Line.b")
+        assert list(df.iloc[:, 0].values) == list(range(10))
+
+    boundaries = compare_window_boundaries(filenames, windows, SCENARIO, 60)
+    assert [x["num_overlap_steps"] for x in boundaries] == [2, 2]
+    assert boundaries[0]["settled_after_min"] == 0.0
+    assert boundaries[1]["settled_after_min"] == 1.0
+    result = boundaries[1]["datasets"][0]
+    assert result["path"] == "Lines/ElementProperties/Currents"
+    assert result["max_abs_diff"] == 94.0
+    assert result["final_abs_diff"] == 0.0
+
+
+# Switches the capacitor on at 00:30 and opens it at 01:15. With two 60-minute
+# windows and 30 minutes of warm-up, the second window repeats the first event
+# during warm-up.
+CAPACITOR_CONTROL = """
+New Capacitor.cap1 phases=1 bus1=tsf.1 kv=0.240 kvar=5 states=[0]
+New CapControl.cap1 element=Transformer.tsf terminal=1 capacitor=cap1 type=time
+~ ONsetting=0.5 OFFsetting=1.25 delay=0 delayoff=0
+"""
+
+
+def _read_results(project_dir):
+    scenario = PyDssResults(project_dir).get_scenario(SCENARIO)
+    return read_store_datasets(os.path.join(project_dir, STORE_FILENAME)), scenario.read_event_log()
+
+
+def test_run_time_partitions(tmp_path):
+    project_dir = create_monte_carlo_project(tmp_path, [SCENARIO], duration_min=120.0)
+    master_file = os.path.join(project_dir, "DSSfiles", "Master_Spohn_existing_VV.dss")
+    with open(master_file, "a") as f_out:
+        f_out.write(CAPACITOR_CONTROL)
+    # Each window starts its power flows from different solutions, so the
+    # results match only as closely as the solutions converge.
+    filename = os.path.join(project_dir, "simulation.toml")
+    data = load_data(filename)
+    data["Project"]["Error tolerance"] = 1e-8
+    dump_data(data, filename)
+
+    PyDssProject.run_project(project_dir, simulation_file="simulation.toml")
+    expected_datasets, expected_events = _read_results(project_dir)
+    actions = [x["Action"] for x in expected_events if x["Element"] == "Capacitor.cap1"]
+    assert actions.count("**STEP UP**") == 1
+    assert actions.count("**OPENED**") == 1
+
+    PyDssProject.run_project(
+        project_dir, simulation_file="simulation.toml", time_partitions=2, warm_up_min=30.0,
+    )
+    datasets, events = _read_results(project_dir)
+    assert_datasets_equal(expected_datasets, datasets)
+    assert events == expected_events
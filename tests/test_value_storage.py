@@ -0,0 +1,72 @@
+import copy
+
+import numpy as np
+
+from PyDSS.value_storage import ValueByLabel, ValueByNumber, ValueColumns
+
+
+# Two terminals, three conductors
+NODES = [[1, 2, 3], [1, 2, 0]]
+RAW = [float(x) for x in range(12)]
+RAW2 = [float(x) for x in range(100, 112)]
+
+
+def test_value_by_label_complex():
+    value = ValueByLabel("Line.one", "Currents", RAW, NODES, True, ["[Amps]"])
+    assert value.make_columns() == [
+        "Line.one__A1 [Amps]", "Line.one__B1 [Amps]", "Line.one__C1 [Amps]",
+        "Line.one__A2 [Amps]", "Line.one__B2 [Amps]", "Line.one__N2 [Amps]",
+    ]
+    assert list(value.value) == [complex(RAW[i], RAW[i + 1]) for i in range(0, 12, 2)]
+    value.set_value_from_raw(RAW2)
+    assert list(value.value) == [complex(RAW2[i], RAW2[i + 1]) for i in range(0, 12, 2)]
+
+
+def test_value_by_label_mag_ang():
+    value = ValueByLabel("Line.one", "CurrentsMagAng", RAW, NODES, False, ["[Amps]", "[Deg]"])
+    assert value.num_columns == 12
+    assert value.make_columns()[:2] == ["Line.one__A1__mag [Amps]", "Line.one__A1__ang [Deg]"]
+    assert list(value.value) == RAW
+    value.set_value_from_raw(np.array(RAW2))
+    assert list(value.value) == RAW2
+
+
+def test_value_by_label_abs_copy():
+    value = ValueByLabel("Line.one", "Currents", RAW, NODES, True, ["[Amps]"])
+    converted = copy.deepcopy(value)
+    converted.set_value(np.abs(value.value))
+    assert converted.value_type == float
+    assert value.value_type == complex
+    assert np.iscomplexobj(value.value)
+
+
+def test_value_columns():
+    values = [
+        ValueByLabel("Line.one", "Currents", RAW, NODES, True, ["[Amps]"]),
+        ValueByLabel("Line.two", "Currents", RAW2[:6], [[1, 2, 3]], True, ["[Amps]"]),
+    ]
+    columns = ValueColumns(values, np.array([0, 12, 18]))
+    assert len(columns) == 2
+    assert columns.make_columns() == values[0].make_columns() + values[1].make_columns()
+
+    raw = np.array(RAW2 + RAW[:6])
+    columns.set_value_from_raw(raw)
+    expected = raw.view(np.complex128)
+    assert np.array_equal(columns.array, expected)
+    # The element values are views into the shared array.
+    assert np.array_equal(values[0].value, expected[:6])
+    assert np.array_equal(values[1].value, expected[6:])
+
+    columns.set_nan()
+    assert values[0].is_nan() and values[1].is_nan()
+
+
+def test_value_columns_numbers():
+    values = [ValueByNumber("Line.one", "NormalAmps", 1.0), ValueByNumber("Line.two", "NormalAmps", 2.0)]
+    columns = ValueColumns(values, np.array([0, 1, 2]))
+    assert list(columns.array) == [1.0, 2.0]
+    columns.set_value_from_raw(np.array([3.0, 4.0]))
+    assert values[0].value == 3.0
+    assert values[1].value == 4.0
+    values[1].set_value(5.0)
+    assert columns.array[1] == 5.0